@@ -5,11 +5,32 @@ Multi-timeframe BTC prediction with Claude + GPT-4 verification
 """
 
 import sqlite3
+import gzip
+import hashlib
 import json
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from html import escape
+from http import HTTPStatus
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import make_server, ServerHandler, WSGIServer, WSGIRequestHandler
+from wsgiref.util import FileWrapper
 from datetime import datetime, timezone
-from urllib.parse import urlparse, parse_qs
+from urllib.request import pathname2url
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
+import mimetypes
 import os
+import queue
+import re
+import signal
+import threading
+import time
+import zlib
+
+try:
+    import orjson  # optional: faster JSON for the API endpoints
+except ImportError:
+    orjson = None
 
 # Timeframe configurations
 TIMEFRAMES = {
@@ -24,93 +45,476 @@ PORT = 8080
 # API authentication for external predictions (local LLM)
 API_KEY = os.environ.get('RAILWAY_API_KEY', '')
 
+_UTC = timezone.utc
 
-def save_external_prediction(db_path: str, prediction: dict) -> int:
-    """Save a prediction from external source (local LLM) to the database."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Ensure table exists
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS predictions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            current_price REAL NOT NULL,
-            predicted_direction TEXT NOT NULL,
-            predicted_target REAL NOT NULL,
-            confidence INTEGER NOT NULL,
-            reasoning TEXT,
-            resolved_at TEXT,
-            actual_price REAL,
-            actual_direction TEXT,
-            direction_correct BOOLEAN,
-            target_error_pct REAL,
-            calibration_score REAL,
-            is_extreme BOOLEAN,
-            extreme_reason TEXT,
-            learning_extracted TEXT,
-            source TEXT DEFAULT 'local_llm'
-        )
-    """)
+# Database locations
+DATA_DIR = os.environ.get('RAILWAY_VOLUME_MOUNT_PATH', '/data')
+LEGACY_DB_PATH = os.environ.get('DB_PATH', 'predictions.db')
+
+# Files served under /static/
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Read-only connections kept open per database
+POOL_READERS = 4
+
+# /api/events: seconds between change checks, between keep-alive comments,
+# and before a stream ends so the browser reconnects (frees the worker).
+# A stream occupies a worker thread for its whole life, so WSGI servers
+# need threaded or async workers (see app)
+EVENTS_POLL_INTERVAL = 1
+EVENTS_KEEPALIVE = 15
+EVENTS_MAX_AGE = 300
+
+# journal_mode is persistent and needs write access, so only the writer sets it
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+class ConnectionPool:
+    """One serialized read-write connection plus a queue of read-only ones.
+
+    WAL mode lets the readers run concurrently with each other and with the
+    writer, so request threads only contend on the writer lock.
+    """
+    
+    def __init__(self, db_path: str, readers: int = POOL_READERS):
+        self.db_path = db_path
+        self.max_readers = readers
+        self.lock = threading.Lock()
+        self._writer = None
+        self.writes = 0  # bumped on every commit, part of stamp()
+        self._readers = queue.Queue()
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        self._local = threading.local()  # reader held by the current thread
+    
+    def _configure(self, conn):
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _open_writer(self):
+        if self._writer is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Checkpoints truncate the WAL back to this size instead of
+            # leaving it at its high-water mark for readers to stat and map
+            conn.execute("PRAGMA journal_size_limit=67108864")
+            self._writer = self._configure(conn)
+        return self._writer
+    
+    def _open_reader(self):
+        # Make sure the file is in WAL mode before read-only handles attach
+        if self._writer is None and os.path.exists(self.db_path):
+            with self.lock:
+                self._open_writer()
+        uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return self._configure(conn)
+    
+    def stamp(self):
+        """Cheap change marker for cache keys.
+        
+        Our own commit count plus the mtime/size of the database and its
+        WAL, which move on any process's commit (the predictor's included).
+        """
+        marks = [self.writes]
+        for path in (self.db_path, self.db_path + '-wal'):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                marks.append(None)
+            else:
+                marks.append((st.st_mtime_ns, st.st_size))
+        return tuple(marks)
+    
+    @contextmanager
+    def reader(self, snapshot=False):
+        """Check out a read-only connection (rows are sqlite3.Row).
+        
+        Nested calls on the same thread reuse the connection already held,
+        so a request can wrap its getters in one checkout. With snapshot=True
+        that checkout is also one read transaction: every query in it sees
+        the same commit, and the WAL read lock is taken once, not per query.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            yield held
+            return
+        
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._open_lock:
+                can_open = self._opened < self.max_readers
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._open_reader()
+                except Exception:
+                    with self._open_lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._readers.get()
+        self._local.conn = conn
+        try:
+            if snapshot:
+                conn.execute("BEGIN")
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._local.conn = None
+            self._readers.put(conn)
+    
+    @contextmanager
+    def writer(self):
+        """Hold the writer lock and run the block inside BEGIN IMMEDIATE.
+        
+        Connections are in autocommit mode (isolation_level=None), so this is
+        the only transaction boundary: everything in the block, executemany
+        batches included, shares one COMMIT. Taking the write lock up front
+        avoids the deferred read->write upgrade that can fail with SQLITE_BUSY.
+        """
+        with self.lock:
+            conn = self._open_writer()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            self.writes += 1
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class TTLCache:
+    """Small thread-safe TTL cache for rendered GET responses."""
+    
+    def __init__(self, maxsize=64, ttl=5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+    
+    def __setitem__(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                # Drop expired entries, then the oldest if still full
+                for k in [k for k, (expires, _) in self._data.items() if expires <= now]:
+                    del self._data[k]
+                if len(self._data) >= self.maxsize:
+                    del self._data[next(iter(self._data))]
+            self._data[key] = (now + self.ttl, value)
+
+
+# Coalesces dashboard refreshes; keys include the pool's stamp() so any
+# commit shows up on the next request, and the TTL bounds the clock-driven
+# parts (countdown, retries of a failed local LLM auto-resolve)
+RESPONSE_CACHE = TTLCache(maxsize=64, ttl=5)
+
+
+def cached(key, build):
+    """Return RESPONSE_CACHE[key], computing it with build() on a miss."""
+    value = RESPONSE_CACHE.get(key)
+    if value is None:
+        value = build()
+        RESPONSE_CACHE[key] = value
+    return value
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Get (or create) the connection pool for a database file."""
+    pool = _POOLS.get(db_path)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.setdefault(db_path, ConnectionPool(db_path))
+    return pool
+
+
+INSERT_EXTERNAL_PREDICTION_SQL = """
+    INSERT INTO predictions (
+        timestamp, timestamp_ms, current_price, predicted_direction, predicted_target,
+        confidence, reasoning, source
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# ISO-8601 text -> epoch milliseconds, for rows that only carry the TEXT column
+ISO_TO_EPOCH_MS_SQL = "CAST(ROUND((julianday({}) - 2440587.5) * 86400000) AS INTEGER)"
+
+# Databases whose predictions table has already been created/migrated
+_SCHEMA_READY = set()
+
+
+# Indexes behind the dashboard's read queries, created for the tables that
+# exist. The partial-index WHERE clauses repeat the queries' filters
+# verbatim so the planner can match them.
+DASHBOARD_INDEXES = {
+    'predictions': (
+        # Narrow covering index for the STATS_SQL scan (skips the wide text
+        # columns); predictor.py creates the same one for its get_stats
+        """CREATE INDEX IF NOT EXISTS idx_pred_stats
+           ON predictions(resolved_at, direction_correct, is_extreme, target_error_pct, calibration_score, source)""",
+        """CREATE INDEX IF NOT EXISTS idx_pred_resolved_ts
+           ON predictions(timestamp_ms) WHERE resolved_at IS NOT NULL""",
+        """CREATE INDEX IF NOT EXISTS idx_pred_extreme_ts
+           ON predictions(timestamp_ms)
+           WHERE is_extreme = 1 AND learning_extracted IS NOT NULL""",
+        # get_local_llm_current otherwise walks idx_ts past every Claude row
+        """CREATE INDEX IF NOT EXISTS idx_pred_local_ts
+           ON predictions(timestamp_ms) WHERE source = 'local_llm'""",
+    ),
+    'meta_learnings': (
+        """CREATE INDEX IF NOT EXISTS idx_meta_active
+           ON meta_learnings(confidence_score DESC, timestamp DESC) WHERE is_active = 1""",
+    ),
+    'verifier_meta_learnings': (
+        """CREATE INDEX IF NOT EXISTS idx_vmeta_active
+           ON verifier_meta_learnings(confidence_score DESC, timestamp DESC) WHERE is_active = 1""",
+    ),
+    'verifier_predictions': (
+        """CREATE INDEX IF NOT EXISTS idx_vp_prediction
+           ON verifier_predictions(prediction_id)""",
+        """CREATE INDEX IF NOT EXISTS idx_vp_extreme_ts
+           ON verifier_predictions(timestamp) WHERE is_extreme = 1 AND learning_extracted IS NOT NULL""",
+    ),
+}
+
+# Tables seen in each database. Only positive results are kept, since the
+# predictor creates its tables lazily and they are never dropped.
+_TABLES = {}
+
+
+def _has_table(cursor, db_path, name):
+    """True if `name` exists in the database `cursor` is connected to."""
+    known = _TABLES.setdefault(db_path, set())
+    if name not in known:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        known.update(row[0] for row in cursor.fetchall())
+    return name in known
+
+
+# Columns of each table, by database; filled once the table exists
+_COLUMNS = {}
+
+
+def _projection(cursor, db_path, table, wanted):
+    """Comma-separated select list of the `wanted` columns `table` actually has.
+    
+    Lets the getters name their columns while tolerating rows written by an
+    older predictor that lacks some of them.
+    """
+    columns = _COLUMNS.setdefault(db_path, {}).get(table)
+    if columns is None:
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = {row[1] for row in cursor.fetchall()}
+        if columns:
+            _COLUMNS[db_path][table] = columns
+    return ', '.join(name for name in wanted if name in columns)
+
+
+def _ensure_schema(db_path: str, create: bool = True) -> bool:
+    """Create/migrate the predictions table, once per database per process.
+    
+    With create=False (read paths) a missing table is left alone so the
+    predictor still gets to create it with its own defaults. Returns True
+    once the schema is in place.
+    """
+    if db_path in _SCHEMA_READY:
+        return True
+    pool = get_pool(db_path)
+    if not create:
+        # Probe on a reader, so a database the predictor hasn't set up yet
+        # costs no write transaction on every request
+        if not os.path.exists(db_path):
+            return False
+        with pool.reader() as conn:
+            if not _has_table(conn.cursor(), db_path, 'predictions'):
+                return False
+    
+    with pool.writer() as conn:
+        cursor = conn.cursor()
+        
+        if create:
+            # Ensure table exists
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS predictions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    current_price REAL NOT NULL,
+                    predicted_direction TEXT NOT NULL,
+                    predicted_target REAL NOT NULL,
+                    confidence INTEGER NOT NULL,
+                    reasoning TEXT,
+                    resolved_at TEXT,
+                    actual_price REAL,
+                    actual_direction TEXT,
+                    direction_correct BOOLEAN,
+                    target_error_pct REAL,
+                    calibration_score REAL,
+                    is_extreme BOOLEAN,
+                    extreme_reason TEXT,
+                    learning_extracted TEXT,
+                    source TEXT DEFAULT 'local_llm'
+                )
+            """)
+        
+        # Check for columns added after the original schema, add if not
+        cursor.execute("PRAGMA table_info(predictions)")
+        columns = [col[1] for col in cursor.fetchall()]
+        if 'source' not in columns:
+            cursor.execute("ALTER TABLE predictions ADD COLUMN source TEXT DEFAULT 'claude'")
+        
+        # Integer epoch-ms copy of `timestamp` for range scans and ordering.
+        # predictor.py writes it alongside the TEXT column; the trigger
+        # fills it in for any writer that doesn't.
+        if 'timestamp_ms' not in columns:
+            cursor.execute("ALTER TABLE predictions ADD COLUMN timestamp_ms INTEGER")
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS predictions_timestamp_ms
+            AFTER INSERT ON predictions WHEN NEW.timestamp_ms IS NULL
+            BEGIN
+                UPDATE predictions SET timestamp_ms = {ISO_TO_EPOCH_MS_SQL.format('NEW.timestamp')}
+                WHERE id = NEW.id;
+            END
+        """)
+        cursor.execute(f"""
+            UPDATE predictions SET timestamp_ms = {ISO_TO_EPOCH_MS_SQL.format('timestamp')}
+            WHERE timestamp_ms IS NULL
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ts ON predictions(timestamp_ms)")
+        
+        for table, statements in DASHBOARD_INDEXES.items():
+            if _has_table(cursor, db_path, table):
+                for statement in statements:
+                    cursor.execute(statement)
     
-    # Check if source column exists, add if not
-    cursor.execute("PRAGMA table_info(predictions)")
-    columns = [col[1] for col in cursor.fetchall()]
-    if 'source' not in columns:
-        cursor.execute("ALTER TABLE predictions ADD COLUMN source TEXT DEFAULT 'claude'")
-    
-    cursor.execute("""
-        INSERT INTO predictions (
-            timestamp, current_price, predicted_direction, predicted_target,
-            confidence, reasoning, source
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        prediction.get('timestamp', datetime.now(timezone.utc).isoformat()),
-        prediction['current_price'],
-        prediction['direction'].upper(),
-        prediction['target'],
-        prediction['confidence'],
+    _SCHEMA_READY.add(db_path)
+    return True
+
+
+# Required fields of an external prediction, in INSERT column order
+_EXTERNAL_FIELDS = itemgetter('current_price', 'direction', 'target', 'confidence')
+
+
+def _external_prediction_params(prediction: dict) -> tuple:
+    timestamp = prediction.get('timestamp')
+    if timestamp:
+        # Caller-supplied text; the trigger derives timestamp_ms from it
+        timestamp_ms = None
+    else:
+        # Exact time lives in timestamp_ms; the TEXT copy is for display
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now, _UTC).isoformat(timespec='seconds')
+        timestamp_ms = int(now * 1000)
+    current_price, direction, target, confidence = _EXTERNAL_FIELDS(prediction)
+    return (
+        timestamp,
+        timestamp_ms,
+        current_price,
+        direction.upper(),
+        target,
+        confidence,
         prediction.get('reasoning', ''),
-        prediction.get('source', 'local_llm')
-    ))
+        prediction.get('source', 'local_llm'),
+    )
+
+
+def save_external_predictions_batch(db_path: str, predictions: list) -> list:
+    """Save many external predictions in one transaction. Returns their ids."""
+    rows = [_external_prediction_params(p) for p in predictions]
+    if not rows:
+        return []
     
-    pred_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return pred_id
+    _ensure_schema(db_path)
+    with get_pool(db_path).writer() as conn:
+        conn.executemany(INSERT_EXTERNAL_PREDICTION_SQL, rows)
+        # AUTOINCREMENT ids are consecutive while we hold the write lock
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
 
-def get_db_path(timeframe='5'):
-    """Get database path for a given timeframe."""
-    config = TIMEFRAMES.get(timeframe, TIMEFRAMES[DEFAULT_TIMEFRAME])
-    db_name = config['db']
+
+def save_external_prediction(db_path: str, prediction: dict) -> int:
+    """Save a prediction from external source (local LLM) to the database."""
+    return save_external_predictions_batch(db_path, [prediction])[0]
+
+# Resolved database paths, filled in as each timeframe's file shows up
+_DB_PATHS = {}
+
+# Development mode re-resolves database paths on every call
+DASHBOARD_DEV = os.environ.get('DASHBOARD_DEV') == '1'
+
+
+def _resolve_db_path(timeframe):
+    """Run the volume -> local -> legacy lookup. Returns (path, exists)."""
+    db_name = TIMEFRAMES[timeframe]['db']
     
     # Check Railway volume first
-    data_dir = os.environ.get('RAILWAY_VOLUME_MOUNT_PATH', '/data')
-    if os.path.exists(data_dir):
-        volume_path = os.path.join(data_dir, db_name)
-        if os.path.exists(volume_path):
-            return volume_path
+    volume_path = os.path.join(DATA_DIR, db_name)
+    if os.path.exists(volume_path):
+        return volume_path, True
     
     # Fall back to local
     if os.path.exists(db_name):
-        return db_name
+        return db_name, True
     
     # Fall back to legacy single db
-    return os.environ.get('DB_PATH', 'predictions.db')
+    return LEGACY_DB_PATH, False
 
-def get_html_template(timeframe='5'):
-    tf_config = TIMEFRAMES.get(timeframe, TIMEFRAMES[DEFAULT_TIMEFRAME])
-    return """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Recursive - BTC Predictor</title>
+
+def get_db_path(timeframe='5'):
+    """Get database path for a given timeframe.
     
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&family=JetBrains+Mono:wght@400;500&display=swap" rel="stylesheet">
-    <style>
+    Paths that exist are memoized; a missing database is re-probed on each
+    call so the dashboard picks it up once the predictor creates it.
+    With DASHBOARD_DEV=1 every call re-runs the lookup.
+    """
+    if timeframe not in TIMEFRAMES:
+        timeframe = DEFAULT_TIMEFRAME
+    
+    if not DASHBOARD_DEV:
+        path = _DB_PATHS.get(timeframe)
+        if path is not None:
+            return path
+    
+    path, exists = _resolve_db_path(timeframe)
+    if exists and not DASHBOARD_DEV:
+        _DB_PATHS[timeframe] = path
+    return path
+
+
+def clear_db_path_cache(*_):
+    """Re-resolve memoized database paths (wired to SIGHUP in run_server)."""
+    _DB_PATHS.clear()
+    for tf in TIMEFRAMES:
+        get_db_path(tf)
+
+
+# Resolve the deployment's databases up front so requests skip the probing
+clear_db_path_cache()
+
+DASHBOARD_CSS = """
         * {
             box-sizing: border-box;
             margin: 0;
@@ -171,7 +575,7 @@ def get_html_template(timeframe='5'):
         .logo-icon {
             width: 36px;
             height: 36px;
-            background: linear-gradient(135deg, var(--purple) 0%%, var(--accent) 100%%);
+            background: linear-gradient(135deg, var(--purple) 0%, var(--accent) 100%);
             border-radius: 8px;
             display: flex;
             align-items: center;
@@ -206,13 +610,13 @@ def get_html_template(timeframe='5'):
             width: 6px;
             height: 6px;
             background: var(--success);
-            border-radius: 50%%;
+            border-radius: 50%;
             animation: pulse 2s ease-in-out infinite;
         }
         
         @keyframes pulse {
-            0%%, 100%% { opacity: 1; }
-            50%% { opacity: 0.4; }
+            0%, 100% { opacity: 1; }
+            50% { opacity: 0.4; }
         }
         
         /* Current Prediction Card */
@@ -309,7 +713,7 @@ def get_html_template(timeframe='5'):
         }
         
         .progress-fill {
-            height: 100%%;
+            height: 100%;
             background: linear-gradient(90deg, var(--accent), var(--purple));
             border-radius: 2px;
             transition: width 1s linear;
@@ -608,7 +1012,7 @@ def get_html_template(timeframe='5'):
         }
         
         .predictions-table {
-            width: 100%%;
+            width: 100%;
             border-collapse: collapse;
             table-layout: fixed;
         }
@@ -1481,16 +1885,17 @@ def get_html_template(timeframe='5'):
                 padding: 12px;
             }
         }
-    </style>
-    <script>
-        // Prediction timestamp from server
-        const predictionTimestamp = %%PREDICTION_TIMESTAMP%%;
-        const isResolved = %%IS_RESOLVED%%;
-        const predictionDuration = 300; // 5 minutes in seconds
+"""
+
+
+# Page behaviour; the per-render values it reads (predictionTimestamp,
+# isResolved, predictionDuration) are set by a small inline script
+DASHBOARD_JS = """
         let hasTriggeredRefresh = false;
         
         function updateCountdown() {
-            if (!predictionTimestamp) return;
+            // Nothing ticks once the prediction is resolved
+            if (!predictionTimestamp || isResolved) return false;
             
             const now = Date.now() / 1000;
             const elapsed = now - predictionTimestamp;
@@ -1502,7 +1907,10 @@ def get_html_template(timeframe='5'):
             const timeEl = document.getElementById('time-remaining');
             const progressEl = document.getElementById('progress-fill');
             
-            if (timeEl && !isResolved) {
+            // Only touch the DOM when the shown second / whole percent changes
+            const shownSecs = remaining > 0 ? Math.floor(remaining) : -1;
+            if (timeEl && shownSecs !== updateCountdown.lastSecs) {
+                updateCountdown.lastSecs = shownSecs;
                 if (remaining > 0) {
                     timeEl.textContent = `${mins}:${secs.toString().padStart(2, '0')} remaining`;
                 } else {
@@ -1510,56 +1918,123 @@ def get_html_template(timeframe='5'):
                 }
             }
             
-            if (progressEl && !isResolved) {
-                const progress = Math.min(100, (elapsed / predictionDuration) * 100);
-                progressEl.style.width = progress + '%';
+            if (progressEl) {
+                const progress = Math.floor(Math.min(100, (elapsed / predictionDuration) * 100));
+                if (progress !== updateCountdown.lastPct) {
+                    updateCountdown.lastPct = progress;
+                    progressEl.style.width = progress + '%';
+                }
             }
             
-            // Auto-refresh when timer hits zero (give 10 seconds for resolution)
+            // Re-poll when timer hits zero (give 10 seconds for resolution)
             if (remaining <= 0 && !hasTriggeredRefresh) {
                 hasTriggeredRefresh = true;
-                setTimeout(() => {
-                    location.reload();
-                }, 10000); // Wait 10 seconds for prediction to resolve, then refresh
+                setTimeout(refreshState, 10000); // Wait 10 seconds for prediction to resolve, then refresh
+            }
+            return !(remaining <= 0 && hasTriggeredRefresh);
+        }
+        
+        // Drive the countdown from animation frames: paused in background
+        // tabs, and stopped once the timer has run out
+        let countdownRunning = false;
+        function tick() {
+            countdownRunning = updateCountdown();
+            if (countdownRunning) requestAnimationFrame(tick);
+        }
+        function startCountdown() {
+            updateCountdown.lastSecs = updateCountdown.lastPct = null;
+            if (!countdownRunning && predictionTimestamp && !isResolved) {
+                countdownRunning = true;
+                requestAnimationFrame(tick);
+            }
+        }
+        startCountdown();
+        
+        // Patch the live parts of the page from /api/state
+        function patchHtml(id, html) {
+            const el = document.getElementById(id);
+            if (el && el.innerHTML !== html) el.innerHTML = html;
+        }
+        
+        function applyState(state) {
+            const resolvedEl = document.querySelector('[data-field="RESOLVED"]');
+            if (resolvedEl && resolvedEl.textContent !== state.fields.RESOLVED) {
+                // A prediction resolved: history, learnings and rules moved too
+                location.reload();
+                return;
+            }
+            
+            document.querySelectorAll('[data-field]').forEach(el => {
+                const value = state.fields[el.dataset.field];
+                if (value !== undefined && el.textContent !== value) el.textContent = value;
+            });
+            const accuracyEl = document.querySelector('[data-field="ACCURACY"]');
+            if (accuracyEl) accuracyEl.className = 'stat-value ' + state.fields.ACCURACY_CLASS;
+            
+            patchHtml('current-prediction', state.current_html);
+            patchHtml('streak', state.streak_html);
+            
+            if (state.prediction_timestamp !== predictionTimestamp || state.is_resolved !== isResolved) {
+                predictionTimestamp = state.prediction_timestamp;
+                isResolved = state.is_resolved;
+                hasTriggeredRefresh = false;
             }
+            startCountdown();
         }
         
-        // Update every second
-        setInterval(updateCountdown, 1000);
-        updateCountdown();
+        function refreshState() {
+            // no-cache revalidates with If-None-Match, so unchanged polls are 304s
+            fetch('/api/state' + location.search, {cache: 'no-cache'})
+                .then(r => r.ok ? r.json() : null)
+                .then(state => { if (state) applyState(state); })
+                .catch(() => {});
+        }
         
-        // Also poll every 30 seconds to catch new predictions
-        setInterval(() => location.reload(), 30000);
+        // Have new predictions pushed as they land; poll every 30 seconds
+        // where EventSource is unavailable
+        if (window.EventSource) {
+            const events = new EventSource('/api/events' + location.search);
+            events.onmessage = ev => applyState(JSON.parse(ev.data));
+        } else {
+            setInterval(refreshState, 30000);
+        }
         
         // Theme toggle
         function toggleTheme() {
             document.body.classList.toggle('dark');
             const isDark = document.body.classList.contains('dark');
             localStorage.setItem('theme', isDark ? 'dark' : 'light');
+            // The server reads this cookie to render the saved theme directly
+            document.cookie = 'theme=' + (isDark ? 'dark' : 'light') + ';max-age=31536000;path=/';
             document.getElementById('theme-icon').textContent = isDark ? '🌙' : '☀️';
         }
         
-        // Load saved theme
-        (function() {
-            const savedTheme = localStorage.getItem('theme');
-            if (savedTheme === 'dark') {
-                document.body.classList.add('dark');
-            }
-        })();
-        
-        // Update theme icon on load
+        // One delegated listener for every expandable row and card
         document.addEventListener('DOMContentLoaded', function() {
-            const isDark = document.body.classList.contains('dark');
-            const icon = document.getElementById('theme-icon');
-            if (icon) icon.textContent = isDark ? '🌙' : '☀️';
+            document.querySelector('.container').addEventListener('click', e => {
+                const t = e.target.closest('[data-toggle]');
+                if (!t) return;
+                if (t.dataset.toggle === 'reasoning') toggleReasoning(t.dataset.id);
+                else toggleExpand(t.dataset.id);
+            });
         });
         
-        // Toggle reasoning row visibility
+        // Toggle reasoning row visibility, loading its content on first use
         function toggleReasoning(id) {
             const row = document.getElementById('reasoning-' + id);
-            if (row) {
-                row.classList.toggle('visible');
+            if (!row) return;
+            if (row.dataset.lazy) {
+                delete row.dataset.lazy;
+                const qs = location.search ? location.search + '&' : '?';
+                fetch('/api/reasoning' + qs + 'id=' + encodeURIComponent(id))
+                    .then(r => r.ok ? r.json() : null)
+                    .then(data => {
+                        if (data) row.firstElementChild.innerHTML = data.html;
+                        else row.dataset.lazy = '1';
+                    })
+                    .catch(() => { row.dataset.lazy = '1'; });
             }
+            row.classList.toggle('visible');
         }
         
         // Toggle expandable cards (meta rules and learnings)
@@ -1577,9 +2052,84 @@ def get_html_template(timeframe='5'):
                 }
             }
         }
+"""
+
+
+# In-memory /static/ assets: url name -> (body, gzip body, content type)
+STATIC_ASSETS = {}
+
+
+def _static_asset(name, body, content_type):
+    """Register an asset under a content-hashed name and return its URL.
+    
+    The hash changes whenever the content does, so it can be cached
+    forever by browsers.
+    """
+    data = body.encode('utf-8')
+    digest = hashlib.sha1(data).hexdigest()[:8]
+    stem, ext = os.path.splitext(name)
+    url_name = f'{stem}.{digest}{ext}'
+    STATIC_ASSETS[url_name] = (data, gzip.compress(data, compresslevel=9, mtime=0), content_type)
+    return f'/static/{url_name}'
+
+
+def _minify_css(css):
+    """Drop comments and collapse whitespace in a stylesheet."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};,])\s*', r'\1', css).strip()
+
+
+def _minify_html(html):
+    """Strip indentation, blank lines, HTML comments and whole-line // comments.
+    
+    Line breaks are kept so inline scripts never depend on inserted
+    semicolons, and nothing inside a line is touched.
+    """
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.S)
+    lines = (line.strip() for line in html.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+DASHBOARD_CSS_URL = _static_asset('dashboard.css', _minify_css(DASHBOARD_CSS), 'text/css; charset=utf-8')
+# _minify_html only works line by line, so it is safe on the script too
+DASHBOARD_JS_URL = _static_asset('dashboard.js', _minify_html(DASHBOARD_JS), 'text/javascript; charset=utf-8')
+
+
+def get_html_template(timeframe='5'):
+    tf_config = TIMEFRAMES.get(timeframe, TIMEFRAMES[DEFAULT_TIMEFRAME])
+    return """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Recursive - BTC Predictor</title>
+    
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&family=JetBrains+Mono:wght@400;500&display=swap" rel="stylesheet">
+    <link rel="stylesheet" href="%%DASHBOARD_CSS_URL%%">
+    <!-- Ahead of the per-render script, so it is in the early-flushed head;
+         defer still runs it after parsing -->
+    <script src="%%DASHBOARD_JS_URL%%" defer></script>
+    <script>
+        // One-time migration for a dark theme saved in localStorage before
+        // the server rendered it from the cookie
+        if (localStorage.getItem('theme') === 'dark' && ('; ' + document.cookie).indexOf('; theme=') < 0) {
+            document.cookie = 'theme=dark;max-age=31536000;path=/';
+            document.addEventListener('DOMContentLoaded', function() {
+                document.body.classList.add('dark');
+                document.getElementById('theme-icon').textContent = '🌙';
+            });
+        }
+        
+        // Prediction timestamp from server
+        let predictionTimestamp = %%PREDICTION_TIMESTAMP%%;
+        let isResolved = %%IS_RESOLVED%%;
+        const predictionDuration = %%PREDICTION_DURATION%%; // prediction interval in seconds
     </script>
 </head>
-<body>
+<body class="%%BODY_CLASS%%">
     <div class="container">
         <header>
             <div class="header-left">
@@ -1592,7 +2142,7 @@ def get_html_template(timeframe='5'):
             </div>
             <div class="header-right">
                 <button class="theme-toggle" onclick="toggleTheme()">
-                    <span id="theme-icon">☀️</span>
+                    <span id="theme-icon">%%THEME_ICON%%</span>
                 </button>
                 <div class="learning-badge">
                     <span>🧠</span>
@@ -1603,31 +2153,33 @@ def get_html_template(timeframe='5'):
         <div class="subtitle">Recursive Learning Intelligence BTC/USDT • %%TIMEFRAME_LABEL%%</div>
         
         <!-- Current Prediction -->
+        <div id="current-prediction">
         %%CURRENT_PREDICTION_HTML%%
+        </div>
         
         <!-- Stats Row -->
         <div class="stats-row">
             <div class="stat-card">
                 <div class="stat-label">Predictions</div>
-                <div class="stat-value">%%TOTAL%%</div>
+                <div class="stat-value" data-field="TOTAL">%%TOTAL%%</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Accuracy</div>
-                <div class="stat-value %%ACCURACY_CLASS%%">%%ACCURACY%%</div>
-                <div class="stat-sub">%%CORRECT%% / %%RESOLVED%% correct</div>
+                <div class="stat-value %%ACCURACY_CLASS%%" data-field="ACCURACY">%%ACCURACY%%</div>
+                <div class="stat-sub"><span data-field="CORRECT">%%CORRECT%%</span> / <span data-field="RESOLVED">%%RESOLVED%%</span> correct</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Calibration</div>
-                <div class="stat-value accent">%%CALIBRATION%%</div>
+                <div class="stat-value accent" data-field="CALIBRATION">%%CALIBRATION%%</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Learnings</div>
-                <div class="stat-value purple">%%EXTREMES%%</div>
+                <div class="stat-value purple" data-field="EXTREMES">%%EXTREMES%%</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Meta-Rules</div>
-                <div class="stat-value cyan">%%META_RULES%%</div>
-                <div class="stat-sub">Next analysis: %%NEXT_META%%</div>
+                <div class="stat-value cyan" data-field="META_RULES">%%META_RULES%%</div>
+                <div class="stat-sub">Next analysis: <span data-field="NEXT_META">%%NEXT_META%%</span></div>
             </div>
         </div>
         
@@ -1635,22 +2187,22 @@ def get_html_template(timeframe='5'):
         <div class="verifier-stats">
             <div class="verifier-stat-card">
                 <div class="verifier-stat-label">🔍 GPT-4 Verifier</div>
-                <div class="verifier-stat-value">%%VERIFIER_ACCURACY%%</div>
-                <div class="verifier-stat-sub">%%VERIFIER_CORRECT%% / %%VERIFIER_TOTAL%% correct</div>
+                <div class="verifier-stat-value" data-field="VERIFIER_ACCURACY">%%VERIFIER_ACCURACY%%</div>
+                <div class="verifier-stat-sub"><span data-field="VERIFIER_CORRECT">%%VERIFIER_CORRECT%%</span> / <span data-field="VERIFIER_TOTAL">%%VERIFIER_TOTAL%%</span> correct</div>
             </div>
             <div class="verifier-stat-card">
                 <div class="verifier-stat-label">🎯 Catches</div>
-                <div class="verifier-stat-value">%%VERIFIER_CATCHES%%</div>
+                <div class="verifier-stat-value" data-field="VERIFIER_CATCHES">%%VERIFIER_CATCHES%%</div>
                 <div class="verifier-stat-sub">Claude errors caught</div>
             </div>
             <div class="verifier-stat-card">
                 <div class="verifier-stat-label">⚠️ False Alarms</div>
-                <div class="verifier-stat-value">%%VERIFIER_FALSE_ALARMS%%</div>
+                <div class="verifier-stat-value" data-field="VERIFIER_FALSE_ALARMS">%%VERIFIER_FALSE_ALARMS%%</div>
                 <div class="verifier-stat-sub">Wrongly doubted</div>
             </div>
             <div class="verifier-stat-card">
                 <div class="verifier-stat-label">🤝 Consensus Win</div>
-                <div class="verifier-stat-value">%%CONSENSUS_WIN_RATE%%</div>
+                <div class="verifier-stat-value" data-field="CONSENSUS_WIN_RATE">%%CONSENSUS_WIN_RATE%%</div>
                 <div class="verifier-stat-sub">When both agree</div>
             </div>
         </div>
@@ -1670,19 +2222,19 @@ def get_html_template(timeframe='5'):
             </div>
             <div class="local-llm-stats">
                 <div class="local-llm-stat">
-                    <div class="local-llm-stat-value">%%LOCAL_LLM_TOTAL%%</div>
+                    <div class="local-llm-stat-value" data-field="LOCAL_LLM_TOTAL">%%LOCAL_LLM_TOTAL%%</div>
                     <div class="local-llm-stat-label">Predictions</div>
                 </div>
                 <div class="local-llm-stat">
-                    <div class="local-llm-stat-value">%%LOCAL_LLM_ACCURACY%%</div>
+                    <div class="local-llm-stat-value" data-field="LOCAL_LLM_ACCURACY">%%LOCAL_LLM_ACCURACY%%</div>
                     <div class="local-llm-stat-label">Accuracy</div>
                 </div>
                 <div class="local-llm-stat">
-                    <div class="local-llm-stat-value">%%LOCAL_LLM_RESOLVED%%</div>
+                    <div class="local-llm-stat-value" data-field="LOCAL_LLM_RESOLVED">%%LOCAL_LLM_RESOLVED%%</div>
                     <div class="local-llm-stat-label">Resolved</div>
                 </div>
                 <div class="local-llm-stat">
-                    <div class="local-llm-stat-value">%%LOCAL_LLM_AVG_ERROR%%</div>
+                    <div class="local-llm-stat-value" data-field="LOCAL_LLM_AVG_ERROR">%%LOCAL_LLM_AVG_ERROR%%</div>
                     <div class="local-llm-stat-label">Avg Error</div>
                 </div>
             </div>
@@ -1696,7 +2248,7 @@ def get_html_template(timeframe='5'):
                 <span class="section-title">Recent Results</span>
             </div>
             <div class="section-content">
-                <div class="streak-container">
+                <div class="streak-container" id="streak">
                     %%STREAK_HTML%%
                 </div>
             </div>
@@ -1708,7 +2260,7 @@ def get_html_template(timeframe='5'):
                 <div class="section-header">
                     <span class="section-icon">🧠</span>
                     <span class="section-title">Active Meta-Rules</span>
-                    <span class="section-count">%%META_RULES%%</span>
+                    <span class="section-count" data-field="META_RULES">%%META_RULES%%</span>
                 </div>
                 <div class="section-content">
                     %%META_RULES_HTML%%
@@ -1719,7 +2271,7 @@ def get_html_template(timeframe='5'):
                 <div class="section-header">
                     <span class="section-icon">💡</span>
                     <span class="section-title">Recent Learnings</span>
-                    <span class="section-count">%%EXTREMES%%</span>
+                    <span class="section-count" data-field="EXTREMES">%%EXTREMES%%</span>
                 </div>
                 <div class="section-content">
                     %%LEARNINGS_HTML%%
@@ -1762,27 +2314,27 @@ def get_html_template(timeframe='5'):
                 <div style="display: grid; grid-template-columns: repeat(5, 1fr); gap: 12px; text-align: center;">
                     <div>
                         <div style="font-size: 10px; color: var(--text-muted); text-transform: uppercase;">Agreed</div>
-                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: var(--success);">%%CONSENSUS_AGREED%%</div>
-                        <div style="font-size: 10px; color: var(--text-muted);">%%CONSENSUS_WIN_RATE%% win</div>
+                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: var(--success);" data-field="CONSENSUS_AGREED">%%CONSENSUS_AGREED%%</div>
+                        <div style="font-size: 10px; color: var(--text-muted);"><span data-field="CONSENSUS_WIN_RATE">%%CONSENSUS_WIN_RATE%%</span> win</div>
                     </div>
                     <div>
                         <div style="font-size: 10px; color: var(--text-muted); text-transform: uppercase;">Disagreed</div>
-                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: var(--warning);">%%CONSENSUS_DISAGREED%%</div>
+                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: var(--warning);" data-field="CONSENSUS_DISAGREED">%%CONSENSUS_DISAGREED%%</div>
                         <div style="font-size: 10px; color: var(--text-muted);">split</div>
                     </div>
                     <div>
                         <div style="font-size: 10px; color: var(--text-muted); text-transform: uppercase;">Catches</div>
-                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: #10a37f;">%%CONSENSUS_CATCHES%%</div>
+                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: #10a37f;" data-field="CONSENSUS_CATCHES">%%CONSENSUS_CATCHES%%</div>
                         <div style="font-size: 10px; color: var(--text-muted);">GPT saved</div>
                     </div>
                     <div>
                         <div style="font-size: 10px; color: var(--text-muted); text-transform: uppercase;">False Alarms</div>
-                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: var(--error);">%%CONSENSUS_FALSE_ALARMS%%</div>
+                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: var(--error);" data-field="CONSENSUS_FALSE_ALARMS">%%CONSENSUS_FALSE_ALARMS%%</div>
                         <div style="font-size: 10px; color: var(--text-muted);">GPT wrong</div>
                     </div>
                     <div>
                         <div style="font-size: 10px; color: var(--text-muted); text-transform: uppercase;">Blind Spots</div>
-                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: var(--text-secondary);">%%CONSENSUS_BLIND_SPOTS%%</div>
+                        <div style="font-family: 'JetBrains Mono', monospace; font-size: 18px; font-weight: 600; color: var(--text-secondary);" data-field="CONSENSUS_BLIND_SPOTS">%%CONSENSUS_BLIND_SPOTS%%</div>
                         <div style="font-size: 10px; color: var(--text-muted);">both wrong</div>
                     </div>
                 </div>
@@ -1797,12 +2349,12 @@ def get_html_template(timeframe='5'):
             </div>
             <table class="predictions-table">
                 <colgroup>
-                    <col style="width: 12%%;">
-                    <col style="width: 25%%;">
-                    <col style="width: 15%%;">
-                    <col style="width: 20%%;">
-                    <col style="width: 13%%;">
-                    <col style="width: 15%%;">
+                    <col style="width: 12%;">
+                    <col style="width: 25%;">
+                    <col style="width: 15%;">
+                    <col style="width: 20%;">
+                    <col style="width: 13%;">
+                    <col style="width: 15%;">
                 </colgroup>
                 <thead>
                     <tr>
@@ -1825,64 +2377,150 @@ def get_html_template(timeframe='5'):
         </footer>
     </div>
 </body>
-</html>"""
+</html>""".replace('%%DASHBOARD_CSS_URL%%', DASHBOARD_CSS_URL).replace('%%DASHBOARD_JS_URL%%', DASHBOARD_JS_URL)
 
-def get_stats(db_path=None):
-    if db_path is None:
-        db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    stats = {}
-    cursor.execute("SELECT COUNT(*) FROM predictions")
-    stats['total'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM predictions WHERE direction_correct = 1")
-    stats['correct'] = cursor.fetchone()[0]
+
+# The page shell never changes at runtime, so build it once per timeframe
+# Minified once here; the rendered fragments are spliced in per request
+def _timeframe_values(timeframe):
+    """The placeholders that depend only on the timeframe."""
+    return {
+        'TIMEFRAME_LABEL': TIMEFRAMES[timeframe]['label'],
+        'TAB_5_ACTIVE': 'active' if timeframe == '5' else '',
+        'TAB_15_ACTIVE': 'active' if timeframe == '15' else '',
+        'TAB_60_ACTIVE': 'active' if timeframe == '60' else '',
+        'PREDICTION_DURATION': str(TIMEFRAMES[timeframe]['interval'] * 60),
+    }
+
+
+def _bake(html, values):
+    """Fill the placeholders named in `values`, leaving the rest for render time."""
+    return re.sub(r'%%([A-Z0-9_]+)%%', lambda m: values.get(m.group(1), m.group(0)), html)
+
+
+TEMPLATES = {tf: _bake(_minify_html(get_html_template(tf)), _timeframe_values(tf)) for tf in TIMEFRAMES}
+
+# Each template split once into literal text (even indices) and
+# placeholder names (odd indices)
+TEMPLATE_TOKENS = {tf: re.split(r'%%([A-Z0-9_]+)%%', html) for tf, html in TEMPLATES.items()}
+
+
+def render_template(timeframe, values):
+    """Fill a template's placeholders from `values` in a single pass."""
+    parts = TEMPLATE_TOKENS[timeframe][:]
+    parts[1::2] = [values[name] for name in parts[1::2]]
+    return ''.join(parts)
+
+
+def _precompress_template(html):
+    """Gzip the static head of a template (everything before the first
+    placeholder) and keep the compressor so each response can resume it."""
+    prefix = html[:re.search(r'%%[A-Z0-9_]+%%', html).start()]
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)  # wbits 31 -> gzip container
+    head = compressor.compress(prefix.encode('utf-8'))
+    return len(prefix), head, compressor
+
+
+# Everything ahead of the first placeholder (the <head> up to the middle of
+# its inline per-render script) is compressed exactly once here, and only
+# the rendered remainder is deflated per request.
+GZIP_TEMPLATES = {tf: _precompress_template(html) for tf, html in TEMPLATES.items()}
+
+# The same heads uncompressed, for streaming a page that isn't cached yet
+TEMPLATE_HEADS = {tf: TEMPLATES[tf][:prefix_len].encode('utf-8') for tf, (prefix_len, _, _) in GZIP_TEMPLATES.items()}
+
+
+def gzip_page(timeframe, html):
+    """Gzip a page rendered from TEMPLATES[timeframe], reusing the work
+    already done on its static head."""
+    prefix_len, head, compressor = GZIP_TEMPLATES[timeframe]
+    compressor = compressor.copy()
+    return head + compressor.compress(html[prefix_len:].encode('utf-8')) + compressor.flush()
+
+# All of get_stats' and get_local_llm_stats' counters in one pass;
+# idx_pred_stats covers it
+STATS_SQL = """
+    SELECT
+        COUNT(*),
+        COUNT(CASE WHEN direction_correct = 1 THEN 1 END),
+        COUNT(resolved_at),
+        AVG(CASE WHEN resolved_at IS NOT NULL THEN target_error_pct END),
+        AVG(CASE WHEN resolved_at IS NOT NULL THEN calibration_score END),
+        COUNT(CASE WHEN is_extreme = 1 THEN 1 END),
+        COUNT(CASE WHEN source = 'local_llm' THEN 1 END),
+        COUNT(CASE WHEN source = 'local_llm' AND resolved_at IS NOT NULL THEN 1 END),
+        COUNT(CASE WHEN source = 'local_llm' AND direction_correct = 1 THEN 1 END),
+        AVG(CASE WHEN source = 'local_llm' AND resolved_at IS NOT NULL THEN target_error_pct END)
+        {meta}
+    FROM predictions
+"""
+
+# Same round trip, plus the active meta-rule count and last analysis point
+STATS_WITH_META_SQL = STATS_SQL.format(meta="""
+        , (SELECT COUNT(CASE WHEN is_active = 1 THEN 1 END) FROM meta_learnings)
+        , (SELECT COALESCE(MAX(predictions_analyzed), 0) FROM meta_learnings)
+""")
+STATS_SQL = STATS_SQL.format(meta='')
+
+def get_all_stats(db_path):
+    """(get_stats(), get_local_llm_stats()) from a single query."""
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute("SELECT COUNT(*) FROM predictions WHERE resolved_at IS NOT NULL")
-    stats['resolved'] = cursor.fetchone()[0]
+        has_meta = _has_table(cursor, db_path, 'meta_learnings')
+        cursor.execute(STATS_WITH_META_SQL if has_meta else STATS_SQL)
+        row = cursor.fetchone()
+    total, correct, resolved, avg_error, calibration, extremes = row[:6]
+    stats = {'total': total, 'correct': correct, 'resolved': resolved}
     
     stats['accuracy'] = (stats['correct'] / stats['resolved'] * 100) if stats['resolved'] > 0 else 0
     stats['accuracy_class'] = 'success' if stats['accuracy'] >= 55 else 'error' if stats['accuracy'] < 45 else 'warning'
-    
-    cursor.execute("SELECT AVG(target_error_pct) FROM predictions WHERE resolved_at IS NOT NULL")
-    stats['avg_error'] = cursor.fetchone()[0] or 0
-    
-    cursor.execute("SELECT AVG(calibration_score) FROM predictions WHERE resolved_at IS NOT NULL")
-    stats['calibration'] = cursor.fetchone()[0] or 0
-    
-    cursor.execute("SELECT COUNT(*) FROM predictions WHERE is_extreme = 1")
-    stats['extremes'] = cursor.fetchone()[0]
+    stats['avg_error'] = avg_error or 0
+    stats['calibration'] = calibration or 0
+    stats['extremes'] = extremes
     
     # Meta rules count and next analysis
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='meta_learnings'")
-    if cursor.fetchone():
-        cursor.execute("SELECT COUNT(*) FROM meta_learnings WHERE is_active = 1")
-        stats['meta_rules'] = cursor.fetchone()[0]
-        cursor.execute("SELECT MAX(predictions_analyzed) FROM meta_learnings")
-        last_analyzed = cursor.fetchone()[0] or 0
+    if has_meta:
+        stats['meta_rules'], last_analyzed = row[10:]
         stats['next_meta'] = max(0, (last_analyzed + 100) - stats['total'])
     else:
         stats['meta_rules'] = 0
         stats['next_meta'] = 100 - stats['total'] if stats['total'] < 100 else 0
     
-    conn.close()
-    return stats
+    # Local LLM predictions only
+    local_total, local_resolved, local_correct, local_error = row[6:10]
+    local_llm_stats = {
+        'total': local_total,
+        'resolved': local_resolved,
+        'correct': local_correct,
+        'accuracy': (local_correct / local_resolved * 100) if local_resolved > 0 else 0,
+        'avg_error': local_error or 0,
+    }
+    return stats, local_llm_stats
+
+def get_stats(db_path=None):
+    if db_path is None:
+        db_path = get_db_path()
+    return get_all_stats(db_path)[0]
+
+# Columns render_current_prediction reads
+_CURRENT_KEYS = (
+    'id', 'timestamp', 'timestamp_ms', 'predicted_direction', 'predicted_target',
+    'confidence', 'reasoning', 'resolved_at', 'source',
+)
+
 
 def get_current_prediction(db_path=None):
     if db_path is None:
         db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT * FROM predictions 
-        ORDER BY timestamp DESC 
-        LIMIT 1
-    """)
-    row = cursor.fetchone()
-    conn.close()
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {', '.join(_CURRENT_KEYS)} FROM predictions 
+            ORDER BY timestamp_ms DESC 
+            LIMIT 1
+        """)
+        row = cursor.fetchone()
     return dict(row) if row else None
 
 
@@ -1903,145 +2541,147 @@ def get_btc_price_for_resolution():
         return None
 
 
+# Resolves every due local LLM prediction against one price in a single
+# set-based UPDATE, so the scoring math runs inside SQLite rather than as a
+# per-row Python loop. SET expressions see the pre-update row.
+AUTO_RESOLVE_SQL = """
+    UPDATE predictions SET
+        actual_price = :price,
+        actual_direction = CASE WHEN :price > current_price THEN 'UP' ELSE 'DOWN' END,
+        direction_correct = (CASE WHEN :price > current_price THEN 'UP' ELSE 'DOWN' END) = predicted_direction,
+        target_error_pct = ABS(:price - predicted_target) / predicted_target * 100,
+        calibration_score = CASE
+            WHEN (CASE WHEN :price > current_price THEN 'UP' ELSE 'DOWN' END) = predicted_direction
+            THEN 100 - ABS(:price - predicted_target) / predicted_target * 100
+            ELSE -ABS(:price - predicted_target) / predicted_target * 100
+        END,
+        resolved_at = :now
+    WHERE source = 'local_llm'
+    AND resolved_at IS NULL
+    AND timestamp_ms < :cutoff
+"""
+
+
 def auto_resolve_local_llm_predictions(db_path, timeframe_mins=5):
     """Auto-resolve local LLM predictions that are past their resolution time."""
-    from datetime import datetime, timezone, timedelta
-    
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
     
-    # Check if source column exists
-    cursor.execute("PRAGMA table_info(predictions)")
-    columns = [col[1] for col in cursor.fetchall()]
-    if 'source' not in columns:
-        conn.close()
+    # Migration adds the source/timestamp_ms columns this relies on
+    if not _ensure_schema(db_path, create=False):
         return 0
     
-    # Find unresolved local LLM predictions older than timeframe
-    cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=timeframe_mins)
-    cutoff_str = cutoff_time.isoformat()
-    
-    cursor.execute("""
-        SELECT * FROM predictions 
-        WHERE source = 'local_llm' 
-        AND resolved_at IS NULL 
-        AND timestamp < ?
-    """, (cutoff_str,))
+    pool = get_pool(db_path)
     
-    pending = cursor.fetchall()
+    # Find unresolved local LLM predictions older than timeframe
+    cutoff_ms = int((time.time() - timeframe_mins * 60) * 1000)
+    
+    with pool.reader() as conn:
+        pending = conn.execute("""
+            SELECT id, predicted_direction, current_price FROM predictions 
+            WHERE source = 'local_llm' 
+            AND resolved_at IS NULL 
+            AND timestamp_ms < ?
+        """, (cutoff_ms,)).fetchall()
     if not pending:
-        conn.close()
         return 0
     
-    # Get current price
+    # Get current price (outside the writer lock - this is a network call)
     actual_price = get_btc_price_for_resolution()
     if actual_price is None:
-        conn.close()
         return 0
     
-    resolved_count = 0
     now = datetime.now(timezone.utc).isoformat()
     
+    with pool.writer() as conn:
+        resolved_count = conn.execute(AUTO_RESOLVE_SQL, {
+            'price': actual_price, 'now': now, 'cutoff': cutoff_ms
+        }).rowcount
+    
     for pred in pending:
-        pred = dict(pred)
-        
-        # Calculate results
         actual_direction = "UP" if actual_price > pred['current_price'] else "DOWN"
-        direction_correct = 1 if actual_direction == pred['predicted_direction'] else 0
-        target_error_pct = abs(actual_price - pred['predicted_target']) / pred['predicted_target'] * 100
-        
-        # Calculate calibration
-        if direction_correct:
-            calibration = 100 - target_error_pct
-        else:
-            calibration = -target_error_pct
-        
-        # Update prediction
-        cursor.execute("""
-            UPDATE predictions SET
-                actual_price = ?,
-                actual_direction = ?,
-                direction_correct = ?,
-                target_error_pct = ?,
-                calibration_score = ?,
-                resolved_at = ?
-            WHERE id = ?
-        """, (actual_price, actual_direction, direction_correct, target_error_pct, calibration, now, pred['id']))
-        
-        resolved_count += 1
-        print(f"Auto-resolved Local LLM prediction #{pred['id']}: {pred['predicted_direction']} -> {actual_direction} ({'✓' if direction_correct else '✗'})")
-    
-    conn.commit()
-    conn.close()
+        print(f"Auto-resolved Local LLM prediction #{pred['id']}: {pred['predicted_direction']} -> {actual_direction} ({'✓' if actual_direction == pred['predicted_direction'] else '✗'})")
+    
     return resolved_count
 
 
+def _next_local_llm_due(db_path, timeframe_mins):
+    """Epoch ms at which the oldest pending local LLM prediction comes due
+    (inf if none is pending)."""
+    if not _ensure_schema(db_path, create=False):
+        return float('inf')
+    with get_pool(db_path).reader() as conn:
+        oldest = conn.execute("""
+            SELECT MIN(timestamp_ms) FROM predictions
+            WHERE source = 'local_llm' AND resolved_at IS NULL
+        """).fetchone()[0]
+    return float('inf') if oldest is None else oldest + timeframe_mins * 60 * 1000
+
+
+def _resolve_due_local_llm(timeframe):
+    """Auto-resolve local LLM predictions once one comes due.
+    
+    Called ahead of each page, /api/state and event-stream check rather
+    than from a render, since neither a 304 nor an idle stream renders and
+    no commit marks the moment a prediction comes due. The due time only
+    changes with a commit, so it's cached per stamp and the check is a
+    clock comparison; the resolve itself runs at most once per stamp per
+    cache TTL, which spaces out retries while the price fetch fails.
+    """
+    db_path = get_db_path(timeframe)
+    interval = TIMEFRAMES[timeframe]['interval']
+    stamp = get_pool(db_path).stamp()
+    due_ms = cached(('local_llm.due', timeframe, stamp), lambda: _next_local_llm_due(db_path, interval))
+    if due_ms >= time.time() * 1000:
+        return
+    def resolve():
+        resolved = auto_resolve_local_llm_predictions(db_path, interval)
+        if resolved > 0:
+            print(f"Auto-resolved {resolved} Local LLM prediction(s)")
+        return resolved
+    cached(('local_llm.resolve', timeframe, stamp), resolve)
+
+
 def get_local_llm_stats(db_path):
     """Get statistics for local LLM predictions only."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    stats = {'total': 0, 'resolved': 0, 'correct': 0, 'accuracy': 0, 'avg_error': 0}
-    
-    # Check if source column exists
-    cursor.execute("PRAGMA table_info(predictions)")
-    columns = [col[1] for col in cursor.fetchall()]
-    if 'source' not in columns:
-        conn.close()
-        return stats
-    
-    cursor.execute("SELECT COUNT(*) FROM predictions WHERE source = 'local_llm'")
-    stats['total'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM predictions WHERE source = 'local_llm' AND resolved_at IS NOT NULL")
-    stats['resolved'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM predictions WHERE source = 'local_llm' AND direction_correct = 1")
-    stats['correct'] = cursor.fetchone()[0]
-    
-    stats['accuracy'] = (stats['correct'] / stats['resolved'] * 100) if stats['resolved'] > 0 else 0
-    
-    cursor.execute("SELECT AVG(target_error_pct) FROM predictions WHERE source = 'local_llm' AND resolved_at IS NOT NULL")
-    avg_error = cursor.fetchone()[0]
-    stats['avg_error'] = avg_error if avg_error else 0
-    
-    conn.close()
-    return stats
+    return get_all_stats(db_path)[1]
+
+
+# Columns render_local_llm_current reads
+_LOCAL_LLM_KEYS = (
+    'timestamp', 'predicted_direction', 'predicted_target', 'confidence',
+    'reasoning', 'resolved_at', 'direction_correct', 'target_error_pct',
+)
 
 
 def get_local_llm_current(db_path):
     """Get the most recent local LLM prediction."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Check if source column exists
-    cursor.execute("PRAGMA table_info(predictions)")
-    columns = [col[1] for col in cursor.fetchall()]
-    if 'source' not in columns:
-        conn.close()
-        return None
-    
-    cursor.execute("""
-        SELECT * FROM predictions 
-        WHERE source = 'local_llm'
-        ORDER BY timestamp DESC 
-        LIMIT 1
-    """)
-    row = cursor.fetchone()
-    conn.close()
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
+    
+        cursor.execute(f"""
+            SELECT {', '.join(_LOCAL_LLM_KEYS)} FROM predictions 
+            WHERE source = 'local_llm'
+            ORDER BY timestamp_ms DESC 
+            LIMIT 1
+        """)
+        row = cursor.fetchone()
     return dict(row) if row else None
 
 
+# (css class, arrow) for a predicted direction; anything but UP shows as down
+DIRECTION_BADGES = {'UP': ('up', '↑')}
+DOWN_BADGE = ('down', '↓')
+
+# (css class, mark) indexed by whether the direction call was right
+RESULT_BADGES = (('result-wrong', '✗'), ('result-correct', '✓'))
+
+
 def render_local_llm_current(pred):
     """Render the current local LLM prediction HTML."""
     if not pred:
         return '<div class="local-llm-empty">No predictions from local LLM yet. Push predictions using the API.</div>'
     
     direction = pred['predicted_direction']
-    dir_class = 'up' if direction == 'UP' else 'down'
-    arrow = '↑' if direction == 'UP' else '↓'
+    dir_class, arrow = DIRECTION_BADGES.get(direction, DOWN_BADGE)
     
     is_resolved = pred['resolved_at'] is not None
     time_short = pred['timestamp'][11:16] if pred['timestamp'] else '—'
@@ -2053,8 +2693,7 @@ def render_local_llm_current(pred):
     else:
         status_html = '<span style="color: var(--warning);">⏳ Waiting for resolution...</span>'
     
-    reasoning = pred.get('reasoning', '')
-    reasoning_escaped = reasoning.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;') if reasoning else ''
+    reasoning_escaped = _reasoning_html(pred)
     reasoning_html = f'<div class="local-llm-reasoning">{reasoning_escaped}</div>' if reasoning_escaped else ''
     
     return f"""
@@ -2078,275 +2717,372 @@ def render_local_llm_current(pred):
     </div>
     """
 
-def get_recent_predictions(db_path=None, limit=15):
+# Longest reasoning the history table and /api/reasoning ship; LLM output
+# can run to many KB and the rest is cut off in SQL
+REASONING_MAX_CHARS = 2000
+
+# Columns render_predictions unpacks, in order, from each history row; the
+# HH:MM it shows is cut out of the ISO timestamp by SQLite. The reasoning
+# follows them (see render_recent_predictions)
+_PRED_KEYS = (
+    'id', 'substr(timestamp, 12, 5) AS time_short', 'current_price', 'predicted_direction', 'predicted_target',
+    'confidence', 'actual_price', 'direction_correct', 'target_error_pct', 'calibration_score', 'is_extreme',
+    'source',
+)
+
+
+def render_recent_predictions(db_path=None, limit=15):
+    """The history table rows for the most recent resolved predictions.
+    
+    Renders straight off the cursor as plain tuples (see _PRED_KEYS), so no
+    row objects or intermediate list are built for the table. Only the
+    first REASONING_EAGER_ROWS rows carry their (capped) reasoning; the
+    rest are NULL and fetched through /api/reasoning when expanded.
+    """
     if db_path is None:
         db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT * FROM predictions 
-        WHERE resolved_at IS NOT NULL
-        ORDER BY timestamp DESC 
-        LIMIT ?
-    """, (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"""
+            SELECT {', '.join(_PRED_KEYS)},
+                CASE WHEN timestamp_ms >= coalesce((
+                    SELECT timestamp_ms FROM predictions 
+                    WHERE resolved_at IS NOT NULL
+                    ORDER BY timestamp_ms DESC 
+                    LIMIT 1 OFFSET {REASONING_EAGER_ROWS - 1}
+                ), 0) THEN substr(reasoning, 1, {REASONING_MAX_CHARS}) END AS reasoning
+            FROM predictions 
+            WHERE resolved_at IS NOT NULL
+            ORDER BY timestamp_ms DESC 
+            LIMIT ?
+        """, (limit,))
+        return render_predictions(cursor)
+
+# render_reasoning_box's arguments, in order
+_REASONING_KEYS = (
+    'current_price', 'predicted_target', 'actual_price', 'calibration_score',
+    f'substr(reasoning, 1, {REASONING_MAX_CHARS}) AS reasoning', 'source',
+)
+
+
+def get_prediction_reasoning(db_path, prediction_id):
+    """A resolved prediction's reasoning-box fields (a tuple), or None."""
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"""
+            SELECT {', '.join(_REASONING_KEYS)} FROM predictions 
+            WHERE id = ? AND resolved_at IS NOT NULL
+        """, (prediction_id,))
+        return cursor.fetchone()
 
 def get_recent_streak(db_path=None, limit=20):
     if db_path is None:
         db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT direction_correct, resolved_at FROM predictions 
-        ORDER BY timestamp DESC 
-        LIMIT ?
-    """, (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # plain (outcome,) tuples, see STREAK_ITEMS
+        cursor.execute("""
+            SELECT CASE WHEN resolved_at IS NULL THEN 2 WHEN direction_correct THEN 1 ELSE 0 END
+            FROM predictions 
+            ORDER BY timestamp_ms DESC 
+            LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
 
 def get_learnings(db_path=None, limit=5):
     if db_path is None:
         db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT extreme_reason, learning_extracted FROM predictions 
-        WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
-        ORDER BY timestamp DESC 
-        LIMIT ?
-    """, (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT extreme_reason, learning_extracted FROM predictions 
+            WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
+            ORDER BY timestamp_ms DESC 
+            LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
+
+# Columns render_meta_rules / render_verifier_meta_rules read
+_META_RULE_KEYS = ('id', 'pattern_type', 'pattern_description', 'meta_rule', 'confidence_score')
+
 
 def get_meta_rules(db_path=None, limit=5):
     if db_path is None:
         db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='meta_learnings'")
-    if not cursor.fetchone():
-        conn.close()
-        return []
-    
-    cursor.execute("""
-        SELECT * FROM meta_learnings 
-        WHERE is_active = 1
-        ORDER BY confidence_score DESC, timestamp DESC
-        LIMIT ?
-    """, (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
+    
+        if not _has_table(cursor, db_path, 'meta_learnings'):
+            return []
+    
+        cursor.execute(f"""
+            SELECT {', '.join(_META_RULE_KEYS)} FROM meta_learnings 
+            WHERE is_active = 1
+            ORDER BY confidence_score DESC, timestamp DESC
+            LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
 
 def get_verifier_stats(db_path):
     """Get GPT-4 verifier statistics."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
     
-    stats = {'total': 0, 'resolved': 0, 'correct': 0, 'accuracy': 0, 'catches': 0, 'false_alarms': 0}
+        stats = {'total': 0, 'resolved': 0, 'correct': 0, 'accuracy': 0, 'catches': 0, 'false_alarms': 0}
     
-    # Check if table exists
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='verifier_predictions'")
-    if not cursor.fetchone():
-        conn.close()
-        return stats
+        # Check if table exists
+        if not _has_table(cursor, db_path, 'verifier_predictions'):
+            return stats
     
-    cursor.execute("SELECT COUNT(*) FROM verifier_predictions")
-    stats['total'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM verifier_predictions WHERE resolved_at IS NOT NULL")
-    stats['resolved'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM verifier_predictions WHERE gpt_was_correct = 1")
-    stats['correct'] = cursor.fetchone()[0]
-    
-    stats['accuracy'] = (stats['correct'] / stats['resolved'] * 100) if stats['resolved'] > 0 else 0
-    
-    # Catches: GPT disagreed and was right (Claude was wrong)
-    cursor.execute("""
-        SELECT COUNT(*) FROM verifier_predictions vp
-        JOIN predictions p ON vp.prediction_id = p.id
-        WHERE vp.agrees_with_claude = 0 AND p.direction_correct = 0
-    """)
-    stats['catches'] = cursor.fetchone()[0]
-    
-    # False alarms: GPT disagreed but was wrong (Claude was right)
-    cursor.execute("""
-        SELECT COUNT(*) FROM verifier_predictions vp
-        JOIN predictions p ON vp.prediction_id = p.id
-        WHERE vp.agrees_with_claude = 0 AND p.direction_correct = 1
-    """)
-    stats['false_alarms'] = cursor.fetchone()[0]
-    
-    conn.close()
+        # Catches: GPT disagreed and was right (Claude was wrong)
+        # False alarms: GPT disagreed but was wrong (Claude was right)
+        cursor.execute("""
+            SELECT
+                COUNT(*),
+                COUNT(vp.resolved_at),
+                COUNT(CASE WHEN vp.gpt_was_correct = 1 THEN 1 END),
+                COUNT(CASE WHEN vp.agrees_with_claude = 0 AND p.direction_correct = 0 THEN 1 END),
+                COUNT(CASE WHEN vp.agrees_with_claude = 0 AND p.direction_correct = 1 THEN 1 END)
+            FROM verifier_predictions vp
+            LEFT JOIN predictions p ON vp.prediction_id = p.id
+        """)
+        stats['total'], stats['resolved'], stats['correct'], stats['catches'], stats['false_alarms'] = cursor.fetchone()
+        stats['accuracy'] = (stats['correct'] / stats['resolved'] * 100) if stats['resolved'] > 0 else 0
     return stats
 
 
 def get_verifier_meta_rules(db_path, limit=5):
     """Get GPT-4 verifier meta-rules."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='verifier_meta_learnings'")
-    if not cursor.fetchone():
-        conn.close()
-        return []
-    
-    cursor.execute("""
-        SELECT * FROM verifier_meta_learnings 
-        WHERE is_active = 1
-        ORDER BY confidence_score DESC, timestamp DESC
-        LIMIT ?
-    """, (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
+    
+        if not _has_table(cursor, db_path, 'verifier_meta_learnings'):
+            return []
+    
+        cursor.execute(f"""
+            SELECT {', '.join(_META_RULE_KEYS)} FROM verifier_meta_learnings 
+            WHERE is_active = 1
+            ORDER BY confidence_score DESC, timestamp DESC
+            LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
 
 
 def get_verifier_learnings(db_path, limit=5):
     """Get recent verifier learnings (extreme cases with extracted learnings)."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='verifier_predictions'")
-    if not cursor.fetchone():
-        conn.close()
-        return []
+        if not _has_table(cursor, db_path, 'verifier_predictions'):
+            return []
     
-    cursor.execute("""
-        SELECT vp.*, p.direction_correct as claude_correct
-        FROM verifier_predictions vp
-        JOIN predictions p ON vp.prediction_id = p.id
-        WHERE vp.is_extreme = 1 AND vp.learning_extracted IS NOT NULL
-        ORDER BY vp.timestamp DESC
-        LIMIT ?
-    """, (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+        cursor.execute("""
+            SELECT vp.extreme_reason, vp.learning_extracted
+            FROM verifier_predictions vp
+            JOIN predictions p ON vp.prediction_id = p.id
+            WHERE vp.is_extreme = 1 AND vp.learning_extracted IS NOT NULL
+            ORDER BY vp.timestamp DESC
+            LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
 
 
 def get_verifier_learnings_count(db_path):
     """Get count of verifier learnings."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='verifier_predictions'")
-    if not cursor.fetchone():
-        conn.close()
-        return 0
+        if not _has_table(cursor, db_path, 'verifier_predictions'):
+            return 0
     
-    cursor.execute("SELECT COUNT(*) FROM verifier_predictions WHERE is_extreme = 1 AND learning_extracted IS NOT NULL")
-    count = cursor.fetchone()[0]
-    conn.close()
+        cursor.execute("SELECT COUNT(*) FROM verifier_predictions WHERE is_extreme = 1 AND learning_extracted IS NOT NULL")
+        count = cursor.fetchone()[0]
     return count
 
 
 def get_consensus_stats(db_path):
     """Get consensus outcome statistics."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    stats = {'agreed': 0, 'disagreed': 0, 'agreed_win_rate': 0, 'catches': 0, 'false_alarms': 0, 'blind_spots': 0}
-    
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='consensus_outcomes'")
-    if not cursor.fetchone():
-        conn.close()
-        return stats
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE models_agreed = 1")
-    stats['agreed'] = cursor.fetchone()[0]
+        stats = {'agreed': 0, 'disagreed': 0, 'agreed_win_rate': 0, 'catches': 0, 'false_alarms': 0, 'blind_spots': 0}
     
-    cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE models_agreed = 0")
-    stats['disagreed'] = cursor.fetchone()[0]
+        if not _has_table(cursor, db_path, 'consensus_outcomes'):
+            return stats
     
-    cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE models_agreed = 1 AND claude_correct = 1")
-    agreed_wins = cursor.fetchone()[0]
-    stats['agreed_win_rate'] = (agreed_wins / stats['agreed'] * 100) if stats['agreed'] > 0 else 0
-    
-    cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE outcome_type = 'gpt_caught_error'")
-    stats['catches'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE outcome_type = 'gpt_false_alarm'")
-    stats['false_alarms'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE outcome_type = 'shared_blind_spot'")
-    stats['blind_spots'] = cursor.fetchone()[0]
-    
-    conn.close()
+        cursor.execute("""
+            SELECT
+                COUNT(CASE WHEN models_agreed = 1 THEN 1 END),
+                COUNT(CASE WHEN models_agreed = 0 THEN 1 END),
+                COUNT(CASE WHEN models_agreed = 1 AND claude_correct = 1 THEN 1 END),
+                COUNT(CASE WHEN outcome_type = 'gpt_caught_error' THEN 1 END),
+                COUNT(CASE WHEN outcome_type = 'gpt_false_alarm' THEN 1 END),
+                COUNT(CASE WHEN outcome_type = 'shared_blind_spot' THEN 1 END)
+            FROM consensus_outcomes
+        """)
+        stats['agreed'], stats['disagreed'], agreed_wins, stats['catches'], stats['false_alarms'], stats['blind_spots'] = cursor.fetchone()
+        stats['agreed_win_rate'] = (agreed_wins / stats['agreed'] * 100) if stats['agreed'] > 0 else 0
     return stats
 
 
+# Columns the inline verification block reads
+_VERIFIER_KEYS = ('agrees_with_claude', 'confidence_claude_correct', 'concerns', 'reasoning')
+
+
 def get_current_verifier_prediction(db_path, prediction_id):
     """Get the verifier prediction for a given prediction."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with get_pool(db_path).reader() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='verifier_predictions'")
-    if not cursor.fetchone():
-        conn.close()
-        return None
+        if not _has_table(cursor, db_path, 'verifier_predictions'):
+            return None
     
-    cursor.execute("""
-        SELECT * FROM verifier_predictions WHERE prediction_id = ?
-    """, (prediction_id,))
-    row = cursor.fetchone()
-    conn.close()
+        columns = _projection(cursor, db_path, 'verifier_predictions', _VERIFIER_KEYS)
+        cursor.execute(f"""
+            SELECT {columns} FROM verifier_predictions WHERE prediction_id = ?
+        """, (prediction_id,))
+        row = cursor.fetchone()
     return dict(row) if row else None
 
 
+def _escape(text):
+    """escape(text, quote=False), returning clean text as-is; the three
+    membership tests cost far less than html.escape's replace chain."""
+    if '&' in text or '<' in text or '>' in text:
+        return escape(text, quote=False)
+    return text
+
+
+def _reasoning_html(row):
+    """Escaped reasoning for a predictions/verifier row ('' when empty)."""
+    reasoning = row['reasoning']
+    return _escape(reasoning) if reasoning else ''
+
+
+def _render_concerns(concerns):
+    if not concerns:
+        return ""
+    concerns_items = "".join([f"<li>{c}</li>" for c in concerns[:3]])
+    return f'<ul class="verification-concerns">{concerns_items}</ul>'
+
+
+@lru_cache(maxsize=256)
+def _concerns_html(concerns_json):
+    """Verifier concerns list from its stored JSON text, parsed once per value."""
+    try:
+        concerns = _loads(concerns_json)
+    except:
+        concerns = []
+    return _render_concerns(concerns)
+
+
+def _timestamp_unix(pred):
+    """Epoch seconds of a prediction (0 if unknown), read from timestamp_ms
+    when the row has it so renders skip the ISO parse."""
+    timestamp_ms = pred.get('timestamp_ms')
+    if timestamp_ms is not None:
+        return timestamp_ms / 1000
+    try:
+        return datetime.fromisoformat(pred['timestamp'].replace('Z', '+00:00')).timestamp()
+    except:
+        return 0
+
+
+# Current prediction card, its GPT-4 verification block and the consensus
+# badges, minified once here like the list rows
+CURRENT_PREDICTION_CARD = _minify_html("""
+    <div class="current-prediction">
+        <div class="current-prediction-header">
+            <span class="current-prediction-label">🔮 CURRENT PREDICTION • {status}</span>{source_badge}
+            <span class="current-prediction-time" id="time-remaining">{time_str}</span>
+        </div>
+        <div class="current-prediction-main">
+            <div class="direction-badge {dir_class}">
+                <span class="arrow">{arrow}</span>
+                {direction}
+            </div>
+            <div class="prediction-target">${target:,.2f}</div>
+            <div class="prediction-confidence">
+                <div class="confidence-value">{confidence}%</div>
+                <div class="confidence-label">confidence</div>
+            </div>
+        </div>
+        <div class="progress-bar">
+            <div class="progress-fill" id="progress-fill" style="width: {progress}%"></div>
+        </div>
+        <div class="prediction-reasoning expandable-card" data-toggle="expand" data-id="current-reasoning">
+            <div class="expandable-short" id="current-reasoning-short">{reasoning_short} <span class="expand-hint">Click to expand</span></div>
+            <div class="expandable-full" id="current-reasoning-full" style="display: none;">{reasoning} <span class="expand-hint">Click to collapse</span></div>
+        </div>
+        {verification_html}
+        {consensus_html}
+    </div>
+""")
+
+VERIFICATION_BLOCK = _minify_html("""
+    <div class="verification-inline">
+        <div class="verification-header">
+            <span style="font-size: 12px; color: #10a37f; font-weight: 600;">🔍 GPT-4 VERIFICATION</span>
+        </div>
+        <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 8px;">
+            <span class="verification-verdict {verdict_class}">{verdict_text}</span>
+            <span class="verification-confidence">{confidence}%</span>
+        </div>
+        <div class="verification-reasoning">{reasoning_short}</div>
+        {concerns_html}
+    </div>
+""")
+
+# Consensus signal badges by class; they have no per-prediction fields
+CONSENSUS_BLOCKS = {
+    consensus_class: _minify_html(f"""
+        <div class="consensus-inline {consensus_class}">
+            <div class="consensus-type">CONSENSUS SIGNAL</div>
+            <div class="consensus-name">{consensus_name}</div>
+        </div>
+    """)
+    for consensus_class, consensus_name in (
+        ('strong', 'CONSENSUS STRONG'),
+        ('weak', 'CONSENSUS WEAK'),
+        ('veto', 'VERIFIER VETO'),
+        ('disagreement', 'DISAGREEMENT'),
+    )
+}
+
+
 def render_current_prediction(pred, verifier_pred=None, interval_mins=5):
     if not pred:
         return '<div class="current-prediction"><div class="no-prediction">No predictions yet. Start the predictor to begin.</div></div>', 0, True
     
     direction = pred['predicted_direction']
-    dir_class = 'up' if direction == 'UP' else 'down'
-    arrow = '↑' if direction == 'UP' else '↓'
+    dir_class, arrow = DIRECTION_BADGES.get(direction, DOWN_BADGE)
     
     # Calculate timestamp for JS
     is_resolved = pred['resolved_at'] is not None
-    try:
-        pred_time = datetime.fromisoformat(pred['timestamp'].replace('Z', '+00:00'))
-        timestamp_unix = pred_time.timestamp()
-    except:
-        timestamp_unix = 0
+    timestamp_unix = _timestamp_unix(pred)
     
     # Calculate time remaining if not resolved
     interval_secs = interval_mins * 60
     if not is_resolved:
-        try:
-            now = datetime.now(timezone.utc)
-            elapsed = (now - pred_time).total_seconds()
+        if timestamp_unix:
+            elapsed = time.time() - timestamp_unix
             remaining = max(0, interval_secs - elapsed)
             mins = int(remaining // 60)
             secs = int(remaining % 60)
             time_str = f"{mins}:{secs:02d} remaining"
             progress = min(100, (elapsed / interval_secs) * 100)
-        except:
+        else:
             time_str = "Waiting..."
             progress = 50
         status = "WAITING FOR RESOLUTION"
-        status_icon = "⏳"
     else:
         time_str = "✓ resolved"
         progress = 100
         status = "RESOLVED"
-        status_icon = "✓"
     
-    reasoning = pred.get('reasoning', '')
-    reasoning_escaped = reasoning.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;') if reasoning else 'No reasoning recorded'
+    reasoning_escaped = _reasoning_html(pred) or 'No reasoning recorded'
     reasoning_short = reasoning_escaped[:150] + '...' if len(reasoning_escaped) > 150 else reasoning_escaped
     
     # Source badge
@@ -2363,170 +3099,228 @@ def render_current_prediction(pred, verifier_pred=None, interval_mins=5):
     if verifier_pred:
         agrees = verifier_pred.get('agrees_with_claude', True)
         confidence = verifier_pred.get('confidence_claude_correct', 50)
-        v_reasoning = verifier_pred.get('reasoning', '')
         concerns = verifier_pred.get('concerns', [])
         
-        if isinstance(concerns, str):
-            try:
-                concerns = json.loads(concerns)
-            except:
-                concerns = []
-        
-        verdict_class = 'agrees' if agrees else 'disagrees'
-        verdict_text = '✓ AGREES' if agrees else '✗ DISAGREES'
-        
-        v_reasoning_escaped = v_reasoning.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;') if v_reasoning else ''
-        v_reasoning_short = v_reasoning_escaped[:100] + '...' if len(v_reasoning_escaped) > 100 else v_reasoning_escaped
+        v_reasoning_escaped = _reasoning_html(verifier_pred)
         
-        concerns_html = ""
-        if concerns:
-            concerns_items = "".join([f"<li>{c}</li>" for c in concerns[:3]])
-            concerns_html = f'<ul class="verification-concerns">{concerns_items}</ul>'
-        
-        verification_html = f"""
-        <div class="verification-inline">
-            <div class="verification-header">
-                <span style="font-size: 12px; color: #10a37f; font-weight: 600;">🔍 GPT-4 VERIFICATION</span>
-            </div>
-            <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 8px;">
-                <span class="verification-verdict {verdict_class}">{verdict_text}</span>
-                <span class="verification-confidence">{confidence}%</span>
-            </div>
-            <div class="verification-reasoning">{v_reasoning_short}</div>
-            {concerns_html}
-        </div>
-        """
+        if isinstance(concerns, str):
+            concerns_html = _concerns_html(concerns)
+        else:
+            concerns_html = _render_concerns(concerns)
+        
+        verification_html = VERIFICATION_BLOCK.format(
+            verdict_class='agrees' if agrees else 'disagrees',
+            verdict_text='✓ AGREES' if agrees else '✗ DISAGREES',
+            confidence=confidence,
+            reasoning_short=v_reasoning_escaped[:100] + '...' if len(v_reasoning_escaped) > 100 else v_reasoning_escaped,
+            concerns_html=concerns_html,
+        )
         
         # Consensus signal
         if agrees:
-            if confidence >= 70:
-                consensus_class = "strong"
-                consensus_name = "CONSENSUS STRONG"
-            else:
-                consensus_class = "weak"
-                consensus_name = "CONSENSUS WEAK"
+            consensus_html = CONSENSUS_BLOCKS['strong' if confidence >= 70 else 'weak']
         else:
-            if confidence <= 30:
-                consensus_class = "veto"
-                consensus_name = "VERIFIER VETO"
-            else:
-                consensus_class = "disagreement"
-                consensus_name = "DISAGREEMENT"
-        
-        consensus_html = f"""
-        <div class="consensus-inline {consensus_class}">
-            <div class="consensus-type">CONSENSUS SIGNAL</div>
-            <div class="consensus-name">{consensus_name}</div>
-        </div>
-        """
+            consensus_html = CONSENSUS_BLOCKS['veto' if confidence <= 30 else 'disagreement']
+    
+    html = CURRENT_PREDICTION_CARD.format(
+        status=status,
+        source_badge=source_badge,
+        time_str=time_str,
+        dir_class=dir_class,
+        arrow=arrow,
+        direction=direction,
+        target=pred['predicted_target'],
+        confidence=pred['confidence'],
+        progress=progress,
+        reasoning_short=reasoning_short,
+        reasoning=reasoning_escaped,
+        verification_html=verification_html,
+        consensus_html=consensus_html,
+    )
+    return html, timestamp_unix, is_resolved
+
+# Streak cells indexed by the outcome code get_recent_streak selects
+STREAK_ITEMS = (
+    '<div class="streak-item loss">L</div>',
+    '<div class="streak-item win">W</div>',
+    '<div class="streak-item pending">?</div>',
+)
+
+def render_streak(results):
+    if not results:
+        return '<div class="empty-state">No results yet</div>'
     
-    html = f"""
-    <div class="current-prediction">
-        <div class="current-prediction-header">
-            <span class="current-prediction-label">🔮 CURRENT PREDICTION • {status}</span>{source_badge}
-            <span class="current-prediction-time" id="time-remaining">{time_str}</span>
+    # Oldest first visually
+    return ''.join([STREAK_ITEMS[outcome] for outcome, in reversed(results)])
+
+# Row markup for the list renderers, minified once here and filled with
+# str.format per row
+PREDICTION_ROW = _minify_html("""
+    <tr class="prediction-row" data-toggle="reasoning" data-id="{pred_id}">
+        <td><span class="mono">{time_short}</span> {source_badge}</td>
+        <td><span class="mini-badge {dir_class}">{dir_arrow} {direction}</span> <span class="mono">${target:,.2f}</span></td>
+        <td><span class="mono">{confidence}%</span></td>
+        <td><span class="mono">${actual:,.2f}</span></td>
+        <td><span class="{result_class}">{result}</span>{extreme_badge}</td>
+        <td><span class="mono">{error_pct:.2f}%</span> <span class="expand-hint row-hint">↓</span></td>
+    </tr>
+    <tr class="reasoning-row{expanded_class}" id="reasoning-{pred_id}"{lazy}>
+        <td colspan="6">{reasoning_box}</td>
+    </tr>
+""")
+
+# Body of a history row's reasoning row (also served by /api/reasoning)
+REASONING_BOX = _minify_html("""
+    <div class="reasoning-box">
+        <div class="reasoning-box-header">
+            <div class="reasoning-box-stat"><span>Entry:</span> <strong>${entry:,.2f}</strong></div>
+            <div class="reasoning-box-stat"><span>Target:</span> <strong>${target:,.2f}</strong></div>
+            <div class="reasoning-box-stat"><span>Actual:</span> <strong>${actual:,.2f}</strong></div>
+            <div class="reasoning-box-stat"><span>Move:</span> <strong style="color: var(--{change_class})">{move_pct:+.3f}%</strong></div>
+            <div class="reasoning-box-stat"><span>Calibration:</span> <strong>{calibration:.2f}</strong></div>
         </div>
-        <div class="current-prediction-main">
-            <div class="direction-badge {dir_class}">
-                <span class="arrow">{arrow}</span>
-                {direction}
+        <div class="reasoning-label">{source_label}</div>
+        <div class="reasoning-text">{reasoning}</div>
+    </div>
+""")
+
+# History rows whose reasoning is shown (and so rendered) up front; the
+# rest are filled in from /api/reasoning on first expand
+REASONING_EAGER_ROWS = 2
+
+LEARNING_ROW = _minify_html("""
+    <div class="learning expandable-card" data-toggle="expand" data-id="learning-{learning_id}">
+        <div class="learning-reason">{reason}</div>
+        <div class="expandable-short" id="learning-{learning_id}-short">{text_short} <span class="expand-hint">↓ expand</span></div>
+        <div class="expandable-full" id="learning-{learning_id}-full" style="display: none;">{text} <span class="expand-hint">↑ collapse</span></div>
+    </div>
+""")
+
+META_RULE_ROW = _minify_html("""
+    <div class="meta-rule expandable-card" data-toggle="expand" data-id="meta-{rule_id}">
+        <div class="meta-rule-header">
+            <span class="meta-rule-type">{pattern_type}</span>
+            <span class="meta-rule-confidence">{confidence:.0%}</span>
+        </div>
+        <div class="expandable-short" id="meta-{rule_id}-short">{meta_rule_short} <span class="expand-hint">↓ expand</span></div>
+        <div class="expandable-full" id="meta-{rule_id}-full" style="display: none;">
+            <div class="expandable-section">
+                <div class="expandable-label">Rule</div>
+                <div>{meta_rule}</div>
             </div>
-            <div class="prediction-target">${pred['predicted_target']:,.2f}</div>
-            <div class="prediction-confidence">
-                <div class="confidence-value">{pred['confidence']}%</div>
-                <div class="confidence-label">confidence</div>
+            <div class="expandable-section">
+                <div class="expandable-label">Pattern</div>
+                <div>{pattern_desc}</div>
             </div>
+            <span class="expand-hint">↑ collapse</span>
         </div>
-        <div class="progress-bar">
-            <div class="progress-fill" id="progress-fill" style="width: {progress}%"></div>
+    </div>
+""")
+
+VERIFIER_META_RULE_ROW = _minify_html("""
+    <div class="verifier-meta-rule expandable-card" data-toggle="expand" data-id="vmeta-{rule_id}">
+        <div class="verifier-meta-rule-header">
+            <span class="verifier-meta-rule-type">{pattern_type}</span>
+            <span class="verifier-meta-rule-confidence">{confidence:.0%}</span>
         </div>
-        <div class="prediction-reasoning expandable-card" onclick="toggleExpand('current-reasoning')">
-            <div class="expandable-short" id="current-reasoning-short">{reasoning_short} <span class="expand-hint">Click to expand</span></div>
-            <div class="expandable-full" id="current-reasoning-full" style="display: none;">{reasoning_escaped} <span class="expand-hint">Click to collapse</span></div>
+        <div class="expandable-short" id="vmeta-{rule_id}-short">{meta_rule_short} <span class="expand-hint">↓ expand</span></div>
+        <div class="expandable-full" id="vmeta-{rule_id}-full" style="display: none;">
+            <div class="expandable-section">
+                <div class="expandable-label">Rule</div>
+                <div>{meta_rule}</div>
+            </div>
+            <div class="expandable-section">
+                <div class="expandable-label">Pattern</div>
+                <div>{pattern_desc}</div>
+            </div>
+            <span class="expand-hint">↑ collapse</span>
         </div>
-        {verification_html}
-        {consensus_html}
     </div>
-    """
-    return html, timestamp_unix, is_resolved
+""")
 
-def render_streak(results):
-    items = []
-    for r in reversed(results):  # Oldest first visually
-        if r['resolved_at'] is None:
-            items.append('<div class="streak-item pending">?</div>')
-        elif r['direction_correct']:
-            items.append('<div class="streak-item win">W</div>')
-        else:
-            items.append('<div class="streak-item loss">L</div>')
-    
-    if not items:
-        return '<div class="empty-state">No results yet</div>'
-    
-    return ''.join(items)
+VERIFIER_LEARNING_ROW = _minify_html("""
+    <div class="learning-card verifier expandable-card" data-toggle="expand" data-id="{learning_id}">
+        <div class="learning-context {context_class}">{context_text}</div>
+        <div class="expandable-short" id="{learning_id}-short">
+            {learning_short} <span class="expand-hint">↓</span>
+        </div>
+        <div class="expandable-full" id="{learning_id}-full" style="display: none;">
+            <div class="expandable-section">
+                <div class="expandable-label">Learning</div>
+                <div>{learning}</div>
+            </div>
+            <div class="expandable-section">
+                <div class="expandable-label">Context</div>
+                <div>{extreme_reason}</div>
+            </div>
+            <span class="expand-hint">↑</span>
+        </div>
+    </div>
+""")
+
+EXTREME_BADGE = '<span class="mini-badge" style="background: var(--purple-bg); color: var(--purple); margin-left: 8px;">EXTREME</span>'
+
+
+def render_reasoning_box(entry, target, actual, calibration, reasoning, source):
+    """The expanded view of a resolved prediction: prices, move and reasoning
+    (raw, as capped by REASONING_MAX_CHARS)."""
+    if not reasoning:
+        reasoning = 'No reasoning recorded'
+    elif len(reasoning) >= REASONING_MAX_CHARS:
+        reasoning = _escape(reasoning) + '…'
+    else:
+        reasoning = _escape(reasoning)
+    price_change = actual - entry
+    return REASONING_BOX.format(
+        entry=entry,
+        target=target,
+        actual=actual,
+        change_class='success' if price_change >= 0 else 'error',
+        move_pct=(price_change / entry) * 100,
+        calibration=calibration,
+        source_label='Local LLM Analysis' if source == 'local_llm' else 'Claude Analysis',
+        # Reasoning, already HTML-escaped
+        reasoning=reasoning,
+    )
 
 def render_predictions(predictions):
+    """History table rows from an iterable of _PRED_KEYS tuples."""
     rows = []
-    for idx, p in enumerate(predictions):
-        pred_id = p.get('id', 0)
-        result_class = 'result-correct' if p['direction_correct'] else 'result-wrong'
-        result = '✓' if p['direction_correct'] else '✗'
-        
-        dir_class = 'up' if p['predicted_direction'] == 'UP' else 'down'
-        dir_arrow = '↑' if p['predicted_direction'] == 'UP' else '↓'
-        
-        time_short = p['timestamp'][11:16] if p['timestamp'] else '—'
-        
-        # Get reasoning and escape HTML
-        reasoning = p.get('reasoning', '') or 'No reasoning recorded'
-        reasoning = reasoning.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        
-        # Calculate price change
-        price_change = p['actual_price'] - p['current_price']
-        price_change_pct = (price_change / p['current_price']) * 100
-        change_class = 'success' if price_change >= 0 else 'error'
-        
-        # Check if extreme
-        is_extreme = p.get('is_extreme', False)
-        extreme_badge = '<span class="mini-badge" style="background: var(--purple-bg); color: var(--purple); margin-left: 8px;">EXTREME</span>' if is_extreme else ''
+    row = PREDICTION_ROW.format
+    for idx, (pred_id, time_short, entry, direction, target, confidence, actual, direction_correct,
+              error_pct, calibration, is_extreme, source, reasoning) in enumerate(predictions):
+        dir_class, dir_arrow = DIRECTION_BADGES.get(direction, DOWN_BADGE)
+        result_class, result = RESULT_BADGES[bool(direction_correct)]
         
         # Source badge (local LLM vs Claude)
-        source = p.get('source', 'claude')
         if source == 'local_llm':
             source_badge = '<span class="source-badge local-llm">🏠 Local</span>'
-            source_label = 'Local LLM Analysis'
         else:
             source_badge = '<span class="source-badge claude">🤖 Claude</span>'
-            source_label = 'Claude Analysis'
-        
-        # First 2 rows expanded by default
-        expanded_class = ' visible' if idx < 2 else ''
-        
-        rows.append(f"""
-            <tr class="prediction-row" onclick="toggleReasoning({pred_id})">
-                <td><span class="mono">{time_short}</span> {source_badge}</td>
-                <td><span class="mini-badge {dir_class}">{dir_arrow} {p['predicted_direction']}</span> <span class="mono">${p['predicted_target']:,.2f}</span></td>
-                <td><span class="mono">{p['confidence']}%</span></td>
-                <td><span class="mono">${p['actual_price']:,.2f}</span></td>
-                <td><span class="{result_class}">{result}</span>{extreme_badge}</td>
-                <td><span class="mono">{p['target_error_pct']:.2f}%</span> <span class="expand-hint row-hint">↓</span></td>
-            </tr>
-            <tr class="reasoning-row{expanded_class}" id="reasoning-{pred_id}">
-                <td colspan="6">
-                    <div class="reasoning-box">
-                        <div class="reasoning-box-header">
-                            <div class="reasoning-box-stat"><span>Entry:</span> <strong>${p['current_price']:,.2f}</strong></div>
-                            <div class="reasoning-box-stat"><span>Target:</span> <strong>${p['predicted_target']:,.2f}</strong></div>
-                            <div class="reasoning-box-stat"><span>Actual:</span> <strong>${p['actual_price']:,.2f}</strong></div>
-                            <div class="reasoning-box-stat"><span>Move:</span> <strong style="color: var(--{change_class})">{price_change_pct:+.3f}%</strong></div>
-                            <div class="reasoning-box-stat"><span>Calibration:</span> <strong>{p.get('calibration_score', 0):.2f}</strong></div>
-                        </div>
-                        <div class="reasoning-label">{source_label}</div>
-                        <div class="reasoning-text">{reasoning}</div>
-                    </div>
-                </td>
-            </tr>
-        """)
+        
+        # First rows expanded (and rendered) by default, the rest on demand
+        eager = idx < REASONING_EAGER_ROWS
+        
+        rows.append(row(
+            pred_id=pred_id,
+            time_short=time_short or '—',
+            source_badge=source_badge,
+            dir_class=dir_class,
+            dir_arrow=dir_arrow,
+            direction=direction,
+            target=target,
+            confidence=confidence,
+            actual=actual,
+            result_class=result_class,
+            result=result,
+            extreme_badge=EXTREME_BADGE if is_extreme else '',
+            error_pct=error_pct,
+            expanded_class=' visible' if eager else '',
+            lazy='' if eager else ' data-lazy="1"',
+            reasoning_box=render_reasoning_box(
+                entry, target, actual, calibration, reasoning, source
+            ) if eager else '',
+        ))
     
     if not rows:
         return '<tr><td colspan="6" class="empty-state">No resolved predictions yet</td></tr>'
@@ -2539,108 +3333,43 @@ def render_learnings(learnings):
     
     items = []
     for idx, l in enumerate(learnings):
-        learning_id = idx
-        reason = (l['extreme_reason'] or 'Unknown')
-        text = l['learning_extracted'] or ''
-        
-        # Escape HTML
-        reason = reason.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        reason = _escape(l['extreme_reason'] or 'Unknown')
+        text = _escape(l['learning_extracted'] or '')
         
         # Truncated version
         text_short = text[:100] + '...' if len(text) > 100 else text
         
-        items.append(f"""
-            <div class="learning expandable-card" onclick="toggleExpand('learning-{learning_id}')">
-                <div class="learning-reason">{reason}</div>
-                <div class="expandable-short" id="learning-{learning_id}-short">{text_short} <span class="expand-hint">↓ expand</span></div>
-                <div class="expandable-full" id="learning-{learning_id}-full" style="display: none;">{text} <span class="expand-hint">↑ collapse</span></div>
-            </div>
-        """)
+        items.append(LEARNING_ROW.format(learning_id=idx, reason=reason, text=text, text_short=text_short))
     return '\n'.join(items)
 
-def render_meta_rules(meta_rules):
-    if not meta_rules:
-        return '<div class="empty-state">Run <code>python3 predictor.py meta</code> to generate</div>'
-    
+def _render_rules(meta_rules, row):
+    """Meta-rule cards (shared by the predictor and verifier columns)."""
     items = []
-    for idx, rule in enumerate(meta_rules):
-        rule_id = rule.get('id', idx)
-        pattern_type = rule.get('pattern_type', 'unknown')
-        pattern_desc = rule.get('pattern_description', '')
-        meta_rule = rule.get('meta_rule', '')
-        confidence = rule.get('confidence_score', 0)
-        
+    for rule in meta_rules:
         # Escape HTML
-        pattern_desc = pattern_desc.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        meta_rule = meta_rule.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        
-        # Truncated version
-        meta_rule_short = meta_rule[:100] + '...' if len(meta_rule) > 100 else meta_rule
-        
-        items.append(f"""
-            <div class="meta-rule expandable-card" onclick="toggleExpand('meta-{rule_id}')">
-                <div class="meta-rule-header">
-                    <span class="meta-rule-type">{pattern_type}</span>
-                    <span class="meta-rule-confidence">{confidence:.0%}</span>
-                </div>
-                <div class="expandable-short" id="meta-{rule_id}-short">{meta_rule_short} <span class="expand-hint">↓ expand</span></div>
-                <div class="expandable-full" id="meta-{rule_id}-full" style="display: none;">
-                    <div class="expandable-section">
-                        <div class="expandable-label">Rule</div>
-                        <div>{meta_rule}</div>
-                    </div>
-                    <div class="expandable-section">
-                        <div class="expandable-label">Pattern</div>
-                        <div>{pattern_desc}</div>
-                    </div>
-                    <span class="expand-hint">↑ collapse</span>
-                </div>
-            </div>
-        """)
+        meta_rule = _escape(rule['meta_rule'])
+        
+        items.append(row.format(
+            rule_id=rule['id'],
+            pattern_type=rule['pattern_type'],
+            confidence=rule['confidence_score'],
+            meta_rule=meta_rule,
+            meta_rule_short=meta_rule[:100] + '...' if len(meta_rule) > 100 else meta_rule,
+            pattern_desc=_escape(rule['pattern_description']),
+        ))
     return '\n'.join(items)
 
+def render_meta_rules(meta_rules):
+    if not meta_rules:
+        return '<div class="empty-state">Run <code>python3 predictor.py meta</code> to generate</div>'
+    return _render_rules(meta_rules, META_RULE_ROW)
+
 
 def render_verifier_meta_rules(meta_rules):
     """Render GPT-4 verifier meta-rules."""
     if not meta_rules:
         return '<div class="empty-state" style="font-size: 11px; color: var(--text-muted);">Verifier meta-rules will appear after sufficient data</div>'
-    
-    items = []
-    for idx, rule in enumerate(meta_rules):
-        rule_id = rule.get('id', idx)
-        pattern_type = rule.get('pattern_type', 'unknown')
-        meta_rule = rule.get('meta_rule', '')
-        pattern_desc = rule.get('pattern_description', '')
-        confidence = rule.get('confidence_score', 0)
-        
-        # Escape HTML
-        meta_rule = meta_rule.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        pattern_desc = pattern_desc.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        
-        meta_rule_short = meta_rule[:100] + '...' if len(meta_rule) > 100 else meta_rule
-        
-        items.append(f"""
-            <div class="verifier-meta-rule expandable-card" onclick="toggleExpand('vmeta-{rule_id}')">
-                <div class="verifier-meta-rule-header">
-                    <span class="verifier-meta-rule-type">{pattern_type}</span>
-                    <span class="verifier-meta-rule-confidence">{confidence:.0%}</span>
-                </div>
-                <div class="expandable-short" id="vmeta-{rule_id}-short">{meta_rule_short} <span class="expand-hint">↓ expand</span></div>
-                <div class="expandable-full" id="vmeta-{rule_id}-full" style="display: none;">
-                    <div class="expandable-section">
-                        <div class="expandable-label">Rule</div>
-                        <div>{meta_rule}</div>
-                    </div>
-                    <div class="expandable-section">
-                        <div class="expandable-label">Pattern</div>
-                        <div>{pattern_desc}</div>
-                    </div>
-                    <span class="expand-hint">↑ collapse</span>
-                </div>
-            </div>
-        """)
-    return '\n'.join(items)
+    return _render_rules(meta_rules, VERIFIER_META_RULE_ROW)
 
 
 def render_verifier_learnings(learnings):
@@ -2650,9 +3379,7 @@ def render_verifier_learnings(learnings):
     
     items = []
     for idx, l in enumerate(learnings):
-        learning_id = f"vl{idx}"
-        extreme_reason = l.get('extreme_reason', 'Unknown')
-        learning = l.get('learning_extracted', '')
+        extreme_reason = l['extreme_reason']
         
         # Determine context type
         if 'caught' in extreme_reason.lower():
@@ -2666,340 +3393,643 @@ def render_verifier_learnings(learnings):
             context_text = extreme_reason[:30].upper()
         
         # Escape HTML
-        learning = learning.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        learning_short = learning[:100] + '...' if len(learning) > 100 else learning
-        
-        items.append(f"""
-            <div class="learning-card verifier expandable-card" onclick="toggleExpand('{learning_id}')">
-                <div class="learning-context {context_class}">{context_text}</div>
-                <div class="expandable-short" id="{learning_id}-short">
-                    {learning_short} <span class="expand-hint">↓</span>
-                </div>
-                <div class="expandable-full" id="{learning_id}-full" style="display: none;">
-                    <div class="expandable-section">
-                        <div class="expandable-label">Learning</div>
-                        <div>{learning}</div>
-                    </div>
-                    <div class="expandable-section">
-                        <div class="expandable-label">Context</div>
-                        <div>{extreme_reason}</div>
-                    </div>
-                    <span class="expand-hint">↑</span>
-                </div>
-            </div>
-        """)
+        learning = _escape(l['learning_extracted'])
+        
+        items.append(VERIFIER_LEARNING_ROW.format(
+            learning_id=f"vl{idx}",
+            context_class=context_class,
+            context_text=context_text,
+            learning=learning,
+            learning_short=learning[:100] + '...' if len(learning) > 100 else learning,
+            extreme_reason=extreme_reason,
+        ))
     return '\n'.join(items)
 
 
-class DashboardHandler(SimpleHTTPRequestHandler):
-    def log_message(self, format, *args):
-        if 'favicon' not in args[0]:
-            SimpleHTTPRequestHandler.log_message(self, format, *args)
+def _summary_fields(stats, verifier_stats, consensus_stats, local_llm_stats):
+    """Formatted counters, keyed by template placeholder (and data-field)."""
+    return {
+        'TOTAL': str(stats['total']),
+        'CORRECT': str(stats['correct']),
+        'RESOLVED': str(stats['resolved']),
+        'ACCURACY_CLASS': stats['accuracy_class'],
+        'ACCURACY': f"{stats['accuracy']:.1f}%",
+        'CALIBRATION': f"{stats['calibration']:.2f}",
+        'EXTREMES': str(stats['extremes']),
+        'META_RULES': str(stats['meta_rules']),
+        'NEXT_META': f"in {stats['next_meta']} preds" if stats['next_meta'] > 0 else "ready",
+        'VERIFIER_ACCURACY': f"{verifier_stats['accuracy']:.1f}%",
+        'VERIFIER_CORRECT': str(verifier_stats['correct']),
+        'VERIFIER_TOTAL': str(verifier_stats['resolved']),
+        'VERIFIER_CATCHES': str(verifier_stats['catches']),
+        'VERIFIER_FALSE_ALARMS': str(verifier_stats['false_alarms']),
+        'CONSENSUS_WIN_RATE': f"{consensus_stats['agreed_win_rate']:.1f}%",
+        'CONSENSUS_AGREED': str(consensus_stats['agreed']),
+        'CONSENSUS_DISAGREED': str(consensus_stats['disagreed']),
+        'CONSENSUS_CATCHES': str(consensus_stats['catches']),
+        'CONSENSUS_FALSE_ALARMS': str(consensus_stats['false_alarms']),
+        'CONSENSUS_BLIND_SPOTS': str(consensus_stats['blind_spots']),
+        'LOCAL_LLM_TOTAL': str(local_llm_stats['total']),
+        'LOCAL_LLM_ACCURACY': f"{local_llm_stats['accuracy']:.1f}%",
+        'LOCAL_LLM_RESOLVED': str(local_llm_stats['resolved']),
+        'LOCAL_LLM_AVG_ERROR': f"{local_llm_stats['avg_error']:.2f}%",
+    }
+
+
+def get_dashboard_state(timeframe):
+    """The parts of the page that change between predictions (/api/state)."""
+    tf_config = TIMEFRAMES[timeframe]
+    db_path = get_db_path(timeframe)
+    
+    # One reader checkout (and read transaction) for all the getters below
+    with get_pool(db_path).reader(snapshot=True):
+        stats, local_llm_stats = get_all_stats(db_path)
+        current = get_current_prediction(db_path)
+        streak = get_recent_streak(db_path)
+        verifier_stats = get_verifier_stats(db_path)
+        consensus_stats = get_consensus_stats(db_path)
+    
+        # Get verifier prediction for current prediction
+        verifier_pred = None
+        if current and current.get('id'):
+            verifier_pred = get_current_verifier_prediction(db_path, current['id'])
+    
+    current_html, pred_timestamp, is_resolved = render_current_prediction(
+        current, verifier_pred, tf_config['interval']
+    )
+    
+    return {
+        'fields': _summary_fields(stats, verifier_stats, consensus_stats, local_llm_stats),
+        'current_html': current_html,
+        'streak_html': render_streak(streak),
+        'prediction_timestamp': pred_timestamp,
+        'is_resolved': is_resolved,
+        'local_llm_active': local_llm_stats['total'] > 0,
+    }
+
+
+def _live_state(timeframe):
+    """get_dashboard_state(), shared by /api/state, /api/events and page
+    renders until the next commit (or the cache TTL)."""
+    stamp = get_pool(get_db_path(timeframe)).stamp()
+    return cached(('state.data', timeframe, stamp), lambda: get_dashboard_state(timeframe))
+
+
+def _dashboard_values(timeframe):
+    """Placeholder values for a timeframe's page, apart from the theme and
+    the timeframe constants already baked into TEMPLATES."""
+    db_path = get_db_path(timeframe)
+    
+    state = _live_state(timeframe)
+    with get_pool(db_path).reader(snapshot=True):
+        predictions_html = render_recent_predictions(db_path)
+        learnings = get_learnings(db_path)
+        meta_rules = get_meta_rules(db_path)
+        
+        # Verifier data
+        verifier_meta_rules = get_verifier_meta_rules(db_path)
+        verifier_learnings = get_verifier_learnings(db_path)
+        verifier_learnings_count = get_verifier_learnings_count(db_path)
+        local_llm_current = get_local_llm_current(db_path)
+    
+    # Determine Local LLM status based on recent activity
+    if state['local_llm_active']:
+        local_llm_status = 'Connected'
+        local_llm_status_class = 'connected'
+    else:
+        local_llm_status = 'Waiting'
+        local_llm_status_class = 'waiting'
+    
+    values = dict(state['fields'])
+    values.update({
+        'PREDICTION_TIMESTAMP': str(state['prediction_timestamp']),
+        'IS_RESOLVED': 'true' if state['is_resolved'] else 'false',
+        'CURRENT_PREDICTION_HTML': state['current_html'],
+        'STREAK_HTML': state['streak_html'],
+        'PREDICTIONS_HTML': predictions_html,
+        'LEARNINGS_HTML': render_learnings(learnings),
+        'META_RULES_HTML': render_meta_rules(meta_rules),
+        
+        # Verifier
+        'VERIFIER_META_RULES_COUNT': str(len(verifier_meta_rules)),
+        'VERIFIER_META_RULES_HTML': render_verifier_meta_rules(verifier_meta_rules),
+        'VERIFIER_LEARNINGS_COUNT': str(verifier_learnings_count),
+        'VERIFIER_LEARNINGS_HTML': render_verifier_learnings(verifier_learnings),
+        
+        # Local LLM
+        'LOCAL_LLM_STATUS': local_llm_status,
+        'LOCAL_LLM_STATUS_CLASS': local_llm_status_class,
+        'LOCAL_LLM_CURRENT_HTML': render_local_llm_current(local_llm_current),
+    })
+    return values
+
+
+def render_dashboard(timeframe, theme='light'):
+    """Build the full dashboard page for one timeframe and color theme.
     
-    def do_GET(self):
-        # Parse URL
-        parsed = urlparse(self.path)
-        path = parsed.path
-        query = parse_qs(parsed.query)
-        
-        # Get timeframe from query string
-        timeframe = query.get('tf', [DEFAULT_TIMEFRAME])[0]
+    The data behind it is fetched and rendered once per database stamp,
+    so both themes (and repeated misses) share one set of queries.
+    """
+    stamp = get_pool(get_db_path(timeframe)).stamp()
+    values = dict(cached(('values', timeframe, stamp), lambda: _dashboard_values(timeframe)))
+    # Theme, from the cookie toggleTheme() sets
+    values['BODY_CLASS'] = 'dark' if theme == 'dark' else ''
+    values['THEME_ICON'] = '🌙' if theme == 'dark' else '☀️'
+    return render_template(timeframe, values)
+
+
+def _status(code):
+    """Build a WSGI status line, e.g. 404 -> '404 Not Found'."""
+    return f"{code} {HTTPStatus(code).phrase}"
+
+
+def _respond(start_response, code, body=b'', content_type=None, headers=None):
+    response_headers = []
+    if content_type:
+        response_headers.append(('Content-Type', content_type))
+    response_headers.append(('Content-Length', str(len(body))))
+    if headers:
+        response_headers.extend(headers)
+    start_response(_status(code), response_headers)
+    return [body]
+
+
+def _dumps(payload):
+    return orjson.dumps(payload) if orjson else json.dumps(payload).encode()
+
+
+def _loads(data):
+    """Parse JSON text or UTF-8 bytes. Errors are ValueErrors either way
+    (orjson.JSONDecodeError subclasses it)."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _json(start_response, code, payload):
+    return _respond(start_response, code, _dumps(payload), 'application/json')
+
+
+def _read_json(environ):
+    """Read and decode the JSON request body. Raises ValueError on bad input."""
+    try:
+        content_length = int(environ.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    return _loads(environ['wsgi.input'].read(content_length))
+
+
+def _query_param(qs: str, name: str):
+    """Raw value of `name` in a query string, or None (ours need no decoding)."""
+    prefix = name + '='
+    if qs.startswith(prefix):
+        start = len(prefix)
+    else:
+        start = qs.find('&' + prefix)
+        if start < 0:
+            return None
+        start += len(prefix) + 1
+    end = qs.find('&', start)
+    return qs[start:] if end < 0 else qs[start:end]
+
+
+def _get_tf(qs: str) -> str:
+    """Read the tf parameter from a query string."""
+    tf = _query_param(qs, 'tf')
+    return tf if tf in TIMEFRAMES else DEFAULT_TIMEFRAME
+
+
+def _get_theme(environ):
+    """'dark' or 'light', from the theme cookie."""
+    for part in environ.get('HTTP_COOKIE', '').split(';'):
+        name, _, value = part.strip().partition('=')
+        if name == 'theme':
+            return 'dark' if value == 'dark' else 'light'
+    return 'light'
+
+
+def _accepts_gzip(environ):
+    for coding in environ.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def _bearer_token(environ):
+    auth_header = environ.get('HTTP_AUTHORIZATION', '')
+    return auth_header, auth_header.replace('Bearer ', '') if auth_header else ''
+
+
+def handle_post_prediction(environ, start_response):
+    """POST /api/prediction - store a prediction from an external (local) LLM.
+    
+    The body is one prediction object, or a list of them to store in bulk
+    (one transaction per timeframe database) for backfills.
+    """
+    # Authenticate
+    auth_header, provided_key = _bearer_token(environ)
+    if API_KEY and not auth_header.startswith('Bearer '):
+        return _json(start_response, 401, {'error': 'Missing Authorization header'})
+    if API_KEY and provided_key != API_KEY:
+        return _json(start_response, 403, {'error': 'Invalid API key'})
+    
+    try:
+        data = _read_json(environ)
+    except ValueError:
+        return _json(start_response, 400, {'error': 'Invalid JSON'})
+    
+    batch = isinstance(data, list)
+    predictions = data if batch else [data]
+    if not predictions:
+        return _json(start_response, 400, {'error': 'No predictions'})
+    
+    # Validate required fields, and group by timeframe (default 5min)
+    required = ['current_price', 'direction', 'target', 'confidence']
+    by_timeframe = {}
+    for index, prediction in enumerate(predictions):
+        where = f' (prediction {index})' if batch else ''
+        if not isinstance(prediction, dict):
+            return _json(start_response, 400, {'error': f'Expected an object{where}'})
+        missing = [f for f in required if f not in prediction]
+        if missing:
+            return _json(start_response, 400, {'error': f'Missing fields: {missing}{where}'})
+        timeframe = prediction.get('timeframe', '5')
         if timeframe not in TIMEFRAMES:
             timeframe = DEFAULT_TIMEFRAME
-        
-        tf_config = TIMEFRAMES[timeframe]
-        db_path = get_db_path(timeframe)
-        
-        if path == '/' or path == '/index.html' or path.startswith('/?'):
-            # Auto-resolve any pending Local LLM predictions
-            resolved = auto_resolve_local_llm_predictions(db_path, tf_config['interval'])
-            if resolved > 0:
-                print(f"Auto-resolved {resolved} Local LLM prediction(s)")
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-            
-            stats = get_stats(db_path)
-            current = get_current_prediction(db_path)
-            predictions = get_recent_predictions(db_path)
-            streak = get_recent_streak(db_path)
-            learnings = get_learnings(db_path)
-            meta_rules = get_meta_rules(db_path)
-            
-            # Verifier data
-            verifier_stats = get_verifier_stats(db_path)
-            verifier_meta_rules = get_verifier_meta_rules(db_path)
-            verifier_learnings = get_verifier_learnings(db_path)
-            verifier_learnings_count = get_verifier_learnings_count(db_path)
-            consensus_stats = get_consensus_stats(db_path)
-            
-            # Get verifier prediction for current prediction
-            verifier_pred = None
-            if current and current.get('id'):
-                verifier_pred = get_current_verifier_prediction(db_path, current['id'])
-            
-            current_html, pred_timestamp, is_resolved = render_current_prediction(
-                current, verifier_pred, tf_config['interval']
-            )
-            
-            html = get_html_template(timeframe)
-            html = html.replace('%%PREDICTION_TIMESTAMP%%', str(pred_timestamp))
-            html = html.replace('%%IS_RESOLVED%%', 'true' if is_resolved else 'false')
-            html = html.replace('%%TOTAL%%', str(stats['total']))
-            html = html.replace('%%CORRECT%%', str(stats['correct']))
-            html = html.replace('%%RESOLVED%%', str(stats['resolved']))
-            html = html.replace('%%ACCURACY_CLASS%%', stats['accuracy_class'])
-            html = html.replace('%%ACCURACY%%', f"{stats['accuracy']:.1f}%")
-            html = html.replace('%%CALIBRATION%%', f"{stats['calibration']:.2f}")
-            html = html.replace('%%EXTREMES%%', str(stats['extremes']))
-            html = html.replace('%%META_RULES%%', str(stats['meta_rules']))
-            html = html.replace('%%NEXT_META%%', f"in {stats['next_meta']} preds" if stats['next_meta'] > 0 else "ready")
-            html = html.replace('%%CURRENT_PREDICTION_HTML%%', current_html)
-            html = html.replace('%%STREAK_HTML%%', render_streak(streak))
-            html = html.replace('%%PREDICTIONS_HTML%%', render_predictions(predictions))
-            html = html.replace('%%LEARNINGS_HTML%%', render_learnings(learnings))
-            html = html.replace('%%META_RULES_HTML%%', render_meta_rules(meta_rules))
-            
-            # Verifier replacements
-            html = html.replace('%%VERIFIER_ACCURACY%%', f"{verifier_stats['accuracy']:.1f}%")
-            html = html.replace('%%VERIFIER_CORRECT%%', str(verifier_stats['correct']))
-            html = html.replace('%%VERIFIER_TOTAL%%', str(verifier_stats['resolved']))
-            html = html.replace('%%VERIFIER_CATCHES%%', str(verifier_stats['catches']))
-            html = html.replace('%%VERIFIER_FALSE_ALARMS%%', str(verifier_stats['false_alarms']))
-            html = html.replace('%%VERIFIER_META_RULES_COUNT%%', str(len(verifier_meta_rules)))
-            html = html.replace('%%VERIFIER_META_RULES_HTML%%', render_verifier_meta_rules(verifier_meta_rules))
-            html = html.replace('%%VERIFIER_LEARNINGS_COUNT%%', str(verifier_learnings_count))
-            html = html.replace('%%VERIFIER_LEARNINGS_HTML%%', render_verifier_learnings(verifier_learnings))
-            
-            # Consensus replacements
-            html = html.replace('%%CONSENSUS_WIN_RATE%%', f"{consensus_stats['agreed_win_rate']:.1f}%")
-            html = html.replace('%%CONSENSUS_AGREED%%', str(consensus_stats['agreed']))
-            html = html.replace('%%CONSENSUS_DISAGREED%%', str(consensus_stats['disagreed']))
-            html = html.replace('%%CONSENSUS_CATCHES%%', str(consensus_stats['catches']))
-            html = html.replace('%%CONSENSUS_FALSE_ALARMS%%', str(consensus_stats['false_alarms']))
-            html = html.replace('%%CONSENSUS_BLIND_SPOTS%%', str(consensus_stats['blind_spots']))
-            
-            # Local LLM replacements
-            local_llm_stats = get_local_llm_stats(db_path)
-            local_llm_current = get_local_llm_current(db_path)
-            
-            # Determine status based on recent activity
-            if local_llm_stats['total'] > 0:
-                local_llm_status = 'Connected'
-                local_llm_status_class = 'connected'
-            else:
-                local_llm_status = 'Waiting'
-                local_llm_status_class = 'waiting'
-            
-            html = html.replace('%%LOCAL_LLM_STATUS%%', local_llm_status)
-            html = html.replace('%%LOCAL_LLM_STATUS_CLASS%%', local_llm_status_class)
-            html = html.replace('%%LOCAL_LLM_TOTAL%%', str(local_llm_stats['total']))
-            html = html.replace('%%LOCAL_LLM_ACCURACY%%', f"{local_llm_stats['accuracy']:.1f}%")
-            html = html.replace('%%LOCAL_LLM_RESOLVED%%', str(local_llm_stats['resolved']))
-            html = html.replace('%%LOCAL_LLM_AVG_ERROR%%', f"{local_llm_stats['avg_error']:.2f}%")
-            html = html.replace('%%LOCAL_LLM_CURRENT_HTML%%', render_local_llm_current(local_llm_current))
-            
-            # Timeframe replacements
-            html = html.replace('%%TIMEFRAME_LABEL%%', tf_config['label'])
-            html = html.replace('%%TAB_5_ACTIVE%%', 'active' if timeframe == '5' else '')
-            html = html.replace('%%TAB_15_ACTIVE%%', 'active' if timeframe == '15' else '')
-            html = html.replace('%%TAB_60_ACTIVE%%', 'active' if timeframe == '60' else '')
-            
-            # Update prediction duration for JS
-            html = html.replace('const predictionDuration = 300;', f'const predictionDuration = {tf_config["interval"] * 60};')
-            
-            self.wfile.write(html.encode('utf-8'))
-        elif self.path == '/api/stats':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(get_stats()).encode())
-        elif self.path == '/favicon.ico':
-            self.send_response(204)
-            self.end_headers()
-        else:
-            self.send_error(404)
+        by_timeframe.setdefault(timeframe, []).append(index)
     
-    def do_POST(self):
-        """Handle POST requests - API endpoints for external predictions."""
-        parsed = urlparse(self.path)
-        path = parsed.path
-        
-        if path == '/api/prediction':
-            # Authenticate
-            auth_header = self.headers.get('Authorization', '')
-            if API_KEY and not auth_header.startswith('Bearer '):
-                self.send_response(401)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': 'Missing Authorization header'}).encode())
-                return
-            
-            provided_key = auth_header.replace('Bearer ', '') if auth_header else ''
-            if API_KEY and provided_key != API_KEY:
-                self.send_response(403)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': 'Invalid API key'}).encode())
-                return
+    try:
+        saved = [None] * len(predictions)
+        for timeframe, indexes in by_timeframe.items():
+            ids = save_external_predictions_batch(get_db_path(timeframe), [predictions[i] for i in indexes])
+            for index, pred_id in zip(indexes, ids):
+                saved[index] = {'prediction_id': pred_id, 'timeframe': timeframe}
+        if batch:
+            print(f"📥 Received {len(saved)} predictions from local LLM")
+            return _json(start_response, 201, {'success': True, 'predictions': saved})
+        print(f"📥 Received prediction from local LLM: {data['direction']} ${data['target']:,.2f} ({data['confidence']}%)")
+        return _json(start_response, 201, {'success': True, **saved[0]})
+    except Exception as e:
+        print(f"❌ Error saving prediction: {e}")
+        return _json(start_response, 500, {'error': str(e)})
+
+
+def handle_post_resolve(environ, start_response):
+    """POST /api/resolve - resolve a prediction with the actual price."""
+    _, provided_key = _bearer_token(environ)
+    if API_KEY and provided_key != API_KEY:
+        return _json(start_response, 403, {'error': 'Invalid API key'})
+    
+    try:
+        data = _read_json(environ)
+    except ValueError:
+        return _json(start_response, 400, {'error': 'Invalid JSON'})
+    
+    required = ['prediction_id', 'actual_price']
+    missing = [f for f in required if f not in data]
+    if missing:
+        return _json(start_response, 400, {'error': f'Missing fields: {missing}'})
+    
+    timeframe = data.get('timeframe', '5')
+    db_path = get_db_path(timeframe)
+    
+    try:
+        with get_pool(db_path).writer() as conn:
+            cursor = conn.cursor()
             
-            # Read request body
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
+            # Get the prediction
+            cursor.execute("""
+                SELECT current_price, predicted_direction, predicted_target, confidence
+                FROM predictions WHERE id = ?
+            """, (data['prediction_id'],))
+            row = cursor.fetchone()
             
-            try:
-                data = json.loads(body)
-            except json.JSONDecodeError:
-                self.send_response(400)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': 'Invalid JSON'}).encode())
-                return
+            if not row:
+                return _json(start_response, 404, {'error': 'Prediction not found'})
             
-            # Validate required fields
-            required = ['current_price', 'direction', 'target', 'confidence']
-            missing = [f for f in required if f not in data]
-            if missing:
-                self.send_response(400)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': f'Missing fields: {missing}'}).encode())
-                return
+            current_price = row['current_price']
+            predicted_direction = row['predicted_direction']
+            predicted_target = row['predicted_target']
+            confidence = row['confidence']
+            actual_price = data['actual_price']
             
-            # Get timeframe from data or default to 5min
-            timeframe = data.get('timeframe', '5')
-            if timeframe not in TIMEFRAMES:
-                timeframe = DEFAULT_TIMEFRAME
+            actual_direction = 'UP' if actual_price > current_price else 'DOWN'
+            direction_correct = predicted_direction == actual_direction
+            target_error_pct = abs(actual_price - predicted_target) / current_price * 100
+            calibration_score = confidence / 100 if direction_correct else (100 - confidence) / 100
             
+            cursor.execute("""
+                UPDATE predictions SET
+                    resolved_at = ?,
+                    actual_price = ?,
+                    actual_direction = ?,
+                    direction_correct = ?,
+                    target_error_pct = ?,
+                    calibration_score = ?
+                WHERE id = ?
+            """, (
+                datetime.now(timezone.utc).isoformat(),
+                actual_price,
+                actual_direction,
+                direction_correct,
+                target_error_pct,
+                calibration_score,
+                data['prediction_id']
+            ))
+        
+        result_str = '✓ Correct' if direction_correct else '✗ Wrong'
+        print(f"📊 Resolved prediction {data['prediction_id']}: {result_str} (error: {target_error_pct:.2f}%)")
+        
+        return _json(start_response, 200, {
+            'success': True,
+            'direction_correct': direction_correct,
+            'target_error_pct': target_error_pct,
+            'calibration_score': calibration_score
+        })
+    except Exception as e:
+        print(f"❌ Error resolving prediction: {e}")
+        return _json(start_response, 500, {'error': str(e)})
+
+
+def serve_reasoning(environ, start_response, timeframe):
+    """GET /api/reasoning?id=<id> - a history row's reasoning box, fetched
+    the first time it is expanded."""
+    try:
+        pred_id = int(_query_param(environ.get('QUERY_STRING', ''), 'id'))
+    except (TypeError, ValueError):
+        return _json(start_response, 400, {'error': 'Invalid id'})
+    
+    db_path = get_db_path(timeframe)
+    pred = get_prediction_reasoning(db_path, pred_id) if _ensure_schema(db_path, create=False) else None
+    if pred is None:
+        return _json(start_response, 404, {'error': 'Prediction not found'})
+    
+    # Only resolved predictions are listed, and those no longer change
+    body = _dumps({'html': render_reasoning_box(*pred)})
+    return _respond(start_response, 200, body, 'application/json', [('Cache-Control', 'public, max-age=3600')])
+
+
+def serve_asset(environ, start_response, name):
+    """GET /static/<hashed name> - an in-memory asset, cached for a year."""
+    body, gz_body, content_type = STATIC_ASSETS[name]
+    headers = [('Cache-Control', 'public, max-age=31536000, immutable'), ('Vary', 'Accept-Encoding')]
+    if _accepts_gzip(environ):
+        return _respond(start_response, 200, gz_body, content_type, headers + [('Content-Encoding', 'gzip')])
+    return _respond(start_response, 200, body, content_type, headers)
+
+
+def serve_static(environ, start_response, name):
+    """GET /static/<name> - a file from STATIC_DIR, revalidated by ETag."""
+    path = os.path.normpath(os.path.join(STATIC_DIR, name))
+    if not path.startswith(STATIC_DIR + os.sep) or not os.path.isfile(path):
+        return _respond(start_response, 404, b'Not Found', 'text/plain')
+    
+    st = os.stat(path)
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    headers = [('ETag', etag), ('Cache-Control', 'public, max-age=3600')]
+    if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+        start_response(_status(304), headers)
+        return [b'']
+    
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    start_response(_status(200), [('Content-Type', content_type), ('Content-Length', str(st.st_size))] + headers)
+    # The server's file_wrapper lets it transmit with sendfile (see
+    # SendfileServerHandler; gunicorn does the same natively)
+    file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+    return file_wrapper(open(path, 'rb'), 65536)
+
+
+# Changes with any edit to this file, so a deploy invalidates page ETags
+with open(__file__, 'rb') as _source:
+    CODE_VERSION = hashlib.sha1(_source.read()).hexdigest()[:12]
+
+
+def _page_etag(timeframe, theme, stamp):
+    """ETag for a page, derived from its inputs instead of its bytes.
+    
+    Revalidating therefore costs a stat() rather than a render. The page's
+    only clock-driven text, the countdown, is recomputed by its script on
+    load. The tag is weak since the same page is served gzip'd or plain.
+    """
+    key = repr((CODE_VERSION, timeframe, theme, stamp)).encode()
+    return f'W/"{hashlib.sha1(key).hexdigest()}"'
+
+
+def _render_state(timeframe):
+    """Serialize the live dashboard state and tag it with a content-hash ETag."""
+    body = _dumps(_live_state(timeframe))
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _state_events(timeframe, last_etag=None):
+    """Server-Sent Events stream of /api/state, pushed whenever it changes.
+    
+    Each event's id is the state's ETag, so a reconnecting EventSource
+    (which sends it back as Last-Event-ID) is not re-sent the same state.
+    """
+    pool = get_pool(get_db_path(timeframe))
+    yield b'retry: 5000\n\n'
+    last_stamp = None
+    started = last_sent = time.monotonic()
+    while True:
+        _resolve_due_local_llm(timeframe)
+        stamp = pool.stamp()
+        if stamp != last_stamp:
+            last_stamp = stamp
+            body, etag = cached(('state', timeframe, stamp), lambda: _render_state(timeframe))
+            if etag != last_etag:
+                last_etag = etag
+                last_sent = time.monotonic()
+                yield b'id: ' + etag.encode() + b'\ndata: ' + body + b'\n\n'
+        
+        now = time.monotonic()
+        if now - started >= EVENTS_MAX_AGE:
+            return
+        if now - last_sent >= EVENTS_KEEPALIVE:
+            # Comment line; also how a closed connection gets noticed
+            last_sent = now
+            yield b': keep-alive\n\n'
+        time.sleep(EVENTS_POLL_INTERVAL)
+
+
+def serve_events(environ, start_response, timeframe):
+    """GET /api/events - the live state as a text/event-stream."""
+    start_response(_status(200), [
+        ('Content-Type', 'text/event-stream'),
+        ('Cache-Control', 'no-cache'),
+        ('X-Accel-Buffering', 'no'),  # don't let a proxy hold events back
+    ])
+    return _state_events(timeframe, environ.get('HTTP_LAST_EVENT_ID'))
+
+
+def _page_body(timeframe, theme, stamp, etag, gzipped):
+    """The encoded page for a stamp, rendered (and gzip'd) at most once."""
+    html = cached(('page', timeframe, theme, stamp), lambda: render_dashboard(timeframe, theme))
+    if gzipped:
+        return cached(('page.gz', timeframe, etag), lambda: gzip_page(timeframe, html))
+    return html.encode('utf-8')
+
+
+def _stream_page(timeframe, theme, stamp, etag, gzipped):
+    """Response body that flushes the template's static head before
+    rendering the rest, so the browser can start fetching the fonts,
+    stylesheet and deferred script during the database reads. The head
+    ends at the first placeholder, partway into the inline per-render
+    <script>, which the rendered remainder completes."""
+    head = GZIP_TEMPLATES[timeframe][1] if gzipped else TEMPLATE_HEADS[timeframe]
+    yield head
+    yield _page_body(timeframe, theme, stamp, etag, gzipped)[len(head):]
+
+
+def app(environ, start_response):
+    """WSGI entry point. Serve with `python dashboard.py` or any WSGI server
+    with threaded or async workers (e.g. `gunicorn -w 2 -k gthread
+    --threads 32 dashboard:app`): every open page holds an /api/events
+    stream for up to EVENTS_MAX_AGE, which would tie up a sync worker and
+    outlast its timeout.
+    
+    HEAD is routed like GET and its body dropped here, since wsgiref
+    doesn't strip it; lazy bodies (streamed pages, files, event streams)
+    are closed without being produced.
+    """
+    result = _route(environ, start_response)
+    if environ.get('REQUEST_METHOD') == 'HEAD':
+        if hasattr(result, 'close'):
+            result.close()
+        return [b'']
+    return result
+
+
+def _route(environ, start_response):
+    """Dispatch a request to its handler."""
+    method = environ.get('REQUEST_METHOD', 'GET')
+    path = environ.get('PATH_INFO', '') or '/'
+    
+    if method in ('GET', 'HEAD'):
+        # Get timeframe from query string
+        timeframe = _get_tf(environ.get('QUERY_STRING', ''))
+        
+        if path == '/' or path == '/index.html':
+            pool = get_pool(get_db_path(timeframe))
+            theme = _get_theme(environ)
+            _resolve_due_local_llm(timeframe)
+            stamp = pool.stamp()
+            etag = _page_etag(timeframe, theme, stamp)
+            headers = [('ETag', etag), ('Cache-Control', 'no-cache'), ('Vary', 'Accept-Encoding, Cookie')]
+            if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+                start_response(_status(304), headers)
+                return [b'']
+            gzipped = _accepts_gzip(environ)
+            if gzipped:
+                headers.append(('Content-Encoding', 'gzip'))
+            if RESPONSE_CACHE.get(('page', timeframe, theme, stamp)) is None and os.path.exists(pool.db_path):
+                # Not rendered yet: send the static head while the queries run
+                # (a missing database still gets a plain error response)
+                start_response(_status(200), [('Content-Type', 'text/html; charset=utf-8')] + headers)
+                return _stream_page(timeframe, theme, stamp, etag, gzipped)
+            body = _page_body(timeframe, theme, stamp, etag, gzipped)
+            return _respond(start_response, 200, body, 'text/html; charset=utf-8', headers)
+        elif path == '/api/stats':
             db_path = get_db_path(timeframe)
-            
-            try:
-                pred_id = save_external_prediction(db_path, data)
-                print(f"📥 Received prediction from local LLM: {data['direction']} ${data['target']:,.2f} ({data['confidence']}%)")
-                
-                self.send_response(201)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    'success': True,
-                    'prediction_id': pred_id,
-                    'timeframe': timeframe
-                }).encode())
-            except Exception as e:
-                print(f"❌ Error saving prediction: {e}")
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': str(e)}).encode())
-        
-        elif path == '/api/resolve':
-            # Endpoint to resolve a prediction with actual price
-            auth_header = self.headers.get('Authorization', '')
-            provided_key = auth_header.replace('Bearer ', '') if auth_header else ''
-            if API_KEY and provided_key != API_KEY:
-                self.send_response(403)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': 'Invalid API key'}).encode())
-                return
-            
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            
-            try:
-                data = json.loads(body)
-            except json.JSONDecodeError:
-                self.send_response(400)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': 'Invalid JSON'}).encode())
-                return
-            
-            required = ['prediction_id', 'actual_price']
-            missing = [f for f in required if f not in data]
-            if missing:
-                self.send_response(400)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': f'Missing fields: {missing}'}).encode())
-                return
-            
-            timeframe = data.get('timeframe', '5')
+            _ensure_schema(db_path, create=False)
+            stats = cached(('stats', timeframe, get_pool(db_path).stamp()), lambda: get_stats(db_path))
+            return _json(start_response, 200, stats)
+        elif path == '/api/state':
             db_path = get_db_path(timeframe)
-            
-            try:
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-                
-                # Get the prediction
-                cursor.execute("SELECT * FROM predictions WHERE id = ?", (data['prediction_id'],))
-                row = cursor.fetchone()
-                
-                if not row:
-                    conn.close()
-                    self.send_response(404)
-                    self.send_header('Content-type', 'application/json')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'error': 'Prediction not found'}).encode())
-                    return
-                
-                # Get column names
-                cursor.execute("PRAGMA table_info(predictions)")
-                columns = {col[1]: idx for idx, col in enumerate(cursor.fetchall())}
-                
-                current_price = row[columns['current_price']]
-                predicted_direction = row[columns['predicted_direction']]
-                predicted_target = row[columns['predicted_target']]
-                confidence = row[columns['confidence']]
-                actual_price = data['actual_price']
-                
-                actual_direction = 'UP' if actual_price > current_price else 'DOWN'
-                direction_correct = predicted_direction == actual_direction
-                target_error_pct = abs(actual_price - predicted_target) / current_price * 100
-                calibration_score = confidence / 100 if direction_correct else (100 - confidence) / 100
-                
-                cursor.execute("""
-                    UPDATE predictions SET
-                        resolved_at = ?,
-                        actual_price = ?,
-                        actual_direction = ?,
-                        direction_correct = ?,
-                        target_error_pct = ?,
-                        calibration_score = ?
-                    WHERE id = ?
-                """, (
-                    datetime.now(timezone.utc).isoformat(),
-                    actual_price,
-                    actual_direction,
-                    direction_correct,
-                    target_error_pct,
-                    calibration_score,
-                    data['prediction_id']
-                ))
-                conn.commit()
-                conn.close()
-                
-                result_str = '✓ Correct' if direction_correct else '✗ Wrong'
-                print(f"📊 Resolved prediction {data['prediction_id']}: {result_str} (error: {target_error_pct:.2f}%)")
-                
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    'success': True,
-                    'direction_correct': direction_correct,
-                    'target_error_pct': target_error_pct,
-                    'calibration_score': calibration_score
-                }).encode())
-            except Exception as e:
-                print(f"❌ Error resolving prediction: {e}")
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': str(e)}).encode())
-        else:
-            self.send_error(404)
+            _resolve_due_local_llm(timeframe)
+            body, etag = cached(('state', timeframe, get_pool(db_path).stamp()), lambda: _render_state(timeframe))
+            headers = [('ETag', etag), ('Cache-Control', 'no-cache'), ('Vary', 'Accept-Encoding')]
+            if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+                start_response(_status(304), headers)
+                return [b'']
+            if _accepts_gzip(environ):
+                # The current prediction's markup makes up most of the payload
+                gz_body = cached(('state.gz', timeframe, etag), lambda: gzip.compress(body, mtime=0))
+                return _respond(start_response, 200, gz_body, 'application/json', headers + [('Content-Encoding', 'gzip')])
+            return _respond(start_response, 200, body, 'application/json', headers)
+        elif path == '/api/events':
+            return serve_events(environ, start_response, timeframe)
+        elif path == '/api/reasoning':
+            return serve_reasoning(environ, start_response, timeframe)
+        elif path.startswith('/static/'):
+            name = path[len('/static/'):]
+            if name in STATIC_ASSETS:
+                return serve_asset(environ, start_response, name)
+            return serve_static(environ, start_response, name)
+        elif path == '/favicon.ico':
+            start_response(_status(204), [])
+            return [b'']
+    elif method == 'POST':
+        if path == '/api/prediction':
+            return handle_post_prediction(environ, start_response)
+        elif path == '/api/resolve':
+            return handle_post_resolve(environ, start_response)
+    else:
+        return _respond(start_response, 405, b'Method Not Allowed', 'text/plain', [('Allow', 'GET, HEAD, POST')])
+    
+    return _respond(start_response, 404, b'Not Found', 'text/plain')
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """wsgiref server handling each request on its own thread."""
+    daemon_threads = True
+    # socketserver's default listen backlog of 5 refuses connections when
+    # a burst of tabs (plus their event streams) reconnects at once
+    request_queue_size = 128
+
+
+class SendfileServerHandler(ServerHandler):
+    """wsgiref response handler that sends wsgi.file_wrapper bodies with
+    os.sendfile instead of reading them through Python buffers."""
+    
+    def sendfile(self):
+        if not hasattr(os, 'sendfile'):
+            return False
+        try:
+            in_fd = self.result.filelike.fileno()
+            out_fd = self.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            return False
+        
+        if not self.headers_sent:
+            self.send_headers()
+        self._flush()
+        
+        offset = self.result.filelike.tell()
+        size = os.fstat(in_fd).st_size
+        while offset < size:
+            sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+            if not sent:
+                break
+            offset += sent
+            self.bytes_sent += sent
+        return True
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        if 'favicon' not in str(args[0]):
+            WSGIRequestHandler.log_message(self, format, *args)
+    
+    def handle(self):
+        """Same as WSGIRequestHandler.handle, with SendfileServerHandler."""
+        self.raw_requestline = self.rfile.readline(65537)
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            return
+        
+        if not self.parse_request():  # An error code has been sent, just exit
+            return
+        
+        handler = SendfileServerHandler(
+            self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+            multithread=True,
+        )
+        handler.request_handler = self  # backpointer for logging
+        handler.run(self.server.get_app())
+
 
 def run_server():
     # Check for at least one database
@@ -3015,7 +4045,12 @@ def run_server():
         print("Expected databases: predictions_5min.db, predictions_15min.db, predictions_1h.db")
         return
     
-    server = HTTPServer(('0.0.0.0', PORT), DashboardHandler)
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, clear_db_path_cache)
+    
+    server = make_server('0.0.0.0', PORT, app,
+                         server_class=ThreadingWSGIServer,
+                         handler_class=QuietRequestHandler)
     print(f"\n  🐍 Recursive Dashboard")
     print(f"  http://localhost:{PORT}")
     print(f"\n  Timeframes: 5M, 15M, 1H")
@@ -3025,8 +4060,7 @@ def run_server():
         server.serve_forever()
     except KeyboardInterrupt:
         print("\n  Stopping dashboard...")
-        server.shutdown()
+        server.server_close()
 
 if __name__ == "__main__":
     run_server()
-
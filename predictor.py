@@ -6,15 +6,25 @@ Paper trading Bitcoin predictions with learning from extremes + meta-analysis.
 
 import os
 import json
+import atexit
+import heapq
 import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Optional, List
 import requests
 from anthropic import Anthropic
 from openai import OpenAI
 
+try:
+    import orjson  # optional: faster JSON for stored lists and LLM replies
+except ImportError:
+    orjson = None
+
 # Configuration (can be overridden by environment variables)
 PREDICTION_INTERVAL_MINS = int(os.environ.get("PREDICTION_INTERVAL", "5"))
 BATCH_SIZE = 20
@@ -24,7 +34,7 @@ META_LEARNING_INTERVAL = 5  # Analyze meta-patterns every N batches (100 predict
 DB_PATH = os.environ.get("DB_PATH", "predictions.db")
 PREDICTION_TIMEFRAME = os.environ.get("PREDICTION_TIMEFRAME", "5min")
 
-@dataclass
+@dataclass(slots=True)
 class Prediction:
     id: Optional[int]
     timestamp: str
@@ -44,7 +54,7 @@ class Prediction:
     learning_extracted: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class VerifierPrediction:
     id: Optional[int]
     prediction_id: int
@@ -61,23 +71,219 @@ class VerifierPrediction:
     learning_extracted: Optional[str] = None
 
 
+# Column lists in dataclass field order, so a plain-tuple row unpacks
+# straight into the constructor
+PREDICTION_COLUMNS = ', '.join(f.name for f in fields(Prediction))
+VERIFIER_COLUMNS = ', '.join(f.name for f in fields(VerifierPrediction))
+
+
+# Meta-analysis learning categories (they may overlap), as SQL conditions
+# on an extreme predictions row
+EXTREME_CATEGORIES = {
+    'high_conf_wrong': "NOT coalesce(direction_correct, 0) AND confidence >= 70",
+    'low_conf_right': "direction_correct AND confidence <= 40",
+    'accurate_targets': "target_error_pct <= 0.05",
+    'large_misses': "target_error_pct >= 0.15",
+}
+
+
 # ===== VERIFIER SYSTEM CONFIG =====
 VERIFIER_ENABLED = os.environ.get("VERIFIER_ENABLED", "true").lower() == "true"
 VERIFIER_MODEL = os.environ.get("VERIFIER_MODEL", "gpt-4o")
 VERIFIER_BATCH_SIZE = 8  # Smaller batch for verifier learning
 
 
+def _dumps_list(items: List[str]) -> str:
+    """JSON text for a stored list column (the dashboard parses it too)."""
+    if not items:
+        return '[]'
+    return orjson.dumps(items).decode() if orjson else json.dumps(items)
+
+
+def _loads(text: str):
+    """json.loads, through orjson when it is installed."""
+    return orjson.loads(text) if orjson else json.loads(text)
+
+
+def _loads_list(text: Optional[str]) -> List[str]:
+    """Parse a stored list column; NULL and the common empty list skip the parser."""
+    if not text or text == '[]':
+        return []
+    return _loads(text)
+
+
+def _epoch_ms(timestamp: str) -> int:
+    """Epoch milliseconds of an ISO-8601 timestamp (naive means UTC)."""
+    moment = datetime.fromisoformat(timestamp)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return round(moment.timestamp() * 1000)
+
+
+def _json_block(text: str) -> Optional[str]:
+    """The body of the first ```json fenced block in an LLM reply, or None.
+    
+    Two str.find calls; same result as re.search(r'```json\s*(.*?)\s*```', DOTALL).
+    """
+    start = text.find('```json')
+    if start == -1:
+        return None
+    start += 7
+    end = text.find('```', start)
+    if end == -1:
+        return None
+    return text[start:end].strip()
+
+
+def _read_until_json_block(chunks) -> str:
+    """Join streamed reply text, stopping once the first ```json block has
+    closed; _json_block gives the same result on this as on the full reply,
+    and the caller can drop the rest of the stream unread."""
+    text = ''
+    start = -1
+    for chunk in chunks:
+        scan_from = max(len(text) - 6, 0)  # a marker may straddle chunks
+        text += chunk
+        if start == -1:
+            start = text.find('```json', scan_from)
+            if start == -1:
+                continue
+        if text.find('```', max(scan_from, start + 7)) != -1:
+            break
+    return text
+
+
+def _openai_stream_text(stream):
+    """The text deltas of a chat.completions stream."""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def _parse_learnings(text: str, count: int) -> Optional[List[str]]:
+    """The learnings from a batched extraction reply, or None unless it is
+    a JSON array of exactly `count` strings."""
+    json_block = _json_block(text)
+    try:
+        learnings = _loads(json_block if json_block is not None else text)
+    except ValueError:
+        return None
+    if not isinstance(learnings, list) or len(learnings) != count:
+        return None
+    if not all(isinstance(learning, str) for learning in learnings):
+        return None
+    return [learning.strip() for learning in learnings]
+
+
+def _learnings_batch_prompt(subject: str, cases: List[str], instruction: str) -> str:
+    """One prompt asking for a learning from each case, as a JSON array."""
+    numbered = "\n\n".join(f"# Case {i}\n\n{case}" for i, case in enumerate(cases, 1))
+    return f"""Analyze these {len(cases)} {subject} and extract a learning from each.
+
+{numbered}
+
+For each case, {instruction}
+
+Respond with a JSON array of exactly {len(cases)} strings, one learning per case, in case order:
+```json
+["<learning for case 1>", "<learning for case 2>", ...]
+```"""
+
+# ISO-8601 text -> epoch milliseconds (the same expression dashboard.py uses)
+ISO_TO_EPOCH_MS_SQL = "CAST(ROUND((julianday({}) - 2440587.5) * 86400000) AS INTEGER)"
+
+# Per-connection settings; the dashboard reads and writes the same file
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+
 class Database:
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
+        # One connection for the process instead of a connect() per call;
+        # autocommit, so each write statement commits on its own. Statements
+        # are prepared once and reused from its cache, keyed by SQL text
+        self.conn = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False, cached_statements=256
+        )
+        self.conn.row_factory = sqlite3.Row
+        for pragma in SQLITE_PRAGMAS:
+            self.conn.execute(pragma)
+        self._lock = threading.RLock()
+        # key -> (data version, value) for the hot read-only getters
+        self._memo = {}
+        # Bumped by the writes that change extremes' learnings or meta-rules
+        self._learnings_changes = 0
+        atexit.register(self.close)
         self.init_db()
     
+    @contextmanager
+    def transaction(self):
+        """Hold the lock and run the block inside BEGIN IMMEDIATE, so every
+        statement in it (executemany batches and other Database writes
+        included) shares one COMMIT. Nested blocks join the outer one."""
+        with self._lock:
+            if self.conn.in_transaction:
+                yield self.conn
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+    
+    def _memoized(self, key, build):
+        """build(), reused until the database changes.
+        
+        The version pairs this connection's total_changes with PRAGMA
+        data_version, which moves when another connection (the dashboard)
+        commits, so either side's writes invalidate it.
+        """
+        with self._lock:
+            version = (self.conn.total_changes, self.conn.execute("PRAGMA data_version").fetchone()[0])
+        hit = self._memo.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        value = build()
+        self._memo[key] = (version, value)
+        return value
+    
+    def learnings_version(self) -> tuple:
+        """Changes when the extremes or meta-rules may have: after this
+        process's batch analysis or meta-analysis writes, or any commit by
+        another connection. Unlike _memoized's version, routine prediction
+        saves and resolutions leave it alone."""
+        with self._lock:
+            return self._learnings_changes, self.conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def optimize(self):
+        """PRAGMA optimize: re-ANALYZE only the tables whose statistics this
+        connection's queries suggest are stale (usually a no-op)."""
+        with self._lock:
+            self.conn.execute("PRAGMA optimize")
+    
+    def close(self):
+        self.optimize()
+        self.conn.close()
+    
     def init_db(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conn
+        # page_size only takes on a new file, before the first table and
+        # the switch to WAL; journal_mode=WAL then sticks to the file
+        conn.execute("PRAGMA page_size=4096")
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS predictions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
+                timestamp_ms INTEGER,
                 current_price REAL NOT NULL,
                 predicted_direction TEXT NOT NULL,
                 predicted_target REAL NOT NULL,
@@ -177,129 +383,142 @@ class Database:
             )
         """)
         
-        conn.commit()
-        conn.close()
+        # Integer epoch-ms copy of the TEXT timestamp, which predictions are
+        # ordered by. Files created before it existed are backfilled here
+        # (dashboard.py adds the same column and backfill for its side)
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(predictions)")]
+        if 'timestamp_ms' not in columns:
+            conn.execute("ALTER TABLE predictions ADD COLUMN timestamp_ms INTEGER")
+        conn.execute(f"""
+            UPDATE predictions SET timestamp_ms = {ISO_TO_EPOCH_MS_SQL.format('timestamp')}
+            WHERE timestamp_ms IS NULL
+        """)
+        # The row's origin; dashboard.py adds it with the same default, and
+        # idx_pred_stats below includes it
+        if 'source' not in columns:
+            conn.execute("ALTER TABLE predictions ADD COLUMN source TEXT DEFAULT 'claude'")
+        
+        # Partial indexes matching the WHERE of each newest-first read, so
+        # those walk a small index instead of scanning and sorting the table
+        # (idx_pred_resolved_ts, idx_pred_extreme_ts and the verifier ones are
+        # the same as dashboard.py creates)
+        for index in (
+            """CREATE INDEX IF NOT EXISTS idx_pred_resolved_ts
+               ON predictions(timestamp_ms) WHERE resolved_at IS NOT NULL""",
+            """CREATE INDEX IF NOT EXISTS idx_pred_pending_ts
+               ON predictions(timestamp_ms) WHERE resolved_at IS NOT NULL AND is_extreme IS NULL""",
+            """CREATE INDEX IF NOT EXISTS idx_pred_extreme_ts
+               ON predictions(timestamp_ms) WHERE is_extreme = 1 AND learning_extracted IS NOT NULL""",
+            """CREATE INDEX IF NOT EXISTS idx_vp_prediction
+               ON verifier_predictions(prediction_id)""",
+            """CREATE INDEX IF NOT EXISTS idx_vp_pending_batch
+               ON verifier_predictions(timestamp) WHERE resolved_at IS NOT NULL AND is_extreme IS NULL""",
+            """CREATE INDEX IF NOT EXISTS idx_vp_extreme_ts
+               ON verifier_predictions(timestamp) WHERE is_extreme = 1 AND learning_extracted IS NOT NULL""",
+        ):
+            conn.execute(index)
+        
+        # Covers get_stats' aggregate, so the scan it does after every write
+        # reads this narrow index rather than each full row and its reasoning.
+        # The same index as dashboard.py's (source serves its local LLM
+        # counters), so the two don't maintain near-copies of each other
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pred_stats
+            ON predictions(resolved_at, direction_correct, is_extreme, target_error_pct, calibration_score, source)
+        """)
+        
+        # Give the planner statistics for a file that has never had them;
+        # after that optimize() keeps them current cheaply
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None:
+            conn.execute("ANALYZE")
     
     # ===== VERIFIER DATABASE METHODS =====
     
     def save_verifier_prediction(self, vpred: 'VerifierPrediction') -> int:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO verifier_predictions (
-                prediction_id, timestamp, agrees_with_claude, confidence_claude_correct,
-                reasoning, concerns, meta_rule_violations
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            vpred.prediction_id, vpred.timestamp, vpred.agrees_with_claude,
-            vpred.confidence_claude_correct, vpred.reasoning,
-            json.dumps(vpred.concerns), json.dumps(vpred.meta_rule_violations)
-        ))
-        vpred_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO verifier_predictions (
+                    prediction_id, timestamp, agrees_with_claude, confidence_claude_correct,
+                    reasoning, concerns, meta_rule_violations
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                vpred.prediction_id, vpred.timestamp, vpred.agrees_with_claude,
+                vpred.confidence_claude_correct, vpred.reasoning,
+                _dumps_list(vpred.concerns), _dumps_list(vpred.meta_rule_violations)
+            ))
+            vpred_id = cursor.lastrowid
         return vpred_id
     
     def update_verifier_resolution(self, vpred: 'VerifierPrediction'):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            UPDATE verifier_predictions SET
-                resolved_at = ?,
-                gpt_was_correct = ?,
-                is_extreme = ?,
-                extreme_reason = ?,
-                learning_extracted = ?
-            WHERE id = ?
-        """, (
-            vpred.resolved_at, vpred.gpt_was_correct, vpred.is_extreme,
-            vpred.extreme_reason, vpred.learning_extracted, vpred.id
-        ))
-        conn.commit()
-        conn.close()
+        self.update_verifier_resolutions_bulk([vpred])
+    
+    def update_verifier_resolutions_bulk(self, vpreds: List['VerifierPrediction']):
+        """Write the resolution fields of several verifier predictions in one transaction."""
+        with self.transaction() as conn:
+            conn.executemany("""
+                UPDATE verifier_predictions SET
+                    resolved_at = ?,
+                    gpt_was_correct = ?,
+                    is_extreme = ?,
+                    extreme_reason = ?,
+                    learning_extracted = ?
+                WHERE id = ?
+            """, [(
+                vpred.resolved_at, vpred.gpt_was_correct, vpred.is_extreme,
+                vpred.extreme_reason, vpred.learning_extracted, vpred.id
+            ) for vpred in vpreds])
     
     def get_verifier_for_prediction(self, prediction_id: int) -> Optional['VerifierPrediction']:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM verifier_predictions WHERE prediction_id = ?
-        """, (prediction_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {VERIFIER_COLUMNS} FROM verifier_predictions WHERE prediction_id = ?
+            """, (prediction_id,))
+            row = cursor.fetchone()
         if row:
-            return VerifierPrediction(
-                id=row['id'],
-                prediction_id=row['prediction_id'],
-                timestamp=row['timestamp'],
-                agrees_with_claude=bool(row['agrees_with_claude']),
-                confidence_claude_correct=row['confidence_claude_correct'],
-                reasoning=row['reasoning'],
-                concerns=json.loads(row['concerns']) if row['concerns'] else [],
-                meta_rule_violations=json.loads(row['meta_rule_violations']) if row['meta_rule_violations'] else [],
-                resolved_at=row['resolved_at'],
-                gpt_was_correct=bool(row['gpt_was_correct']) if row['gpt_was_correct'] is not None else None,
-                is_extreme=bool(row['is_extreme']) if row['is_extreme'] is not None else None,
-                extreme_reason=row['extreme_reason'],
-                learning_extracted=row['learning_extracted']
-            )
+            return self._row_to_verifier_prediction(row)
         return None
     
     def get_verifier_extremes(self, limit: int = 10) -> List['VerifierPrediction']:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM verifier_predictions 
-            WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
-            ORDER BY timestamp DESC LIMIT ?
-        """, (limit,))
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {VERIFIER_COLUMNS} FROM verifier_predictions 
+                WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
+                ORDER BY timestamp DESC LIMIT ?
+            """, (limit,))
+            rows = cursor.fetchall()
         return [self._row_to_verifier_prediction(r) for r in rows]
     
     def get_verifier_recent_for_batch(self, batch_size: int = VERIFIER_BATCH_SIZE) -> List['VerifierPrediction']:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM verifier_predictions 
-            WHERE resolved_at IS NOT NULL AND is_extreme IS NULL
-            ORDER BY timestamp DESC LIMIT ?
-        """, (batch_size,))
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {VERIFIER_COLUMNS} FROM verifier_predictions 
+                WHERE resolved_at IS NOT NULL AND is_extreme IS NULL
+                ORDER BY timestamp DESC LIMIT ?
+            """, (batch_size,))
+            rows = cursor.fetchall()
         return [self._row_to_verifier_prediction(r) for r in rows]
     
     def get_verifier_stats(self) -> dict:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM verifier_predictions")
-        total = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM verifier_predictions WHERE resolved_at IS NOT NULL")
-        resolved = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM verifier_predictions WHERE gpt_was_correct = 1")
-        correct = cursor.fetchone()[0]
-        
-        # Catches: GPT disagreed and Claude was wrong
-        cursor.execute("""
-            SELECT COUNT(*) FROM verifier_predictions vp
-            JOIN predictions p ON vp.prediction_id = p.id
-            WHERE vp.agrees_with_claude = 0 AND p.direction_correct = 0
-        """)
-        catches = cursor.fetchone()[0]
-        
-        # False alarms: GPT disagreed but Claude was right
-        cursor.execute("""
-            SELECT COUNT(*) FROM verifier_predictions vp
-            JOIN predictions p ON vp.prediction_id = p.id
-            WHERE vp.agrees_with_claude = 0 AND p.direction_correct = 1
-        """)
-        false_alarms = cursor.fetchone()[0]
-        
-        conn.close()
+        # One pass over verifier_predictions; catches are disagreements where
+        # Claude was wrong, false alarms disagreements where Claude was right
+        with self._lock:
+            total, resolved, correct, catches, false_alarms = self.conn.execute("""
+                SELECT
+                    COUNT(*),
+                    COUNT(vp.resolved_at),
+                    COUNT(CASE WHEN vp.gpt_was_correct = 1 THEN 1 END),
+                    COUNT(CASE WHEN vp.agrees_with_claude = 0 AND p.direction_correct = 0 THEN 1 END),
+                    COUNT(CASE WHEN vp.agrees_with_claude = 0 AND p.direction_correct = 1 THEN 1 END)
+                FROM verifier_predictions vp
+                LEFT JOIN predictions p ON vp.prediction_id = p.id
+            """).fetchone()
         
         return {
             "total": total,
@@ -311,76 +530,59 @@ class Database:
         }
     
     def save_verifier_meta_learning(self, meta_data: dict) -> int:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO verifier_meta_learnings (
-                timestamp, predictions_analyzed, learnings_analyzed,
-                accuracy_at_analysis, pattern_type, pattern_description,
-                meta_rule, confidence_score
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            meta_data['timestamp'], meta_data['predictions_analyzed'],
-            meta_data['learnings_analyzed'], meta_data['accuracy_at_analysis'],
-            meta_data['pattern_type'], meta_data['pattern_description'],
-            meta_data['meta_rule'], meta_data['confidence_score']
-        ))
-        meta_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO verifier_meta_learnings (
+                    timestamp, predictions_analyzed, learnings_analyzed,
+                    accuracy_at_analysis, pattern_type, pattern_description,
+                    meta_rule, confidence_score
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                meta_data['timestamp'], meta_data['predictions_analyzed'],
+                meta_data['learnings_analyzed'], meta_data['accuracy_at_analysis'],
+                meta_data['pattern_type'], meta_data['pattern_description'],
+                meta_data['meta_rule'], meta_data['confidence_score']
+            ))
+            meta_id = cursor.lastrowid
         return meta_id
     
     def get_verifier_meta_rules(self) -> List[dict]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM verifier_meta_learnings 
-            WHERE is_active = 1
-            ORDER BY confidence_score DESC LIMIT 5
-        """)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT * FROM verifier_meta_learnings 
+                WHERE is_active = 1
+                ORDER BY confidence_score DESC LIMIT 5
+            """)
+            rows = cursor.fetchall()
         return [dict(r) for r in rows]
     
     def save_consensus_outcome(self, outcome: dict):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            INSERT INTO consensus_outcomes (
-                prediction_id, timestamp, models_agreed, consensus_direction,
-                consensus_confidence, claude_correct, gpt_correct, outcome_type
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            outcome['prediction_id'], outcome['timestamp'], outcome['models_agreed'],
-            outcome['consensus_direction'], outcome['consensus_confidence'],
-            outcome['claude_correct'], outcome['gpt_correct'], outcome['outcome_type']
-        ))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO consensus_outcomes (
+                    prediction_id, timestamp, models_agreed, consensus_direction,
+                    consensus_confidence, claude_correct, gpt_correct, outcome_type
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                outcome['prediction_id'], outcome['timestamp'], outcome['models_agreed'],
+                outcome['consensus_direction'], outcome['consensus_confidence'],
+                outcome['claude_correct'], outcome['gpt_correct'], outcome['outcome_type']
+            ))
     
     def get_consensus_stats(self) -> dict:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE models_agreed = 1")
-        agreed = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE models_agreed = 0")
-        disagreed = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE models_agreed = 1 AND claude_correct = 1")
-        agreed_wins = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE outcome_type = 'gpt_caught_error'")
-        catches = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE outcome_type = 'gpt_false_alarm'")
-        false_alarms = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM consensus_outcomes WHERE outcome_type = 'shared_blind_spot'")
-        blind_spots = cursor.fetchone()[0]
-        
-        conn.close()
+        with self._lock:
+            agreed, disagreed, agreed_wins, catches, false_alarms, blind_spots = self.conn.execute("""
+                SELECT
+                    COUNT(CASE WHEN models_agreed = 1 THEN 1 END),
+                    COUNT(CASE WHEN models_agreed = 0 THEN 1 END),
+                    COUNT(CASE WHEN models_agreed = 1 AND claude_correct = 1 THEN 1 END),
+                    COUNT(CASE WHEN outcome_type = 'gpt_caught_error' THEN 1 END),
+                    COUNT(CASE WHEN outcome_type = 'gpt_false_alarm' THEN 1 END),
+                    COUNT(CASE WHEN outcome_type = 'shared_blind_spot' THEN 1 END)
+                FROM consensus_outcomes
+            """).fetchone()
         
         return {
             "agreed": agreed,
@@ -392,143 +594,162 @@ class Database:
         }
     
     def _row_to_verifier_prediction(self, row) -> 'VerifierPrediction':
-        return VerifierPrediction(
-            id=row['id'],
-            prediction_id=row['prediction_id'],
-            timestamp=row['timestamp'],
-            agrees_with_claude=bool(row['agrees_with_claude']),
-            confidence_claude_correct=row['confidence_claude_correct'],
-            reasoning=row['reasoning'],
-            concerns=json.loads(row['concerns']) if row['concerns'] else [],
-            meta_rule_violations=json.loads(row['meta_rule_violations']) if row['meta_rule_violations'] else [],
-            resolved_at=row['resolved_at'],
-            gpt_was_correct=bool(row['gpt_was_correct']) if row['gpt_was_correct'] is not None else None,
-            is_extreme=bool(row['is_extreme']) if row['is_extreme'] is not None else None,
-            extreme_reason=row['extreme_reason'],
-            learning_extracted=row['learning_extracted']
-        )
+        """Build from a VERIFIER_COLUMNS tuple, restoring bools and the JSON lists."""
+        vpred = VerifierPrediction(*row)
+        vpred.agrees_with_claude = bool(vpred.agrees_with_claude)
+        vpred.concerns = _loads_list(vpred.concerns)
+        vpred.meta_rule_violations = _loads_list(vpred.meta_rule_violations)
+        if vpred.gpt_was_correct is not None:
+            vpred.gpt_was_correct = bool(vpred.gpt_was_correct)
+        if vpred.is_extreme is not None:
+            vpred.is_extreme = bool(vpred.is_extreme)
+        return vpred
     
     def save_prediction(self, pred: Prediction) -> int:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO predictions (
-                timestamp, current_price, predicted_direction, predicted_target,
-                confidence, reasoning
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            pred.timestamp, pred.current_price, pred.predicted_direction,
-            pred.predicted_target, pred.confidence, pred.reasoning
-        ))
-        pred_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO predictions (
+                    timestamp, timestamp_ms, current_price, predicted_direction, predicted_target,
+                    confidence, reasoning
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                pred.timestamp, _epoch_ms(pred.timestamp), pred.current_price, pred.predicted_direction,
+                pred.predicted_target, pred.confidence, pred.reasoning
+            ))
+            pred_id = cursor.lastrowid
         return pred_id
     
     def update_resolution(self, pred: Prediction):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            UPDATE predictions SET
-                resolved_at = ?,
-                actual_price = ?,
-                actual_direction = ?,
-                direction_correct = ?,
-                target_error_pct = ?,
-                calibration_score = ?,
-                is_extreme = ?,
-                extreme_reason = ?,
-                learning_extracted = ?
-            WHERE id = ?
-        """, (
-            pred.resolved_at, pred.actual_price, pred.actual_direction,
-            pred.direction_correct, pred.target_error_pct, pred.calibration_score,
-            pred.is_extreme, pred.extreme_reason, pred.learning_extracted,
-            pred.id
-        ))
-        conn.commit()
-        conn.close()
+        self.update_resolutions_bulk([pred])
+    
+    def update_resolutions_bulk(self, preds: List[Prediction]):
+        """Write the resolution fields of several predictions in one transaction."""
+        with self.transaction() as conn:
+            conn.executemany("""
+                UPDATE predictions SET
+                    resolved_at = ?,
+                    actual_price = ?,
+                    actual_direction = ?,
+                    direction_correct = ?,
+                    target_error_pct = ?,
+                    calibration_score = ?,
+                    is_extreme = ?,
+                    extreme_reason = ?,
+                    learning_extracted = ?
+                WHERE id = ?
+            """, [(
+                pred.resolved_at, pred.actual_price, pred.actual_direction,
+                pred.direction_correct, pred.target_error_pct, pred.calibration_score,
+                pred.is_extreme, pred.extreme_reason, pred.learning_extracted,
+                pred.id
+            ) for pred in preds])
+            # Batch analysis sets is_extreme; plain resolutions leave it None
+            if any(pred.is_extreme is not None for pred in preds):
+                self._learnings_changes += 1
     
     def get_extremes(self, limit: int = CONTEXT_EXAMPLES) -> List[Prediction]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM predictions 
-            WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        rows = cursor.fetchall()
-        conn.close()
+        return self._memoized(('extremes', limit), lambda: self._read_extremes(limit))
+    
+    def _read_extremes(self, limit: int) -> List[Prediction]:
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {PREDICTION_COLUMNS} FROM predictions 
+                WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
+                ORDER BY timestamp_ms DESC
+                LIMIT ?
+            """, (limit,))
+            rows = cursor.fetchall()
         return [self._row_to_prediction(r) for r in rows]
     
     def get_all_extremes(self) -> List[Prediction]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM predictions 
-            WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
-            ORDER BY timestamp ASC
-        """)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {PREDICTION_COLUMNS} FROM predictions 
+                WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
+                ORDER BY timestamp_ms ASC
+            """)
+            rows = cursor.fetchall()
         return [self._row_to_prediction(r) for r in rows]
     
+    def get_categorized_extremes(self, sample_size: int = 5) -> tuple:
+        """(number of extremes with a learning, {category: (count, samples)})
+        for meta-analysis, where samples are the category's newest
+        sample_size learnings, oldest first. Counted and sampled in SQL
+        (see EXTREME_CATEGORIES), so only those rows reach Python."""
+        counts = ', '.join(f"COUNT(CASE WHEN {where} THEN 1 END)" for where in EXTREME_CATEGORIES.values())
+        samples = ' UNION ALL '.join(
+            f"""SELECT * FROM (
+                SELECT ? AS category, timestamp_ms, learning_extracted FROM predictions
+                WHERE is_extreme = 1 AND learning_extracted IS NOT NULL AND ({where})
+                ORDER BY timestamp_ms DESC LIMIT ?
+            )"""
+            for where in EXTREME_CATEGORIES.values()
+        )
+        params = []
+        for category in EXTREME_CATEGORIES:
+            params += [category, sample_size]
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            total, *category_counts = cursor.execute(f"""
+                SELECT COUNT(*), {counts} FROM predictions
+                WHERE is_extreme = 1 AND learning_extracted IS NOT NULL
+            """).fetchone()
+            rows = cursor.execute(samples, params).fetchall()
+        
+        categories = {category: (count, []) for category, count in zip(EXTREME_CATEGORIES, category_counts)}
+        for category, _, learning in reversed(rows):
+            categories[category][1].append(learning)
+        return total, categories
+    
     def get_recent_for_batch_analysis(self, batch_size: int = BATCH_SIZE) -> List[Prediction]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM predictions 
-            WHERE resolved_at IS NOT NULL AND is_extreme IS NULL
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (batch_size,))
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {PREDICTION_COLUMNS} FROM predictions 
+                WHERE resolved_at IS NOT NULL AND is_extreme IS NULL
+                ORDER BY timestamp_ms DESC
+                LIMIT ?
+            """, (batch_size,))
+            rows = cursor.fetchall()
         return [self._row_to_prediction(r) for r in rows]
     
     def get_resolved(self, limit: int = 100) -> List[Prediction]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM predictions 
-            WHERE resolved_at IS NOT NULL
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {PREDICTION_COLUMNS} FROM predictions 
+                WHERE resolved_at IS NOT NULL
+                ORDER BY timestamp_ms DESC
+                LIMIT ?
+            """, (limit,))
+            rows = cursor.fetchall()
         return [self._row_to_prediction(r) for r in rows]
     
     def get_stats(self) -> dict:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM predictions")
-        total = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM predictions WHERE resolved_at IS NOT NULL")
-        resolved = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM predictions WHERE direction_correct = 1")
-        correct = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT AVG(target_error_pct) FROM predictions WHERE resolved_at IS NOT NULL")
-        avg_error = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT AVG(calibration_score) FROM predictions WHERE resolved_at IS NOT NULL")
-        avg_calibration = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM predictions WHERE is_extreme = 1")
-        extremes = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM meta_learnings WHERE is_active = 1")
-        meta_rules = cursor.fetchone()[0]
-        
-        conn.close()
+        return self._memoized('stats', self._read_stats)
+    
+    def _read_stats(self) -> dict:
+        # One pass over predictions, with the averages over resolved rows only
+        with self._lock:
+            total, resolved, correct, avg_error, avg_calibration, extremes, meta_rules = self.conn.execute("""
+                SELECT
+                    COUNT(*),
+                    COUNT(resolved_at),
+                    COUNT(CASE WHEN direction_correct = 1 THEN 1 END),
+                    AVG(CASE WHEN resolved_at IS NOT NULL THEN target_error_pct END),
+                    AVG(CASE WHEN resolved_at IS NOT NULL THEN calibration_score END),
+                    COUNT(CASE WHEN is_extreme = 1 THEN 1 END),
+                    (SELECT COUNT(*) FROM meta_learnings WHERE is_active = 1)
+                FROM predictions
+            """).fetchone()
         
         return {
             "total_predictions": total,
@@ -543,123 +764,115 @@ class Database:
     
     def get_accuracy_for_range(self, start_id: int, end_id: int) -> float:
         """Get accuracy for a specific range of predictions."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN direction_correct = 1 THEN 1 ELSE 0 END) as correct
-            FROM predictions 
-            WHERE id BETWEEN ? AND ? AND resolved_at IS NOT NULL
-        """, (start_id, end_id))
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT 
+                    COUNT(*) as total,
+                    SUM(CASE WHEN direction_correct = 1 THEN 1 ELSE 0 END) as correct
+                FROM predictions 
+                WHERE id BETWEEN ? AND ? AND resolved_at IS NOT NULL
+            """, (start_id, end_id))
+            row = cursor.fetchone()
         
         if row[0] == 0:
             return 0
         return (row[1] / row[0]) * 100
     
     def save_meta_learning(self, meta_data: dict) -> int:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO meta_learnings (
-                timestamp, predictions_analyzed, learnings_analyzed,
-                accuracy_at_analysis, pattern_type, pattern_description,
-                meta_rule, confidence_score
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            meta_data['timestamp'],
-            meta_data['predictions_analyzed'],
-            meta_data['learnings_analyzed'],
-            meta_data['accuracy_at_analysis'],
-            meta_data['pattern_type'],
-            meta_data['pattern_description'],
-            meta_data['meta_rule'],
-            meta_data['confidence_score']
-        ))
-        meta_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO meta_learnings (
+                    timestamp, predictions_analyzed, learnings_analyzed,
+                    accuracy_at_analysis, pattern_type, pattern_description,
+                    meta_rule, confidence_score
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                meta_data['timestamp'],
+                meta_data['predictions_analyzed'],
+                meta_data['learnings_analyzed'],
+                meta_data['accuracy_at_analysis'],
+                meta_data['pattern_type'],
+                meta_data['pattern_description'],
+                meta_data['meta_rule'],
+                meta_data['confidence_score']
+            ))
+            meta_id = cursor.lastrowid
+            self._learnings_changes += 1
         return meta_id
     
     def get_active_meta_rules(self) -> List[dict]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM meta_learnings 
-            WHERE is_active = 1
-            ORDER BY confidence_score DESC
-            LIMIT 5
-        """)
-        rows = cursor.fetchall()
-        conn.close()
+        return self._memoized('meta_rules', self._read_active_meta_rules)
+    
+    def _read_active_meta_rules(self) -> List[dict]:
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT * FROM meta_learnings 
+                WHERE is_active = 1
+                ORDER BY confidence_score DESC
+                LIMIT 5
+            """)
+            rows = cursor.fetchall()
         return [dict(r) for r in rows]
     
     def get_last_meta_analysis_count(self) -> int:
         """Get the prediction count at last meta-analysis."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT predictions_analyzed FROM meta_learnings 
-            ORDER BY timestamp DESC LIMIT 1
-        """)
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT predictions_analyzed FROM meta_learnings 
+                ORDER BY timestamp DESC LIMIT 1
+            """)
+            row = cursor.fetchone()
         return row[0] if row else 0
     
     def export_to_json(self, filepath: str = "predictions_export.json"):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM predictions ORDER BY timestamp ASC")
-        rows = cursor.fetchall()
-        conn.close()
-        
-        data = [dict(row) for row in rows]
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
-        return len(data)
+        # Written row by row as the cursor yields them, in the same layout
+        # as json.dump(rows, indent=2), rather than building the whole list
+        if orjson:
+            encode = lambda row: orjson.dumps(row, option=orjson.OPT_INDENT_2).decode()
+        else:
+            encode = lambda row: json.dumps(row, indent=2)
+        count = 0
+        with self._lock, open(filepath, 'w') as f:
+            f.write('[')
+            for row in self.conn.execute("SELECT * FROM predictions ORDER BY timestamp_ms ASC"):
+                f.write(',\n  ' if count else '\n  ')
+                f.write(encode(dict(row)).replace('\n', '\n  '))
+                count += 1
+            f.write('\n]' if count else ']')
+        return count
     
     def export_to_csv(self, filepath: str = "predictions_export.csv"):
         import csv
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM predictions ORDER BY timestamp ASC")
-        rows = cursor.fetchall()
-        conn.close()
-        
-        if not rows:
-            return 0
-        
-        with open(filepath, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(dict(row))
-        return len(rows)
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute("SELECT * FROM predictions ORDER BY timestamp_ms ASC")
+            first = cursor.fetchone()
+            if first is None:
+                return 0
+            
+            # Plain tuples written as the cursor yields them
+            count = 1
+            with open(filepath, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([column[0] for column in cursor.description])
+                writer.writerow(first)
+                for count, row in enumerate(cursor, 2):
+                    writer.writerow(row)
+        return count
     
     def _row_to_prediction(self, row) -> Prediction:
-        return Prediction(
-            id=row['id'],
-            timestamp=row['timestamp'],
-            current_price=row['current_price'],
-            predicted_direction=row['predicted_direction'],
-            predicted_target=row['predicted_target'],
-            confidence=row['confidence'],
-            reasoning=row['reasoning'],
-            resolved_at=row['resolved_at'],
-            actual_price=row['actual_price'],
-            actual_direction=row['actual_direction'],
-            direction_correct=bool(row['direction_correct']) if row['direction_correct'] is not None else None,
-            target_error_pct=row['target_error_pct'],
-            calibration_score=row['calibration_score'],
-            is_extreme=bool(row['is_extreme']) if row['is_extreme'] is not None else None,
-            extreme_reason=row['extreme_reason'],
-            learning_extracted=row['learning_extracted']
-        )
+        """Build from a PREDICTION_COLUMNS tuple, restoring the bools."""
+        pred = Prediction(*row)
+        if pred.direction_correct is not None:
+            pred.direction_correct = bool(pred.direction_correct)
+        if pred.is_extreme is not None:
+            pred.is_extreme = bool(pred.is_extreme)
+        return pred
 
 
 class BinanceClient:
@@ -671,45 +884,53 @@ class BinanceClient:
     
     def __init__(self):
         self.use_fallback = False
+        # Kept-alive connections (and TLS sessions) across calls and cycles
+        self.session = requests.Session()
+    
+    def _get_json(self, url: str, params: dict):
+        response = self.session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        return orjson.loads(response.content) if orjson else response.json()
     
     def get_btc_price(self) -> float:
         if not self.use_fallback:
             try:
-                response = requests.get(f"{self.BINANCE_URL}/ticker/price", params={"symbol": "BTCUSDT"}, timeout=10)
-                response.raise_for_status()
-                return float(response.json()["price"])
+                data = self._get_json(f"{self.BINANCE_URL}/ticker/price", {"symbol": "BTCUSDT"})
+                return float(data["price"])
             except Exception as e:
                 print(f"⚠️ Binance failed ({e}), switching to CryptoCompare fallback")
                 self.use_fallback = True
         
         # Fallback to CryptoCompare
-        response = requests.get(f"{self.CRYPTOCOMPARE_URL}/price", params={
+        data = self._get_json(f"{self.CRYPTOCOMPARE_URL}/price", {
             "fsym": "BTC",
             "tsyms": "USDT"
-        }, timeout=10)
-        response.raise_for_status()
-        return float(response.json()["USDT"])
+        })
+        return float(data["USDT"])
     
     def get_recent_klines(self, interval: str = "5m", limit: int = 288) -> List[dict]:
         if not self.use_fallback:
             try:
-                response = requests.get(f"{self.BINANCE_URL}/klines", params={
+                klines = self._get_json(f"{self.BINANCE_URL}/klines", {
                     "symbol": "BTCUSDT",
                     "interval": interval,
                     "limit": limit
-                }, timeout=10)
-                response.raise_for_status()
-                klines = response.json()
+                })
                 
-                return [{
-                    "open_time": datetime.fromtimestamp(k[0]/1000, tz=timezone.utc).isoformat(),
-                    "open": float(k[1]),
-                    "high": float(k[2]),
-                    "low": float(k[3]),
-                    "close": float(k[4]),
-                    "volume": float(k[5]),
-                    "change_pct": round((float(k[4]) - float(k[1])) / float(k[1]) * 100, 3)
-                } for k in klines]
+                candles = []
+                for k in klines:
+                    # Binance sends prices as strings; convert each once
+                    open_price, close = float(k[1]), float(k[4])
+                    candles.append({
+                        "open_time": datetime.fromtimestamp(k[0]/1000, tz=timezone.utc).isoformat(),
+                        "open": open_price,
+                        "high": float(k[2]),
+                        "low": float(k[3]),
+                        "close": close,
+                        "volume": float(k[5]),
+                        "change_pct": round((close - open_price) / open_price * 100, 3)
+                    })
+                return candles
             except Exception as e:
                 print(f"⚠️ Binance klines failed ({e}), switching to CryptoCompare fallback")
                 self.use_fallback = True
@@ -727,31 +948,31 @@ class BinanceClient:
             endpoint = "histominute"
             aggregate = 5
         
-        response = requests.get(f"{self.CRYPTOCOMPARE_URL}/{endpoint}", params={
+        data = self._get_json(f"{self.CRYPTOCOMPARE_URL}/{endpoint}", {
             "fsym": "BTC",
             "tsym": "USDT",
             "limit": limit,
             "aggregate": aggregate
-        }, timeout=10)
-        response.raise_for_status()
-        data = response.json()["Data"]
-        
-        return [{
-            "open_time": datetime.fromtimestamp(k["time"], tz=timezone.utc).isoformat(),
-            "open": float(k["open"]),
-            "high": float(k["high"]),
-            "low": float(k["low"]),
-            "close": float(k["close"]),
-            "volume": float(k.get("volumefrom", 0)),
-            "change_pct": round((float(k["close"]) - float(k["open"])) / float(k["open"]) * 100, 3) if k["open"] > 0 else 0
-        } for k in data]
+        })["Data"]
+        
+        candles = []
+        for k in data:
+            open_price, close = float(k["open"]), float(k["close"])
+            candles.append({
+                "open_time": datetime.fromtimestamp(k["time"], tz=timezone.utc).isoformat(),
+                "open": open_price,
+                "high": float(k["high"]),
+                "low": float(k["low"]),
+                "close": close,
+                "volume": float(k.get("volumefrom", 0)),
+                "change_pct": round((close - open_price) / open_price * 100, 3) if k["open"] > 0 else 0
+            })
+        return candles
     
     def get_24h_stats(self) -> dict:
         if not self.use_fallback:
             try:
-                response = requests.get(f"{self.BINANCE_URL}/ticker/24hr", params={"symbol": "BTCUSDT"}, timeout=10)
-                response.raise_for_status()
-                data = response.json()
+                data = self._get_json(f"{self.BINANCE_URL}/ticker/24hr", {"symbol": "BTCUSDT"})
                 return {
                     "price_change_pct": float(data["priceChangePercent"]),
                     "high_24h": float(data["highPrice"]),
@@ -765,13 +986,11 @@ class BinanceClient:
                 self.use_fallback = True
         
         # Fallback: Get 24h of hourly data and calculate stats
-        response = requests.get(f"{self.CRYPTOCOMPARE_URL}/histohour", params={
+        data = self._get_json(f"{self.CRYPTOCOMPARE_URL}/histohour", {
             "fsym": "BTC",
             "tsym": "USDT",
             "limit": 24
-        }, timeout=10)
-        response.raise_for_status()
-        data = response.json()["Data"]
+        })["Data"]
         
         if not data:
             return {
@@ -812,6 +1031,7 @@ class MetaLearner:
     def __init__(self, client: Anthropic, db: Database):
         self.client = client
         self.db = db
+        self._meta_context_cache = None  # (learnings_version, text)
     
     def should_analyze(self) -> bool:
         """Check if it's time for meta-analysis."""
@@ -825,43 +1045,30 @@ class MetaLearner:
     
     def analyze(self) -> List[dict]:
         """Perform meta-analysis on accumulated learnings."""
-        extremes = self.db.get_all_extremes()
+        learnings_count, categories = self.db.get_categorized_extremes()
         stats = self.db.get_stats()
         
-        if len(extremes) < 20:
+        if learnings_count < 20:
             print("   Not enough learnings for meta-analysis yet")
             return []
         
-        # Categorize learnings
-        high_conf_wrong = [e for e in extremes if not e.direction_correct and e.confidence >= 70]
-        low_conf_right = [e for e in extremes if e.direction_correct and e.confidence <= 40]
-        accurate_targets = [e for e in extremes if e.target_error_pct <= 0.05]
-        large_misses = [e for e in extremes if e.target_error_pct >= 0.15]
-        
         # Build analysis prompt
-        prompt = self._build_meta_prompt(extremes, stats, {
-            'high_conf_wrong': high_conf_wrong,
-            'low_conf_right': low_conf_right,
-            'accurate_targets': accurate_targets,
-            'large_misses': large_misses
-        })
+        prompt = self._build_meta_prompt(learnings_count, stats, categories)
         
-        response = self.client.messages.create(
+        with self.client.messages.stream(
             model="claude-sonnet-4-20250514",
             max_tokens=1500,
             messages=[{"role": "user", "content": prompt}]
-        )
-        
-        response_text = response.content[0].text
+        ) as stream:
+            response_text = _read_until_json_block(stream.text_stream)
         
         # Parse meta-learnings
-        import re
-        json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-        if json_match:
-            meta_results = json.loads(json_match.group(1))
+        json_block = _json_block(response_text)
+        if json_block is not None:
+            meta_results = _loads(json_block)
         else:
             try:
-                meta_results = json.loads(response_text)
+                meta_results = _loads(response_text)
             except:
                 print("   Failed to parse meta-learning response")
                 return []
@@ -872,7 +1079,7 @@ class MetaLearner:
             meta_data = {
                 'timestamp': datetime.now(timezone.utc).isoformat(),
                 'predictions_analyzed': stats['total_predictions'],
-                'learnings_analyzed': len(extremes),
+                'learnings_analyzed': learnings_count,
                 'accuracy_at_analysis': stats['accuracy_pct'],
                 'pattern_type': meta.get('type', 'unknown'),
                 'pattern_description': meta.get('description', ''),
@@ -885,34 +1092,33 @@ class MetaLearner:
         
         return saved
     
-    def _build_meta_prompt(self, extremes: List[Prediction], stats: dict, categories: dict) -> str:
-        # Sample learnings from each category
-        def sample_learnings(preds, n=5):
-            sampled = preds[-n:] if len(preds) > n else preds
-            return "\n".join([f"  - {p.learning_extracted}" for p in sampled if p.learning_extracted])
+    def _build_meta_prompt(self, learnings_count: int, stats: dict, categories: dict) -> str:
+        # Sampled learnings from each category (see get_categorized_extremes)
+        def sample_learnings(category):
+            return "\n".join([f"  - {learning}" for learning in category[1] if learning])
         
         return f"""You are a meta-learning system analyzing patterns in trading prediction learnings.
 
 ## Current Performance
 - Total Predictions: {stats['total_predictions']}
 - Accuracy: {stats['accuracy_pct']:.1f}%
-- Total Learnings: {len(extremes)}
+- Total Learnings: {learnings_count}
 
 ## Learning Categories
 
-### High Confidence but Wrong ({len(categories['high_conf_wrong'])} cases)
+### High Confidence but Wrong ({categories['high_conf_wrong'][0]} cases)
 These are predictions where we were confident (70%+) but got the direction wrong:
 {sample_learnings(categories['high_conf_wrong'])}
 
-### Low Confidence but Right ({len(categories['low_conf_right'])} cases)
+### Low Confidence but Right ({categories['low_conf_right'][0]} cases)
 These are predictions where we had low confidence (40% or less) but were actually correct:
 {sample_learnings(categories['low_conf_right'])}
 
-### Exceptionally Accurate Targets ({len(categories['accurate_targets'])} cases)
+### Exceptionally Accurate Targets ({categories['accurate_targets'][0]} cases)
 These predictions hit very close to the target price:
 {sample_learnings(categories['accurate_targets'])}
 
-### Large Target Misses ({len(categories['large_misses'])} cases)
+### Large Target Misses ({categories['large_misses'][0]} cases)
 These predictions had significant errors in price targets:
 {sample_learnings(categories['large_misses'])}
 
@@ -946,7 +1152,14 @@ Respond in this exact JSON format:
 Identify 2-4 of the most significant patterns. Quality over quantity."""
     
     def get_meta_context(self) -> str:
-        """Build context string from active meta-rules."""
+        """Build context string from active meta-rules, reused until
+        Database.learnings_version moves."""
+        version = self.db.learnings_version()
+        if self._meta_context_cache is None or self._meta_context_cache[0] != version:
+            self._meta_context_cache = (version, self._build_meta_context())
+        return self._meta_context_cache[1]
+    
+    def _build_meta_context(self) -> str:
         meta_rules = self.db.get_active_meta_rules()
         
         if not meta_rules:
@@ -968,28 +1181,30 @@ Identify 2-4 of the most significant patterns. Quality over quantity."""
 class Verifier:
     """GPT-4 based verifier that checks Claude's predictions."""
     
-    def __init__(self, db: Database):
-        self.client = OpenAI()
+    def __init__(self, db: Database, client: Optional[OpenAI] = None):
+        self.client = client or OpenAI()
         self.db = db
     
     def verify_prediction(self, pred: Prediction, market: dict, claude_meta_rules: List[dict]) -> VerifierPrediction:
         """Have GPT-4 verify Claude's prediction."""
         prompt = self._build_verification_prompt(pred, market, claude_meta_rules)
         
-        response = self.client.chat.completions.create(
+        stream = self.client.chat.completions.create(
             model=VERIFIER_MODEL,
             max_tokens=800,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
         )
+        try:
+            response_text = _read_until_json_block(_openai_stream_text(stream))
+        finally:
+            stream.close()
         
-        response_text = response.choices[0].message.content
-        
-        import re
-        json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-        if json_match:
-            result = json.loads(json_match.group(1))
+        json_block = _json_block(response_text)
+        if json_block is not None:
+            result = _loads(json_block)
         else:
-            result = json.loads(response_text)
+            result = _loads(response_text)
         
         vpred = VerifierPrediction(
             id=None,
@@ -1008,9 +1223,10 @@ class Verifier:
     def _build_verification_prompt(self, pred: Prediction, market: dict, claude_meta_rules: List[dict]) -> str:
         meta_rules_text = ""
         if claude_meta_rules:
-            meta_rules_text = "\n## Claude's Active Meta-Rules (learned patterns)\n"
-            for i, rule in enumerate(claude_meta_rules, 1):
-                meta_rules_text += f"{i}. [{rule.get('pattern_type', 'unknown')}] {rule.get('meta_rule', '')}\n"
+            meta_rules_text = "\n## Claude's Active Meta-Rules (learned patterns)\n" + "".join(
+                f"{i}. [{rule.get('pattern_type', 'unknown')}] {rule.get('meta_rule', '')}\n"
+                for i, rule in enumerate(claude_meta_rules, 1)
+            )
         
         verifier_context = self._get_verifier_context()
         
@@ -1091,9 +1307,11 @@ Respond in this exact JSON format:
         self.db.update_verifier_resolution(vpred)
         return vpred
     
-    def analyze_batch_for_extremes(self) -> List[VerifierPrediction]:
-        """Analyze verifier predictions for extreme cases."""
-        batch = self.db.get_verifier_recent_for_batch(VERIFIER_BATCH_SIZE)
+    def analyze_batch_for_extremes(self, batch: Optional[List[VerifierPrediction]] = None) -> List[VerifierPrediction]:
+        """Analyze verifier predictions for extreme cases (the pending batch,
+        unless the caller has already fetched it)."""
+        if batch is None:
+            batch = self.db.get_verifier_recent_for_batch(VERIFIER_BATCH_SIZE)
         
         if len(batch) < VERIFIER_BATCH_SIZE:
             return []
@@ -1122,20 +1340,18 @@ Respond in this exact JSON format:
             if is_extreme:
                 vpred.is_extreme = True
                 vpred.extreme_reason = extreme_reason
-                vpred.learning_extracted = self._extract_learning(vpred)
                 extremes.append(vpred)
             else:
                 vpred.is_extreme = False
-            
-            self.db.update_verifier_resolution(vpred)
         
+        for vpred, learning in zip(extremes, self._extract_learnings_batch(extremes)):
+            vpred.learning_extracted = learning
+        
+        self.db.update_verifier_resolutions_bulk(batch)
         return extremes
     
-    def _extract_learning(self, vpred: VerifierPrediction) -> str:
-        """Extract learning from extreme verification."""
-        prompt = f"""Analyze this verification outcome and extract a learning for improving future verifications.
-
-## Your Verification
+    def _learning_case(self, vpred: VerifierPrediction) -> str:
+        return f"""## Your Verification
 - Agreed with Claude: {vpred.agrees_with_claude}
 - Confidence Claude correct: {vpred.confidence_claude_correct}%
 - Your reasoning: {vpred.reasoning}
@@ -1143,7 +1359,13 @@ Respond in this exact JSON format:
 
 ## Outcome
 - You were {"CORRECT" if vpred.gpt_was_correct else "WRONG"}
-- Why extreme: {vpred.extreme_reason}
+- Why extreme: {vpred.extreme_reason}"""
+    
+    def _extract_learning(self, vpred: VerifierPrediction) -> str:
+        """Extract learning from extreme verification."""
+        prompt = f"""Analyze this verification outcome and extract a learning for improving future verifications.
+
+{self._learning_case(vpred)}
 
 Extract a single, actionable learning (1-2 sentences) for improving your verification accuracy."""
 
@@ -1154,23 +1376,66 @@ Extract a single, actionable learning (1-2 sentences) for improving your verific
         )
         
         return response.choices[0].message.content.strip()
+    
+    def _extract_learnings_batch(self, vpreds: List[VerifierPrediction]) -> List[str]:
+        """Learnings for several extreme verifications from one request,
+        falling back to one request each if the reply can't be matched up."""
+        if len(vpreds) <= 1:
+            return [self._extract_learning(vpred) for vpred in vpreds]
+        
+        prompt = _learnings_batch_prompt(
+            "verification outcomes",
+            [self._learning_case(vpred) for vpred in vpreds],
+            "extract a single, actionable learning (1-2 sentences) for improving your verification accuracy."
+        )
+        stream = self.client.chat.completions.create(
+            model=VERIFIER_MODEL,
+            max_tokens=150 * len(vpreds),
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        )
+        try:
+            response_text = _read_until_json_block(_openai_stream_text(stream))
+        finally:
+            stream.close()
+        
+        learnings = _parse_learnings(response_text, len(vpreds))
+        if learnings is None:
+            learnings = [self._extract_learning(vpred) for vpred in vpreds]
+        return learnings
+
+
+# One candle line of the prediction prompt, as a bound str.format
+_format_candle = "  {} | O:{:,.2f} H:{:,.2f} L:{:,.2f} C:{:,.2f} | {:+.3f}%".format
 
 
 class Predictor:
-    def __init__(self):
-        self.client = Anthropic()
-        self.db = Database()
-        self.binance = BinanceClient()
+    def __init__(self, db_path: str = DB_PATH, client: Optional[Anthropic] = None,
+                 verifier_client: Optional[OpenAI] = None, binance: Optional['BinanceClient'] = None):
+        """The clients default to new ones; start.py passes the same ones to
+        every timeframe's Predictor."""
+        self.client = client or Anthropic()
+        self.db = Database(db_path)
+        self.binance = binance or BinanceClient()
         self.meta_learner = MetaLearner(self.client, self.db)
         
         # Verifier (GPT-4)
         if VERIFIER_ENABLED:
-            self.verifier = Verifier(self.db)
+            self.verifier = Verifier(self.db, verifier_client)
         else:
             self.verifier = None
+        
+        self._context_cache = None  # (learnings_version, text)
     
     def build_context(self) -> str:
-        """Build context from past extreme predictions and meta-rules."""
+        """Build context from past extreme predictions and meta-rules,
+        reused until Database.learnings_version moves."""
+        version = self.db.learnings_version()
+        if self._context_cache is None or self._context_cache[0] != version:
+            self._context_cache = (version, self._build_context())
+        return self._context_cache[1]
+    
+    def _build_context(self) -> str:
         extremes = self.db.get_extremes(limit=CONTEXT_EXAMPLES)
         meta_context = self.meta_learner.get_meta_context()
         
@@ -1207,26 +1472,28 @@ class Predictor:
         highs = [k['high'] for k in klines]
         lows = [k['low'] for k in klines]
         volumes = [k['volume'] for k in klines]
+        count = len(closes)
         
         current_price = closes[-1]
         
         ma_12 = sum(closes[-12:]) / 12
-        ma_48 = sum(closes[-48:]) / 48 if len(closes) >= 48 else sum(closes) / len(closes)
-        ma_288 = sum(closes) / len(closes)
+        ma_288 = sum(closes) / count
+        ma_48 = sum(closes[-48:]) / 48 if count >= 48 else ma_288
         
-        returns = [(closes[i] - closes[i-1]) / closes[i-1] * 100 for i in range(1, len(closes))]
+        returns = [(close - prev) / prev * 100 for prev, close in zip(closes, closes[1:])]
         avg_return = sum(returns) / len(returns)
-        volatility = (sum((r - avg_return) ** 2 for r in returns) / len(returns)) ** 0.5
+        deviations = [r - avg_return for r in returns]
+        volatility = (sum([d * d for d in deviations]) / len(returns)) ** 0.5
         
-        momentum_1h = (closes[-1] - closes[-12]) / closes[-12] * 100 if len(closes) >= 12 else 0
-        momentum_4h = (closes[-1] - closes[-48]) / closes[-48] * 100 if len(closes) >= 48 else 0
+        momentum_1h = (current_price - closes[-12]) / closes[-12] * 100
+        momentum_4h = (current_price - closes[-48]) / closes[-48] * 100 if count >= 48 else 0
         
         recent_high = max(highs[-24:])
         recent_low = min(lows[-24:])
         day_high = max(highs)
         day_low = min(lows)
         
-        avg_volume = sum(volumes) / len(volumes)
+        avg_volume = sum(volumes) / count
         recent_volume = sum(volumes[-6:]) / 6
         volume_ratio = recent_volume / avg_volume if avg_volume > 0 else 1
         
@@ -1261,20 +1528,25 @@ class Predictor:
         }
     
     def format_recent_candles(self, klines: List[dict], count: int = 12) -> str:
-        recent = klines[-count:]
-        lines = []
-        for k in recent:
-            time_str = k['open_time'][11:16]
-            lines.append(
-                f"  {time_str} | O:{k['open']:,.2f} H:{k['high']:,.2f} L:{k['low']:,.2f} C:{k['close']:,.2f} | {k['change_pct']:+.3f}%"
-            )
-        return "\n".join(lines)
+        return "\n".join(
+            _format_candle(k['open_time'][11:16], k['open'], k['high'], k['low'], k['close'], k['change_pct'])
+            for k in klines[-count:]
+        )
     
-    def make_prediction(self) -> Prediction:
-        current_price = self.binance.get_btc_price()
-        klines = self.binance.get_recent_klines(limit=288)
-        stats_24h = self.binance.get_24h_stats()
-        market = self.analyze_market_structure(klines)
+    def make_prediction(self, klines: Optional[List[dict]] = None, market: Optional[dict] = None,
+                        stats_24h: Optional[dict] = None) -> Prediction:
+        """Predict from fresh market data, or from klines (and their
+        analyze_market_structure result) and 24h stats the caller already
+        has, in which case the latest close stands in for the ticker price."""
+        if klines:
+            current_price = klines[-1]['close']
+        else:
+            current_price = self.binance.get_btc_price()
+            klines = self.binance.get_recent_klines(limit=288)
+        if stats_24h is None:
+            stats_24h = self.binance.get_24h_stats()
+        if market is None:
+            market = self.analyze_market_structure(klines)
         context = self.build_context()
         stats = self.db.get_stats()
         
@@ -1335,20 +1607,18 @@ Respond in this exact JSON format:
 }}
 ```"""
 
-        response = self.client.messages.create(
+        with self.client.messages.stream(
             model="claude-sonnet-4-20250514",
             max_tokens=800,
             messages=[{"role": "user", "content": prompt}]
-        )
-        
-        response_text = response.content[0].text
+        ) as stream:
+            response_text = _read_until_json_block(stream.text_stream)
         
-        import re
-        json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-        if json_match:
-            prediction_data = json.loads(json_match.group(1))
+        json_block = _json_block(response_text)
+        if json_block is not None:
+            prediction_data = _loads(json_block)
         else:
-            prediction_data = json.loads(response_text)
+            prediction_data = _loads(response_text)
         
         pred = Prediction(
             id=None,
@@ -1363,8 +1633,9 @@ Respond in this exact JSON format:
         pred.id = self.db.save_prediction(pred)
         return pred
     
-    def resolve_prediction(self, pred: Prediction) -> Prediction:
-        actual_price = self.binance.get_btc_price()
+    def resolve_prediction(self, pred: Prediction, actual_price: Optional[float] = None) -> Prediction:
+        if actual_price is None:
+            actual_price = self.binance.get_btc_price()
         
         pred.resolved_at = datetime.now(timezone.utc).isoformat()
         pred.actual_price = actual_price
@@ -1380,17 +1651,18 @@ Respond in this exact JSON format:
         self.db.update_resolution(pred)
         return pred
     
-    def analyze_batch_for_extremes(self) -> List[Prediction]:
-        batch = self.db.get_recent_for_batch_analysis(BATCH_SIZE)
+    def analyze_batch_for_extremes(self, batch: Optional[List[Prediction]] = None) -> List[Prediction]:
+        if batch is None:
+            batch = self.db.get_recent_for_batch_analysis(BATCH_SIZE)
         
         if len(batch) < BATCH_SIZE:
             print(f"Not enough predictions for batch analysis ({len(batch)}/{BATCH_SIZE})")
             return []
         
-        calibration_scores = [p.calibration_score for p in batch]
-        target_errors = [p.target_error_pct for p in batch]
-        
-        error_threshold_high = sorted(target_errors)[int(len(batch) * (1 - EXTREME_PERCENTILE/100))]
+        # The value sorted(errors)[int(n * 0.9)] would give, picked out as
+        # the k-th largest without sorting the whole batch
+        threshold_rank = len(batch) - int(len(batch) * (1 - EXTREME_PERCENTILE/100))
+        error_threshold_high = heapq.nlargest(threshold_rank, [p.target_error_pct for p in batch])[-1]
         
         extremes = []
         
@@ -1422,17 +1694,16 @@ Respond in this exact JSON format:
             
             if is_extreme:
                 pred.extreme_reason = extreme_reason
-                pred.learning_extracted = self._extract_learning(pred)
                 extremes.append(pred)
-            
-            self.db.update_resolution(pred)
         
+        for pred, learning in zip(extremes, self._extract_learnings_batch(extremes)):
+            pred.learning_extracted = learning
+        
+        self.db.update_resolutions_bulk(batch)
         return extremes
     
-    def _extract_learning(self, pred: Prediction) -> str:
-        prompt = f"""Analyze this extreme prediction and extract a concise learning.
-
-## The Prediction
+    def _learning_case(self, pred: Prediction) -> str:
+        return f"""## The Prediction
 - Time: {pred.timestamp}
 - Starting Price: ${pred.current_price:.2f}
 - Predicted: {pred.predicted_direction} to ${pred.predicted_target:.2f} ({pred.confidence}% confidence)
@@ -1445,7 +1716,12 @@ Respond in this exact JSON format:
 - Target Error: {pred.target_error_pct:.2f}%
 
 ## Why This Is Extreme
-{pred.extreme_reason}
+{pred.extreme_reason}"""
+    
+    def _extract_learning(self, pred: Prediction) -> str:
+        prompt = f"""Analyze this extreme prediction and extract a concise learning.
+
+{self._learning_case(pred)}
 
 Extract a single, actionable learning (1-2 sentences) that could improve future predictions. Focus on what pattern or mistake this reveals."""
 
@@ -1457,6 +1733,30 @@ Extract a single, actionable learning (1-2 sentences) that could improve future
         
         return response.content[0].text.strip()
     
+    def _extract_learnings_batch(self, preds: List[Prediction]) -> List[str]:
+        """Learnings for several extremes from one request, falling back to
+        one request each if the reply can't be matched up with the cases."""
+        if len(preds) <= 1:
+            return [self._extract_learning(pred) for pred in preds]
+        
+        prompt = _learnings_batch_prompt(
+            "extreme predictions",
+            [self._learning_case(pred) for pred in preds],
+            "extract a single, actionable learning (1-2 sentences) that could improve future predictions. "
+            "Focus on what pattern or mistake it reveals."
+        )
+        with self.client.messages.stream(
+            model="claude-sonnet-4-20250514",
+            max_tokens=150 * len(preds),
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            response_text = _read_until_json_block(stream.text_stream)
+        
+        learnings = _parse_learnings(response_text, len(preds))
+        if learnings is None:
+            learnings = [self._extract_learning(pred) for pred in preds]
+        return learnings
+    
     def run_meta_analysis_if_needed(self) -> List[dict]:
         """Check if meta-analysis is due and run it."""
         if self.meta_learner.should_analyze():
@@ -1554,16 +1854,20 @@ def wait_for_aligned_slot(interval_mins: int) -> datetime:
     return next_time
 
 
-def run_single_cycle(predictor: Predictor):
+def run_single_cycle(predictor: Predictor, interval_mins: int = PREDICTION_INTERVAL_MINS):
     print("\n" + "="*60)
     print(f"🔮 Making prediction at {datetime.now(timezone.utc).isoformat()}")
     
-    # Step 1: Get market data
-    klines = predictor.binance.get_recent_klines(limit=288)
-    market = predictor.analyze_market_structure(klines)
+    # Step 1: Get market data; the 24h ticker request runs alongside the
+    # klines one, since neither depends on the other
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        stats_future = pool.submit(predictor.binance.get_24h_stats)
+        klines = predictor.binance.get_recent_klines(limit=288)
+        market = predictor.analyze_market_structure(klines)
+        stats_24h = stats_future.result()
     
-    # Step 2: Claude makes prediction
-    pred = predictor.make_prediction()
+    # Step 2: Claude makes prediction from the same data
+    pred = predictor.make_prediction(klines, market, stats_24h)
     print(f"📊 Claude: {pred.predicted_direction} to ${pred.predicted_target:,.2f}")
     print(f"   Confidence: {pred.confidence}%")
     print(f"   Current: ${pred.current_price:,.2f}")
@@ -1589,52 +1893,50 @@ def run_single_cycle(predictor: Predictor):
         except Exception as e:
             print(f"   ⚠️ Verification failed: {e}")
     
-    print(f"\n⏳ Waiting {PREDICTION_INTERVAL_MINS} minutes for resolution...")
-    time.sleep(PREDICTION_INTERVAL_MINS * 60)
-    
-    # Step 4: Resolve Claude's prediction
-    pred = predictor.resolve_prediction(pred)
-    print(f"\n✅ Claude Resolved!")
-    print(f"   Actual: ${pred.actual_price:,.2f} ({pred.actual_direction})")
-    print(f"   Direction: {'✓ Correct' if pred.direction_correct else '✗ Wrong'}")
-    print(f"   Target Error: {pred.target_error_pct:.2f}%")
-    
-    # Step 5: Resolve GPT-4 verification
-    if vpred and predictor.verifier:
-        vpred = predictor.verifier.resolve_verification(vpred, pred.direction_correct)
-        print(f"\n🔍 GPT-4 Resolved: {'✓ Correct' if vpred.gpt_was_correct else '✗ Wrong'}")
-        
-        # Record consensus outcome
-        outcome_type = classify_outcome(pred, vpred)
-        predictor.db.save_consensus_outcome({
-            'prediction_id': pred.id,
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'models_agreed': vpred.agrees_with_claude,
-            'consensus_direction': consensus['direction'] if consensus else pred.predicted_direction,
-            'consensus_confidence': consensus['confidence'] if consensus else pred.confidence,
-            'claude_correct': pred.direction_correct,
-            'gpt_correct': vpred.gpt_was_correct,
-            'outcome_type': outcome_type
-        })
-        print(f"   Outcome: {outcome_type}")
-    
-    # Step 6: Batch analysis for Claude
-    pending_batch = predictor.db.get_recent_for_batch_analysis()
-    if len(pending_batch) >= BATCH_SIZE:
-        print(f"\n🔬 Analyzing Claude batch for extremes...")
-        extremes = predictor.analyze_batch_for_extremes()
-        print(f"   Found {len(extremes)} extreme predictions")
-    
-    # Step 7: Batch analysis for GPT-4
-    if predictor.verifier:
-        verifier_batch = predictor.db.get_verifier_recent_for_batch()
-        if len(verifier_batch) >= VERIFIER_BATCH_SIZE:
-            print(f"\n🔬 Analyzing GPT-4 batch for extremes...")
-            verifier_extremes = predictor.verifier.analyze_batch_for_extremes()
-            print(f"   Found {len(verifier_extremes)} verifier extremes")
+    # Steps 6-8 only look at predictions resolved in earlier cycles, so
+    # they run on a worker thread during the wait rather than after it
+    pool = ThreadPoolExecutor(max_workers=1)
+    learning = pool.submit(run_learning_steps, predictor)
+    pool.shutdown(wait=False)
     
-    # Step 8: Meta-analysis for Claude
-    predictor.run_meta_analysis_if_needed()
+    # The worker is joined even if the wait or resolve raises, so a failed
+    # cycle never leaves learning steps running into the next one
+    try:
+        print(f"\n⏳ Waiting {interval_mins} minutes for resolution...")
+        time.sleep(interval_mins * 60)
+        
+        # Steps 4-5 write in one transaction; the price is fetched first so
+        # the write lock is not held across the network call
+        actual_price = predictor.binance.get_btc_price()
+        with predictor.db.transaction():
+            # Step 4: Resolve Claude's prediction
+            pred = predictor.resolve_prediction(pred, actual_price)
+            print(f"\n✅ Claude Resolved!")
+            print(f"   Actual: ${pred.actual_price:,.2f} ({pred.actual_direction})")
+            print(f"   Direction: {'✓ Correct' if pred.direction_correct else '✗ Wrong'}")
+            print(f"   Target Error: {pred.target_error_pct:.2f}%")
+            
+            # Step 5: Resolve GPT-4 verification
+            if vpred and predictor.verifier:
+                vpred = predictor.verifier.resolve_verification(vpred, pred.direction_correct)
+                print(f"\n🔍 GPT-4 Resolved: {'✓ Correct' if vpred.gpt_was_correct else '✗ Wrong'}")
+                
+                # Record consensus outcome
+                outcome_type = classify_outcome(pred, vpred)
+                predictor.db.save_consensus_outcome({
+                    'prediction_id': pred.id,
+                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                    'models_agreed': vpred.agrees_with_claude,
+                    'consensus_direction': consensus['direction'] if consensus else pred.predicted_direction,
+                    'consensus_confidence': consensus['confidence'] if consensus else pred.confidence,
+                    'claude_correct': pred.direction_correct,
+                    'gpt_correct': vpred.gpt_was_correct,
+                    'outcome_type': outcome_type
+                })
+                print(f"   Outcome: {outcome_type}")
+    finally:
+        # Normally finished long ago; re-raises anything steps 6-8 raised
+        learning.result()
     
     # Print stats
     stats = predictor.db.get_stats()
@@ -1653,25 +1955,54 @@ def run_single_cycle(predictor: Predictor):
         print(f"   False Alarms: {vstats['false_alarms']}")
 
 
-def run_continuous(predictor: Predictor):
+def run_learning_steps(predictor: Predictor):
+    """Steps 6-8 of a cycle: batch analyses for both models, then Claude's
+    meta-analysis when due."""
+    # Step 6: Batch analysis for Claude
+    pending_batch = predictor.db.get_recent_for_batch_analysis()
+    if len(pending_batch) >= BATCH_SIZE:
+        print(f"\n🔬 Analyzing Claude batch for extremes...")
+        extremes = predictor.analyze_batch_for_extremes(pending_batch)
+        print(f"   Found {len(extremes)} extreme predictions")
+    
+    # Step 7: Batch analysis for GPT-4
+    if predictor.verifier:
+        verifier_batch = predictor.db.get_verifier_recent_for_batch()
+        if len(verifier_batch) >= VERIFIER_BATCH_SIZE:
+            print(f"\n🔬 Analyzing GPT-4 batch for extremes...")
+            verifier_extremes = predictor.verifier.analyze_batch_for_extremes(verifier_batch)
+            print(f"   Found {len(verifier_extremes)} verifier extremes")
+    
+    # Step 8: Meta-analysis for Claude
+    predictor.run_meta_analysis_if_needed()
+
+
+def run_continuous(predictor: Predictor, timeframe: str = PREDICTION_TIMEFRAME,
+                   interval_mins: int = PREDICTION_INTERVAL_MINS):
+    """Predict every interval_mins, clock-aligned, until interrupted.
+    
+    The defaults come from the environment; start.py passes each
+    timeframe's own values, running one of these per thread.
+    """
     import sys
-    print(f"🚀 Starting Recursive Learning BTC Predictor [{PREDICTION_TIMEFRAME}]")
-    print(f"   Interval: {PREDICTION_INTERVAL_MINS} minutes")
-    print(f"   Database: {DB_PATH}")
+    print(f"🚀 Starting Recursive Learning BTC Predictor [{timeframe}]")
+    print(f"   Interval: {interval_mins} minutes")
+    print(f"   Database: {predictor.db.db_path}")
     print(f"   Batch Size: {BATCH_SIZE}")
     print(f"   Meta-Analysis: Every {META_LEARNING_INTERVAL * BATCH_SIZE} predictions")
-    print(f"   Clock-Aligned: YES (predictions at :{':'.join(str(i).zfill(2) for i in range(0, 60, PREDICTION_INTERVAL_MINS))})")
+    print(f"   Clock-Aligned: YES (predictions at :{':'.join(str(i).zfill(2) for i in range(0, 60, interval_mins))})")
     print("   Running continuous loop...\n")
     sys.stdout.flush()
     
     while True:
         try:
             # Wait for next clock-aligned slot before making prediction
-            slot_time = wait_for_aligned_slot(PREDICTION_INTERVAL_MINS)
-            print(f"🎯 Slot {slot_time.strftime('%H:%M')} UTC - Starting cycle")
+            slot_time = wait_for_aligned_slot(interval_mins)
+            print(f"🎯 [{timeframe}] Slot {slot_time.strftime('%H:%M')} UTC - Starting cycle")
             sys.stdout.flush()
             
-            run_single_cycle(predictor)
+            run_single_cycle(predictor, interval_mins)
+            predictor.db.optimize()
             sys.stdout.flush()
         except KeyboardInterrupt:
             print("\n\n👋 Stopping predictor...")
@@ -1691,34 +2022,38 @@ def show_status(predictor: Predictor):
     recent = predictor.db.get_resolved(5)
     meta_rules = predictor.db.get_active_meta_rules()
     
-    print("\n" + "="*60)
-    print("📊 RECURSIVE LEARNING BTC PREDICTOR - STATUS")
-    print("="*60)
-    
-    print(f"\n📈 Overall Stats:")
-    print(f"   Total Predictions: {stats['total_predictions']}")
-    print(f"   Resolved: {stats['resolved']}")
-    print(f"   Direction Accuracy: {stats['accuracy_pct']:.1f}%")
-    print(f"   Avg Target Error: {stats['avg_target_error_pct']:.2f}%")
-    print(f"   Avg Calibration: {stats['avg_calibration']:.2f}")
-    print(f"   Extremes Captured: {stats['extremes_captured']}")
-    print(f"   Active Meta-Rules: {stats.get('active_meta_rules', 0)}")
+    lines = [
+        "\n" + "="*60,
+        "📊 RECURSIVE LEARNING BTC PREDICTOR - STATUS",
+        "="*60,
+    ]
+    
+    lines.append(f"\n📈 Overall Stats:")
+    lines.append(f"   Total Predictions: {stats['total_predictions']}")
+    lines.append(f"   Resolved: {stats['resolved']}")
+    lines.append(f"   Direction Accuracy: {stats['accuracy_pct']:.1f}%")
+    lines.append(f"   Avg Target Error: {stats['avg_target_error_pct']:.2f}%")
+    lines.append(f"   Avg Calibration: {stats['avg_calibration']:.2f}")
+    lines.append(f"   Extremes Captured: {stats['extremes_captured']}")
+    lines.append(f"   Active Meta-Rules: {stats.get('active_meta_rules', 0)}")
     
     if recent:
-        print(f"\n🕐 Recent Predictions:")
-        for r in recent[:5]:
-            status = "✓" if r.direction_correct else "✗"
-            print(f"   {status} {r.predicted_direction} @ {r.confidence}% → {r.actual_direction} (err: {r.target_error_pct:.2f}%)")
+        lines.append(f"\n🕐 Recent Predictions:")
+        lines.extend(
+            f"   {'✓' if r.direction_correct else '✗'} {r.predicted_direction} @ {r.confidence}% → {r.actual_direction} (err: {r.target_error_pct:.2f}%)"
+            for r in recent[:5]
+        )
     
     if meta_rules:
-        print(f"\n🧠 Active Meta-Rules:")
-        for rule in meta_rules[:3]:
-            print(f"   [{rule['pattern_type']}] {rule['meta_rule'][:70]}...")
+        lines.append(f"\n🧠 Active Meta-Rules:")
+        lines.extend(f"   [{rule['pattern_type']}] {rule['meta_rule'][:70]}..." for rule in meta_rules[:3])
     
     if extremes:
-        print(f"\n⚡ Recent Learnings (from extremes):")
-        for ex in extremes[:3]:
-            print(f"   • {ex.learning_extracted[:100]}...")
+        lines.append(f"\n⚡ Recent Learnings (from extremes):")
+        lines.extend(f"   • {ex.learning_extracted[:100]}..." for ex in extremes[:3])
+    
+    # One write for the whole report
+    print("\n".join(lines))
 
 
 def export_data(predictor: Predictor, format: str = "json"):
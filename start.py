@@ -7,43 +7,157 @@ Handles database migration for Railway deployment.
 import os
 import sys
 import time
-import shutil
-import sqlite3
 import subprocess
 import signal
+import socket
+import threading
+from pathlib import Path
 
-# Check if running on Railway (with persistent volume)
+# Check if running on Railway (with persistent volume); databases go there
+# if so, otherwise in the current directory
 DATA_DIR = os.environ.get('RAILWAY_VOLUME_MOUNT_PATH', '/data')
-IS_RAILWAY = os.path.exists(DATA_DIR) and DATA_DIR != '/data' or os.environ.get('RAILWAY_ENVIRONMENT')
+IS_RAILWAY = os.path.exists(DATA_DIR) and (DATA_DIR != '/data' or bool(os.environ.get('RAILWAY_ENVIRONMENT')))
+DB_DIR = Path(DATA_DIR) if IS_RAILWAY else Path('.')
 
-# Timeframe configurations
+# Either half can be switched off, to run the dashboard and the predictors
+# as separate services from the same start command
+DASHBOARD_DISABLED = os.environ.get('DASHBOARD_DISABLED', 'false').lower() == 'true'
+PREDICTORS_DISABLED = os.environ.get('PREDICTORS_DISABLED', 'false').lower() == 'true'
+
+# dashboard.PORT; start-up waits for it to accept connections
+DASHBOARD_PORT = 8080
+READY_TIMEOUT = 30
+
+# Crashed services are restarted after an exponential backoff, and given
+# up on after MAX_RESTARTS crashes within RESTART_WINDOW seconds (the
+# backoffs alone add up to about 5 minutes over 10 restarts)
+MAX_BACKOFF = 60
+MAX_RESTARTS = 10
+RESTART_WINDOW = 600
+
+# Timeframe configurations; 'env' names the variable setup_database
+# exports the database path in
 TIMEFRAMES = {
-    '5min': {'interval': 5, 'db': 'predictions_5min.db'},
-    '15min': {'interval': 15, 'db': 'predictions_15min.db'},
-    '1h': {'interval': 60, 'db': 'predictions_1h.db'},
+    '5min': {'interval': 5, 'db': 'predictions_5min.db', 'env': 'DB_PATH_5MIN'},
+    '15min': {'interval': 15, 'db': 'predictions_15min.db', 'env': 'DB_PATH_15MIN'},
+    '1h': {'interval': 60, 'db': 'predictions_1h.db', 'env': 'DB_PATH_1H'},
 }
 
 def setup_database():
     """Setup database paths for Railway or local deployment."""
-    # Determine the data directory
-    if IS_RAILWAY and os.path.exists(DATA_DIR):
+    if IS_RAILWAY:
         print(f"🗄️  Railway detected, using persistent volume: {DATA_DIR}")
-        db_dir = DATA_DIR
     else:
         print("🗄️  Running locally, using current directory for databases")
-        db_dir = "."
     
     # Set up database paths for each timeframe
     for tf, config in TIMEFRAMES.items():
-        db_name = config['db']
-        db_path = os.path.join(db_dir, db_name) if db_dir != "." else db_name
-        
-        env_var = f"DB_PATH_{tf.upper().replace('-', '_')}"
-        os.environ[env_var] = db_path
+        db_path = str(DB_DIR / config['db'])
+        os.environ[config['env']] = db_path
         print(f"   {tf}: {db_path}")
     
     # Legacy DB path (not really used but kept for compatibility)
-    os.environ['DB_PATH'] = os.path.join(db_dir, 'predictions.db') if db_dir != "." else 'predictions.db'
+    os.environ['DB_PATH'] = str(DB_DIR / 'predictions.db')
+
+def db_path_for(tf):
+    """The database path setup_database chose for a timeframe."""
+    config = TIMEFRAMES[tf]
+    return os.environ.get(config['env'], config['db'])
+
+def start_dashboard():
+    return subprocess.Popen(
+        [sys.executable, 'dashboard.py'],
+        stdout=sys.stdout,
+        stderr=sys.stderr
+    )
+
+def restart_delay(name, history):
+    """Record a crash in history (monotonic timestamps) and return how long
+    to wait before restarting, or None to give up on the service."""
+    now = time.monotonic()
+    history[:] = [t for t in history if now - t < RESTART_WINDOW]
+    history.append(now)
+    if len(history) > MAX_RESTARTS:
+        print(f"❌ {name} crashed {len(history)}x in {RESTART_WINDOW // 60}min; giving up", flush=True)
+        return None
+    return min(2 ** len(history), MAX_BACKOFF)
+
+def wait_dashboard_ready(proc, port=DASHBOARD_PORT, timeout=READY_TIMEOUT):
+    """Poll until the dashboard accepts connections on its port. Gives up
+    early if the process exits (e.g. no database yet) or the timeout passes."""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end and proc.poll() is None:
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def watch_dashboard(processes, stopping):
+    """Thread body: block on the dashboard process and restart it (with
+    backoff) when it exits, unless we are shutting down."""
+    crashes = []
+    while True:
+        proc = processes['dashboard']
+        proc.wait()
+        if stopping.is_set():
+            return
+        delay = restart_delay('dashboard', crashes)
+        if delay is None:
+            return
+        print(f"⚠️  dashboard exited with code {proc.returncode}, restarting in {delay}s...", flush=True)
+        if stopping.wait(delay):
+            return
+        processes['dashboard'] = start_dashboard()
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def shared_clients(predictor):
+    """The LLM API clients all predictor threads share, built on first use.
+    
+    Each Predictor still builds its own BinanceClient: its use_fallback
+    flag is per instance and only ever turns on, and it is cheap to create.
+    """
+    with _clients_lock:
+        if not _clients:
+            clients = {'client': predictor.Anthropic()}
+            if predictor.VERIFIER_ENABLED:
+                clients['verifier_client'] = predictor.OpenAI()
+            _clients.update(clients)
+        return _clients
+
+def run_predictor(tf, ready):
+    """Thread body: one timeframe's predictor loop, on its own database,
+    restarted (with backoff) whenever it stops. Sets ready once the first attempt has
+    opened its database (or failed)."""
+    config = TIMEFRAMES[tf]
+    crashes = []
+    while True:
+        try:
+            import predictor
+            p = predictor.Predictor(db_path_for(tf), **shared_clients(predictor))
+            ready.set()
+            predictor.run_continuous(p, tf, config['interval'])
+        except Exception as e:
+            import traceback
+            ready.set()
+            print(f"❌ {tf} predictor failed: {e}", flush=True)
+            traceback.print_exc()
+        delay = restart_delay(f"predictor_{tf}", crashes)
+        if delay is None:
+            return
+        print(f"⚠️  predictor_{tf} stopped, restarting in {delay}s...", flush=True)
+        time.sleep(delay)
+
+def start_predictor(tf):
+    """Run a timeframe's predictor in a daemon thread of this process.
+    Returns an event that is set once it has opened its database."""
+    ready = threading.Event()
+    thread = threading.Thread(target=run_predictor, args=(tf, ready), name=f"predictor_{tf}", daemon=True)
+    thread.start()
+    return ready
 
 def main():
     """Start dashboard and predictor services."""
@@ -59,43 +173,37 @@ def main():
     setup_database()
     
     processes = {}
+    stopping = threading.Event()
     
     # Start dashboard
-    print("\n🌐 Starting dashboard server...")
-    dashboard_proc = subprocess.Popen(
-        [sys.executable, 'dashboard.py'],
-        stdout=sys.stdout,
-        stderr=sys.stderr
-    )
-    processes['dashboard'] = dashboard_proc
-    time.sleep(2)
+    if DASHBOARD_DISABLED:
+        print("\n🌐 Dashboard disabled (DASHBOARD_DISABLED=true)")
+    else:
+        print("\n🌐 Starting dashboard server...")
+        processes['dashboard'] = start_dashboard()
+        if not wait_dashboard_ready(processes['dashboard']):
+            print(f"⚠️  dashboard not listening on port {DASHBOARD_PORT} yet, continuing")
+        threading.Thread(target=watch_dashboard, args=(processes, stopping), daemon=True).start()
     
-    # Start predictors for each timeframe
-    for tf, config in TIMEFRAMES.items():
-        print(f"\n🔮 Starting {tf} predictor...")
-        env = os.environ.copy()
-        env['PREDICTION_TIMEFRAME'] = tf
-        env['PREDICTION_INTERVAL'] = str(config['interval'])
-        env['DB_PATH'] = os.environ.get(f"DB_PATH_{tf.upper().replace('-', '_')}", config['db'])
-        
-        print(f"   DB_PATH={env['DB_PATH']}")
-        print(f"   PREDICTION_INTERVAL={env['PREDICTION_INTERVAL']}")
-        
-        predictor_proc = subprocess.Popen(
-            [sys.executable, 'predictor.py'],
-            env=env,
-            stdout=sys.stdout,
-            stderr=sys.stderr
-        )
-        processes[f'predictor_{tf}'] = predictor_proc
-        time.sleep(1)
+    # Start predictors for each timeframe, as threads sharing this
+    # interpreter (their time is spent waiting on the network and sleeping)
+    if PREDICTORS_DISABLED:
+        print("\n🔮 Predictors disabled (PREDICTORS_DISABLED=true)")
+    else:
+        for tf, config in TIMEFRAMES.items():
+            print(f"\n🔮 Starting {tf} predictor...")
+            print(f"   DB_PATH={db_path_for(tf)}")
+            print(f"   PREDICTION_INTERVAL={config['interval']}")
+            
+            if not start_predictor(tf).wait(READY_TIMEOUT):
+                print(f"⚠️  {tf} predictor not ready yet, continuing")
     
     print("\n✅ All services started!")
     print("=" * 50)
     
-    # Monitor processes
     def signal_handler(signum, frame):
         print("\n🛑 Shutting down...")
+        stopping.set()
         for name, proc in processes.items():
             proc.terminate()
         sys.exit(0)
@@ -103,39 +211,13 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
     
-    # Keep running and restart failed processes
+    # Nothing to poll: each service's thread restarts it as soon as it
+    # stops, so the main thread only has to wait for a signal
     while True:
-        for name, proc in list(processes.items()):
-            # Check if process is still running
-            if proc.poll() is not None:
-                print(f"⚠️  {name} exited with code {proc.returncode}, restarting...")
-                
-                if name == 'dashboard':
-                    new_proc = subprocess.Popen(
-                        [sys.executable, 'dashboard.py'],
-                        stdout=sys.stdout,
-                        stderr=sys.stderr
-                    )
-                    processes['dashboard'] = new_proc
-                elif name.startswith('predictor_'):
-                    tf = name.replace('predictor_', '')
-                    config = TIMEFRAMES[tf]
-                    env = os.environ.copy()
-                    env['PREDICTION_TIMEFRAME'] = tf
-                    env['PREDICTION_INTERVAL'] = str(config['interval'])
-                    env['DB_PATH'] = os.environ.get(f"DB_PATH_{tf.upper().replace('-', '_')}", config['db'])
-                    
-                    new_proc = subprocess.Popen(
-                        [sys.executable, 'predictor.py'],
-                        env=env,
-                        stdout=sys.stdout,
-                        stderr=sys.stderr
-                    )
-                    processes[name] = new_proc
-                
-                time.sleep(5)
-        
-        time.sleep(10)
+        if hasattr(signal, 'pause'):
+            signal.pause()
+        else:  # Windows has no signal.pause
+            time.sleep(3600)
 
 if __name__ == "__main__":
     main()